@@ -1,14 +1,18 @@
 import os
-import joblib
+import time
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
 from flask_cors import CORS
-from flask_restx import Api, Resource, fields, Namespace
+from flask_restx import Api, Resource, fields, Namespace, marshal
 from car_price_prediction import logger
 from car_price_prediction.config.configuration import ConfigurationManager
-from sklearn.preprocessing import LabelEncoder
+from car_price_prediction.components.field_parsers import parse_numeric_value, parse_turbo_value
+from car_price_prediction.components.model_store import ModelStore
+from car_price_prediction.components.prediction_cache import PredictionCache
+from car_price_prediction.schemas.columnar_rules import CAR_FEATURES_SCHEMA
+from car_price_prediction.utils.timing import TimingRegistry
 
 # Initialize Flask app
 app = Flask(__name__, template_folder='templates')
@@ -22,59 +26,107 @@ api = Api(app, version='1.0', title='Car Price Prediction API',
 # Create namespaces
 predict_ns = api.namespace('predict', description='Prediction operations')
 info_ns = api.namespace('info', description='Information operations')
+admin_ns = api.namespace('admin', description='Administrative operations')
 
 # Load configuration
 config = ConfigurationManager()
 prepare_base_model_config = config.get_prepare_base_model_config()
+serving_config = config.get_serving_config()
 
-# Global variables for model and scaler
-model = None
-scaler = None
-label_encoders = {}
 feature_columns = prepare_base_model_config.feature_columns
 
+# Load and warm up the model once at startup; requests only read model_store.bundle.
+# Under gunicorn this runs in the master before workers are forked.
+model_store = ModelStore(
+    serving_config.model_path,
+    serving_config.preprocessor_path,
+    warmup=serving_config.warmup,
+    compiled_model_path=serving_config.compiled_model_path,
+    compiled_max_rows=serving_config.compiled_max_rows
+)
 
-def load_model_and_scaler():
-    """Load the trained model and scaler"""
-    global model, scaler
-    try:
-        model_path = Path("artifacts/training/model.pkl")
-        scaler_path = Path("artifacts/training/scaler.pkl")
-        
-        if model_path.exists():
-            model = joblib.load(model_path)
-            logger.info("Model loaded successfully")
-        else:
-            logger.error(f"Model not found at {model_path}")
-            
-        if scaler_path.exists():
-            scaler = joblib.load(scaler_path)
-            logger.info("Scaler loaded successfully")
+# Repeated quotes for the same listing skip preprocessing and model.predict.
+# Keys include the model version and the cache is dropped on every reload.
+prediction_cache = PredictionCache(
+    max_entries=serving_config.cache_max_entries,
+    ttl_seconds=serving_config.cache_ttl_seconds
+)
+model_store.add_listener(lambda bundle: prediction_cache.clear())
+model_store.load()
+
+# Per-phase request timings, exposed on /metrics. Each gunicorn worker keeps
+# its own histograms, like the prediction cache.
+timings = TimingRegistry(enabled=serving_config.timing)
+timer = timings.timer
+REQUEST_PHASES = {'/predict/price': 'price.request', '/predict/batch': 'batch.request'}
+
+
+def start_background_tasks():
+    """Start per-process background threads (threads do not survive a fork)"""
+    if serving_config.watch_artifacts:
+        model_store.start_watcher(serving_config.watch_interval)
+
+
+def canonical_features(preprocessor, data):
+    """Validate a single record and return its parsed feature values
+    
+    Categorical fields are compared as the strings the encoder looks up and
+    numeric fields by parsed value, so equivalent payloads ("2.0" and 2) give
+    the same tuple. Used as the prediction cache key.
+    
+    Raises:
+        ValueError: if features are missing or numeric features cannot be parsed
+    """
+    missing = [col for col in feature_columns if data.get(col) is None]
+    if missing:
+        raise ValueError(f"Missing features: {missing}")
+    
+    values = []
+    invalid = []
+    for col in preprocessor.raw_columns:
+        if col in preprocessor.encoder.tables:
+            values.append(str(data[col]))
         else:
-            logger.warning("Scaler not found")
-    except Exception as e:
-        logger.exception(f"Error loading model: {e}")
+            value = parse_numeric_value(col, data[col])
+            if np.isnan(value):
+                invalid.append(col)
+            values.append(value)
+    if invalid:
+        raise ValueError(f"Non-numeric values for: {invalid}")
+    if preprocessor.turbo_position is not None:
+        values.append(parse_turbo_value(data['Engine volume']))
+    
+    return tuple(values)
 
 
-def preprocess_input(data):
-    """Preprocess input data"""
-    try:
-        df = pd.DataFrame([data])
-        
-        # Handle categorical columns
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
-                label_encoders[col] = le
-        
-        # Ensure all columns are numeric
-        df = df.astype(float)
-        
-        return df
-    except Exception as e:
-        logger.error(f"Error preprocessing input: {e}")
-        return None
+def validate_batch(items):
+    """Check a batch of records against the CarFeatures rules
+    
+    The batch is turned into columns once and every rule runs over a whole
+    column, instead of instantiating CarFeatures per item.
+    
+    Args:
+        items: List of car feature dictionaries
+    
+    Returns:
+        Tuple of (DataFrame of the valid records indexed by payload position,
+        dictionary of payload position -> error entry for rejected items)
+    """
+    errors = {
+        i: {'error': 'Expected an object of car features'}
+        for i, item in enumerate(items) if not isinstance(item, dict)
+    }
+    positions = [i for i in range(len(items)) if i not in errors]
+    
+    df = pd.DataFrame.from_records(
+        [items[i] for i in positions], columns=feature_columns
+    )
+    df.index = positions
+    
+    result = CAR_FEATURES_SCHEMA.validate(df)
+    for row, details in result.row_errors().items():
+        errors[positions[row]] = {'error': 'Validation failed', 'details': details}
+    return df.loc[~result.invalid], errors
 
 
 # Define Swagger models
@@ -91,7 +143,8 @@ car_features = api.model('CarFeatures', {
     'Category': fields.String(required=True, description='Car category'),
     'Leather interior': fields.Integer(required=True, description='Leather interior (0/1)'),
     'Fuel type': fields.String(required=True, description='Fuel type'),
-    'Engine volume': fields.Float(required=True, description='Engine volume'),
+    'Engine volume': fields.Raw(required=True, description="Engine volume in liters, a number or the raw "
+                                                          "string such as '2.0 Turbo'", example=2.0),
     'Mileage': fields.Float(required=True, description='Mileage'),
     'Cylinders': fields.Integer(required=True, description='Number of cylinders'),
     'Gear box type': fields.String(required=True, description='Gearbox type'),
@@ -104,11 +157,23 @@ car_features = api.model('CarFeatures', {
 
 
 @app.before_request
-def initialize():
-    """Initialize model and scaler on first request"""
-    global model, scaler
-    if model is None or scaler is None:
-        load_model_and_scaler()
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_time(response):
+    """Whole request time, including marshalling the response"""
+    phase = REQUEST_PHASES.get(request.path)
+    if phase is not None and 'request_start' in g:
+        timings.record(phase, time.perf_counter() - g.request_start)
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    """Request phase timings (p50/p95/p99) in Prometheus text format"""
+    return Response(timings.to_prometheus(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/')
@@ -122,43 +187,48 @@ class PredictPrice(Resource):
     """Predict car price from features"""
     
     @predict_ns.expect(car_features)
-    @predict_ns.marshal_with(price_model)
+    @predict_ns.response(200, 'Success', price_model)
     def post(self):
         """Predict price for given car features"""
+        data = api.payload
+        
+        # Validate input
+        if not data or not isinstance(data, dict):
+            api.abort(400, 'No input data provided')
+        
+        bundle = model_store.bundle
+        if bundle is None:
+            api.abort(503, 'Model not loaded')
+        
+        with timer('price.validate'):
+            details = CAR_FEATURES_SCHEMA.record_errors(data)
+        if details:
+            api.abort(400, 'Validation failed', details=details)
+        
         try:
-            data = api.payload
-            
-            # Validate input
-            if not data:
-                api.abort(400, 'No input data provided')
-            
-            # Preprocess input
-            processed_data = preprocess_input(data)
-            if processed_data is None:
-                api.abort(400, 'Error processing input data')
-            
-            # Select only required features
-            X = processed_data[feature_columns]
+            with timer('price.parse'):
+                features = canonical_features(bundle.preprocessor, data)
+        except ValueError as e:
+            api.abort(400, f'Error processing input data: {e}')
+        
+        try:
+            key = PredictionCache.make_key(bundle.version, features)
+            price = prediction_cache.get(key)
+            if price is None:
+                # Make prediction
+                with timer('price.transform'):
+                    X = bundle.preprocessor.transform_one(data)
+                with timer('price.predict'):
+                    price = float(bundle.predict(X)[0])
+                prediction_cache.put(key, price)
+            confidence = 0.85  # Placeholder confidence
             
-            # Scale features
-            if scaler:
-                X_scaled = scaler.transform(X)
-            else:
-                X_scaled = X
+            logger.info(f"Prediction made: ${price:.2f}")
             
-            # Make prediction
-            if model:
-                price = model.predict(X_scaled)[0]
-                confidence = 0.85  # Placeholder confidence
-                
-                logger.info(f"Prediction made: ${price:.2f}")
-                
-                return {
-                    'price': float(price),
-                    'confidence': confidence
-                }, 200
-            else:
-                api.abort(503, 'Model not loaded')
+            # Marshalled here rather than by marshal_with, so it is timed like batch.marshal
+            with timer('price.marshal'):
+                body = marshal({'price': float(price), 'confidence': confidence}, price_model)
+            return body, 200
                 
         except Exception as e:
             logger.exception(f"Error during prediction: {e}")
@@ -171,27 +241,44 @@ class PredictBatch(Resource):
     
     def post(self):
         """Predict prices for batch of cars"""
+        data = api.payload
+        
+        if not isinstance(data, list):
+            api.abort(400, 'Expected list of car features')
+        
+        bundle = model_store.bundle
+        if bundle is None:
+            api.abort(503, 'Model not loaded')
+        
         try:
-            data = api.payload
+            # Validate, parse, encode, scale and predict the whole batch in a single pass
+            with timer('batch.validate'):
+                accepted, errors = validate_batch(data)
             
-            if not isinstance(data, list):
-                api.abort(400, 'Expected list of car features')
+            prices = {}
+            if len(accepted):
+                preprocessor = bundle.preprocessor
+                with timer('batch.parse'):
+                    parsed = preprocessor.parse(accepted)
+                with timer('batch.transform'):
+                    X = preprocessor.transform_parsed(parsed)
+                with timer('batch.predict'):
+                    prices = dict(zip(accepted.index, bundle.predict(X).tolist()))
             
-            predictions = []
-            for item in data:
-                processed = preprocess_input(item)
-                if processed is not None:
-                    X = processed[feature_columns]
-                    if scaler:
-                        X_scaled = scaler.transform(X)
-                    else:
-                        X_scaled = X
-                    
-                    if model:
-                        price = float(model.predict(X_scaled)[0])
-                        predictions.append({'price': price})
+            with timer('batch.marshal'):
+                predictions = [
+                    {'index': i, 'price': float(prices[i])} if i in prices
+                    else {'index': i, **errors[i]}
+                    for i in range(len(data))
+                ]
             
-            return {'predictions': predictions}, 200
+            logger.info(f"Batch prediction made: {len(prices)} priced, {len(errors)} rejected")
+            
+            return {
+                'predictions': predictions,
+                'count': len(prices),
+                'error_count': len(errors)
+            }, 200
             
         except Exception as e:
             logger.exception(f"Error during batch prediction: {e}")
@@ -215,14 +302,41 @@ class ModelStatus(Resource):
     """Get model status information"""
     
     def get(self):
-        """Get current model status"""
-        return {
-            'model_loaded': model is not None,
-            'scaler_loaded': scaler is not None,
-            'model_path': 'artifacts/training/model.pkl',
-            'scaler_path': 'artifacts/training/scaler.pkl',
-            'timestamp': str(pd.Timestamp.now())
-        }, 200
+        """Get current model status (503 until the model is loaded and warmed up)"""
+        status = model_store.status()
+        status['cache'] = prediction_cache.stats()
+        status['timestamp'] = str(pd.Timestamp.now())
+        return status, 200 if status['ready'] else 503
+
+
+@admin_ns.route('/reload')
+class ModelReload(Resource):
+    """Reload the model without restarting the API"""
+    
+    def post(self):
+        """Load new artifacts in the background and swap them in atomically
+        
+        Pass ?wait=true to block until the reload has finished. When the
+        ADMIN_TOKEN environment variable is set, the X-Admin-Token header
+        must match it.
+        
+        Only the process that handles the request reloads. Under gunicorn
+        every worker holds its own model store, so the other workers keep
+        their bundle until their artifact watcher sees the new files.
+        """
+        token = os.environ.get('ADMIN_TOKEN')
+        if token and request.headers.get('X-Admin-Token') != token:
+            api.abort(403, 'Invalid admin token')
+        
+        if model_store.reloading:
+            api.abort(409, 'Model reload already in progress')
+        
+        if request.args.get('wait', 'false').lower() == 'true':
+            bundle = model_store.reload()
+            return model_store.status(), 200 if bundle is not None else 500
+        
+        model_store.reload_async()
+        return {'reload_started': True, 'model_version': model_store.version}, 202
 
 
 @app.errorhandler(404)
@@ -239,5 +353,8 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
+    # Development server only; production runs gunicorn -c gunicorn.conf.py app:app
     logger.info("Starting Car Price Prediction Flask Application")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    start_background_tasks()
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000,
+            use_reloader=False)
@@ -0,0 +1,88 @@
+"""
+Peak-RSS benchmark of the preprocessing paths
+
+Each path runs in a fresh interpreter so peaks do not mix. The dataset is
+loaded (and optionally repeated to simulate more listings) before the
+baseline is taken, so the reported delta is what preprocessing itself adds.
+
+    python benchmarks/preprocessing_memory.py --repeat 30 --output preprocessing_memory.json
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+DEFAULT_DATA = "artifacts/data_ingestion/car_price_prediction.csv"
+MODES = ("copying", "inplace")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode, data_path, repeat):
+    """Preprocess once in the current process and return the measurements"""
+    import numpy as np
+    import pandas as pd
+    from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+    from car_price_prediction.components.data_ingestion import load_dataset
+
+    df = load_dataset(data_path)
+    if repeat > 1:
+        df = pd.concat([df] * repeat, ignore_index=True)
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    X, y = AdvancedPreprocessor().preprocess(df, inplace=(mode == "inplace"))
+    seconds = time.perf_counter() - start
+
+    peak = peak_rss_mb()
+    return {
+        "mode": mode,
+        "rows": int(len(y)),
+        "seconds": round(seconds, 3),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak, 1),
+        "preprocess_delta_mb": round(peak - baseline, 1),
+        "matrix_mb": round(np.asarray(X).nbytes / 2**20, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DEFAULT_DATA, help="Listings CSV (its Feather cache is used if fresh)")
+    parser.add_argument("--repeat", type=int, default=10, help="Concatenate the dataset this many times")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.data, args.repeat)))
+        return
+
+    results = []
+    for mode in MODES:
+        completed = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--data", args.data, "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<10}{'rows':>10}{'seconds':>10}{'peak MB':>10}{'delta MB':>10}{'X MB':>8}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['rows']:>10}{r['seconds']:>10}{r['peak_rss_mb']:>10}"
+              f"{r['preprocess_delta_mb']:>10}{r['matrix_mb']:>8}")
+    copying, inplace = results
+    print(f"Peak preprocessing memory reduced by "
+          f"{1 - inplace['preprocess_delta_mb'] / copying['preprocess_delta_mb']:.0%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Benchmark suite: preprocessing, model fit/predict, permutation importance and API latency
+
+Every size runs on synthetic listings (see synthetic_listings.py), so the
+suite needs no network and no dataset. The API is served from a model
+trained on the smallest size and called through the Flask test client.
+Results go to a JSON file; pass --baseline with an earlier file to flag
+regressions. Results are matched on benchmark, dataset size and rows.
+
+Run it from the repository root with the package on the path: app.py reads
+config/config.yaml from the working directory.
+
+    PYTHONPATH=src python benchmarks/suite.py --output benchmark_results.json
+    PYTHONPATH=src python benchmarks/suite.py --sizes 10000 100000 --baseline benchmark_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+from synthetic_listings import synthetic_listings, api_payloads
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_BATCH_SIZES = (100, 1_000, 10_000)
+
+
+def best_of(func, repeats):
+    """Fastest of several runs in seconds, and the last result"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def latency_summary(seconds) -> dict:
+    """p50/p95/p99 of per-call latencies, in milliseconds"""
+    ms = np.asarray(seconds) * 1000
+    return {
+        "calls": int(len(ms)),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3)
+    }
+
+
+def environment() -> dict:
+    """What a result file was measured on, for comparing runs"""
+    import pandas as pd
+    import sklearn
+    import xgboost
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgboost.__version__
+    }
+
+
+def bench_size(n_rows, args, results):
+    """Preprocessing, each model and permutation importance on n_rows listings"""
+    from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+    from car_price_prediction.components.feature_importance import FeatureAnalysisPipeline
+    from car_price_prediction.components.model_comparison import ModelFactory
+    from car_price_prediction.config.configuration import ConfigurationManager
+
+    config = ConfigurationManager(REPO_ROOT / "config" / "config.yaml", REPO_ROOT / "params.yaml")
+    df = synthetic_listings(n_rows, seed=args.seed)
+
+    preprocessor = AdvancedPreprocessor(config.params.model.feature_columns)
+    seconds, (X, y) = best_of(lambda: preprocessor.preprocess(df), args.repeats)
+    results.append({"benchmark": "preprocess", "rows": n_rows, "seconds": round(seconds, 4)})
+    print(f"{n_rows:>9} rows  preprocess{'':<20}{seconds:>9.3f}s")
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X.to_numpy(), y.to_numpy(), test_size=0.2, random_state=args.seed
+    )
+    fit_rows = min(len(X_train), args.max_fit_rows or len(X_train))
+    fitted = {}
+    for name, model in ModelFactory(random_state=args.seed).models.items():
+        if args.models and name not in args.models:
+            continue
+        fit_seconds, estimator = best_of(
+            lambda: clone(model).fit(X_train[:fit_rows], y_train[:fit_rows]), args.repeats
+        )
+        predict_seconds, _ = best_of(lambda: estimator.predict(X_test), args.repeats)
+        fitted[name] = estimator
+        results.append({"benchmark": f"fit/{name}", "rows": fit_rows, "size": n_rows,
+                        "seconds": round(fit_seconds, 4)})
+        results.append({"benchmark": f"predict/{name}", "rows": len(X_test), "size": n_rows,
+                        "seconds": round(predict_seconds, 4)})
+        print(f"{n_rows:>9} rows  {name:<30}{fit_seconds:>9.3f}s fit {predict_seconds:>8.3f}s predict")
+
+    importance_model = args.importance_model if args.importance_model in fitted else next(iter(fitted), None)
+    if importance_model is not None:
+        with tempfile.TemporaryDirectory() as output_dir:
+            analysis = FeatureAnalysisPipeline(
+                fitted[importance_model], preprocessor.pipeline.feature_names, output_dir,
+                config=config.get_feature_importance_config()
+            )
+            seconds, _ = best_of(lambda: analysis.run_fast_permutation(X_test, y_test), args.repeats)
+        results.append({"benchmark": f"permutation_importance/{importance_model}", "rows": len(X_test),
+                        "size": n_rows, "seconds": round(seconds, 4)})
+        print(f"{n_rows:>9} rows  permutation importance{'':<8}{seconds:>9.3f}s ({importance_model})")
+
+    return preprocessor, fitted, df
+
+
+def bench_api(preprocessor, model, df, args, results):
+    """Single-row and batch latency of the Flask app serving `model`"""
+    from car_price_prediction.components.compiled_model import CompiledTreeEnsemble, file_digest
+
+    sys.path.insert(0, str(REPO_ROOT))
+    import app as api_app
+
+    with tempfile.TemporaryDirectory() as artifacts:
+        store = api_app.model_store
+        store.model_path = Path(artifacts) / "model.pkl"
+        store.preprocessor_path = Path(artifacts) / "preprocessor.pkl"
+        store.compiled_model_path = Path(artifacts) / "compiled_model.npz"
+        joblib.dump(model, store.model_path)
+        preprocessor.pipeline.save(store.preprocessor_path)
+        try:
+            compiled = CompiledTreeEnsemble.from_model(model)
+            compiled.source_digest = file_digest(store.model_path)
+            compiled.save(store.compiled_model_path)
+        except ValueError:
+            pass
+        if store.load() is None:
+            raise RuntimeError(f"API could not load the benchmark model: {store.error}")
+
+    client = api_app.app.test_client()
+    payloads = api_payloads(df.sample(min(len(df), max(args.api_calls, max(args.batch_sizes))),
+                                      random_state=args.seed))
+
+    # Distinct listings, so the prediction cache never answers
+    api_app.prediction_cache.clear()
+    latencies = []
+    for payload in payloads[:args.api_calls]:
+        start = time.perf_counter()
+        response = client.post("/predict/price", json=payload)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict/price returned {response.status_code}: {response.json}")
+    summary = latency_summary(latencies)
+    results.append({"benchmark": "api/single", "rows": len(latencies), "seconds": round(sum(latencies), 4),
+                    **summary})
+    print(f"{'api':>9}       single row{'':<20}{summary['p50_ms']:>8.3f}ms p50 "
+          f"{summary['p95_ms']:.3f}ms p95 {summary['p99_ms']:.3f}ms p99")
+
+    for batch_size in args.batch_sizes:
+        batch = payloads[:batch_size]
+        latencies = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            response = client.post("/predict/batch", json=batch)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200 or response.json["error_count"]:
+                raise RuntimeError(f"/predict/batch returned {response.status_code}")
+        summary = latency_summary(latencies)
+        results.append({"benchmark": "api/batch", "rows": batch_size, "seconds": round(min(latencies), 4),
+                        **summary})
+        print(f"{'api':>9}       batch of {batch_size:<21}{min(latencies) * 1000:>8.1f}ms "
+              f"({min(latencies) / batch_size * 1e6:.1f}us per row)")
+
+
+def result_key(result) -> tuple:
+    """Identity of a result across runs
+    
+    Fit, predict and permutation results also carry the dataset size: with
+    --max-fit-rows or a fixed test split, several sizes share a row count.
+    """
+    return result["benchmark"], result.get("size", result["rows"]), result["rows"]
+
+
+def compare(results, baseline_path, tolerance, min_seconds) -> list:
+    """Benchmarks more than `tolerance` (and `min_seconds`) slower than in the baseline file"""
+    with open(baseline_path) as f:
+        baseline = {result_key(r): r["seconds"] for r in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\n{'benchmark':<40}{'size':>9}{'rows':>9}{'baseline s':>12}{'current s':>12}{'ratio':>8}")
+    for r in results:
+        _, size, _ = key = result_key(r)
+        before = baseline.get(key)
+        if not before:
+            continue
+        ratio = r["seconds"] / before
+        flag = "  REGRESSION" if ratio > 1 + tolerance and r["seconds"] - before > min_seconds else ""
+        print(f"{r['benchmark']:<40}{size:>9}{r['rows']:>9}{before:>12.4f}{r['seconds']:>12.4f}"
+              f"{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append({**r, "baseline_seconds": before, "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Listings per run")
+    parser.add_argument("--models", nargs="+", help="Models to fit (default: all of ModelFactory)")
+    parser.add_argument("--max-fit-rows", type=int, help="Cap the training rows models are fitted on")
+    parser.add_argument("--importance-model", default="xgboost", help="Model permutation importance runs on")
+    parser.add_argument("--api-calls", type=int, default=500, help="Single-row requests to time")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per timing; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Slowdown against the baseline reported as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="Ignore slowdowns smaller than this, timer noise on tiny benchmarks")
+    args = parser.parse_args()
+
+    results = []
+    served = None
+    for n_rows in sorted(args.sizes):
+        preprocessor, fitted, df = bench_size(n_rows, args, results)
+        if served is None and fitted:
+            name = args.importance_model if args.importance_model in fitted else next(iter(fitted))
+            served = (preprocessor, fitted[name], df)
+
+    if not args.skip_api and served is not None:
+        bench_api(*served, args, results)
+
+    report = {"environment": environment(), "settings": vars(args), "results": results}
+    if args.baseline:
+        report["regressions"] = compare(results, args.baseline, args.tolerance, args.min_seconds)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\nResults written to {args.output}")
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
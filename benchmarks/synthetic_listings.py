@@ -0,0 +1,165 @@
+"""
+Synthetic car listings with the schema and messiness of the real dataset
+
+The columns, dtypes and cardinalities follow the ingested CSV: 65
+manufacturers and ~1,600 models with a long tail, raw strings such as
+'1.8 Turbo', '186005 km', '04-May' doors and '-' levies, and a price that
+depends on age, mileage, engine and make. Nothing is downloaded.
+
+    python benchmarks/synthetic_listings.py --rows 100000 --output listings.csv
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from car_price_prediction.components.data_ingestion import DATASET_DTYPES
+
+MANUFACTURERS = [
+    "HYUNDAI", "TOYOTA", "MERCEDES-BENZ", "FORD", "CHEVROLET", "BMW", "LEXUS", "HONDA",
+    "NISSAN", "VOLKSWAGEN", "SSANGYONG", "KIA", "OPEL", "MITSUBISHI", "SUBARU", "AUDI",
+    "MAZDA", "JEEP", "DAEWOO", "DODGE", "FIAT", "PORSCHE", "RENAULT", "CHRYSLER", "SUZUKI",
+    "PEUGEOT", "VAZ", "LAND ROVER", "BUICK", "INFINITI", "MINI", "SKODA", "CITROEN", "GAZ",
+    "CADILLAC", "ACURA", "JAGUAR", "VOLVO", "LINCOLN", "GMC", "UAZ", "SCION", "MOSKVICH",
+    "ALFA ROMEO", "MASERATI", "SEAT", "BENTLEY", "HUMMER", "DAIHATSU", "TESLA", "ISUZU",
+    "ROVER", "SAAB", "ZAZ", "MERCURY", "PONTIAC", "FERRARI", "LAMBORGHINI", "ASTON MARTIN",
+    "ROLLS-ROYCE", "HAVAL", "GREATWALL", "LANCIA", "SATURN", "TATA"
+]
+N_MODELS = 1590
+
+# (values, frequencies) of the low-cardinality columns in the real listings
+CATEGORIES = {
+    "Category": (["Sedan", "Jeep", "Hatchback", "Minivan", "Coupe", "Universal", "Microbus",
+                  "Goods wagon", "Pickup", "Cabriolet", "Limousine"],
+                 [.454, .285, .148, .034, .028, .019, .016, .012, .003, .002, .001]),
+    "Leather interior": (["Yes", "No"], [.725, .275]),
+    "Fuel type": (["Petrol", "Diesel", "Hybrid", "LPG", "CNG", "Plug-in Hybrid", "Hydrogen"],
+                  [.528, .21, .186, .046, .026, .0039, .0001]),
+    "Gear box type": (["Automatic", "Tiptronic", "Manual", "Variator"], [.703, .161, .097, .039]),
+    "Drive wheels": (["Front", "4x4", "Rear"], [.669, .211, .12]),
+    "Doors": (["04-May", "02-Mar", ">5"], [.953, .04, .007]),
+    "Wheel": (["Left wheel", "Right-hand drive"], [.923, .077]),
+    "Color": (["Black", "White", "Silver", "Grey", "Blue", "Red", "Green", "Orange", "Brown",
+               "Carnelian red", "Golden", "Beige", "Sky blue", "Yellow", "Purple", "Pink"],
+              [.262, .233, .197, .123, .073, .033, .017, .013, .01, .009, .008, .007, .006,
+               .006, .002, .001])
+}
+
+
+def _zipf_probabilities(n, exponent=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _categorical(rng, values, probabilities, n_rows):
+    probabilities = np.asarray(probabilities) / np.sum(probabilities)
+    codes = rng.choice(len(values), size=n_rows, p=probabilities)
+    return pd.Categorical.from_codes(codes, categories=values)
+
+
+def _strings(values, codes):
+    """Categorical of raw strings from one code per row, unused values dropped"""
+    uniques, inverse = np.unique(codes, return_inverse=True)
+    return pd.Categorical.from_codes(inverse, categories=[values[u] for u in uniques])
+
+
+def synthetic_listings(n_rows, seed=0) -> pd.DataFrame:
+    """Listings with the columns and dtypes load_dataset returns"""
+    rng = np.random.default_rng(seed)
+
+    # Models follow a long tail and each belongs to one manufacturer
+    model_owner = np.sort(rng.choice(len(MANUFACTURERS), N_MODELS, p=_zipf_probabilities(len(MANUFACTURERS))))
+    model_codes = rng.choice(N_MODELS, size=n_rows, p=_zipf_probabilities(N_MODELS, 0.9))
+    manufacturer_codes = model_owner[model_codes]
+    make_premium = rng.normal(0, 0.35, len(MANUFACTURERS))
+
+    year = np.clip(np.round(2012 - rng.gamma(2.0, 3.5, n_rows) + 4), 1943, 2020).astype(np.int64)
+    age = 2021 - year
+    mileage = np.round(rng.gamma(2.0, 9000 * np.maximum(age, 1)) / 10) * 10
+    mileage[rng.random(n_rows) < 0.04] = 0
+    engine = np.clip(np.round(rng.lognormal(np.log(2.2), 0.3, n_rows), 1), 0.6, 6.8)
+    turbo = rng.random(n_rows) < 0.1
+    cylinders = np.where(engine < 2.6, 4.0, np.where(engine < 4.0, 6.0, 8.0))
+    airbags = rng.choice(np.arange(17), size=n_rows, p=_zipf_probabilities(17, 0.3)[rng.permutation(17)])
+
+    log_price = (
+        9.9 - 0.09 * age + 0.35 * np.log(engine) + 0.12 * turbo
+        - 0.08 * np.log1p(mileage / 10000) + make_premium[manufacturer_codes]
+        + rng.normal(0, 0.45, n_rows)
+    )
+    price = np.maximum(np.round(np.exp(log_price)), 1).astype(np.int64)
+
+    # Raw strings as they appear in the CSV
+    engine_tenths = np.round(engine * 10).astype(np.int64) + 1000 * turbo
+    engine_strings = {
+        code: (f"{(code % 1000) / 10:g}" if (code % 1000) % 10 else f"{(code % 1000) // 10}")
+        + (" Turbo" if code >= 1000 else "")
+        for code in np.unique(engine_tenths)
+    }
+    levy = np.round(rng.lognormal(np.log(800), 0.5, n_rows)).astype(np.int64)
+    levy[rng.random(n_rows) < 0.3] = -1
+    mileage_codes = mileage.astype(np.int64)
+
+    df = pd.DataFrame({
+        "ID": np.arange(45_000_000, 45_000_000 + n_rows, dtype=np.int64),
+        "Price": price,
+        "Levy": _strings({v: "-" if v < 0 else str(v) for v in np.unique(levy)}, levy),
+        "Manufacturer": pd.Categorical.from_codes(manufacturer_codes, categories=MANUFACTURERS),
+        "Model": pd.Categorical.from_codes(model_codes, categories=[f"M{i:04d}" for i in range(N_MODELS)]),
+        "Prod. year": year,
+        "Category": _categorical(rng, *CATEGORIES["Category"], n_rows),
+        "Leather interior": _categorical(rng, *CATEGORIES["Leather interior"], n_rows),
+        "Fuel type": _categorical(rng, *CATEGORIES["Fuel type"], n_rows),
+        "Engine volume": _strings(engine_strings, engine_tenths),
+        "Mileage": _strings({v: f"{v} km" for v in np.unique(mileage_codes)}, mileage_codes),
+        "Cylinders": cylinders,
+        "Gear box type": _categorical(rng, *CATEGORIES["Gear box type"], n_rows),
+        "Drive wheels": _categorical(rng, *CATEGORIES["Drive wheels"], n_rows),
+        "Doors": _categorical(rng, *CATEGORIES["Doors"], n_rows),
+        "Wheel": _categorical(rng, *CATEGORIES["Wheel"], n_rows),
+        "Color": _categorical(rng, *CATEGORIES["Color"], n_rows),
+        "Airbags": airbags.astype(np.int64)
+    })
+    # Categories in sorted order, as pd.read_csv(dtype='category') produces
+    for col, dtype in DATASET_DTYPES.items():
+        if dtype == "category":
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def api_payloads(df) -> list:
+    """Listings as /predict payloads, in the numeric form CarFeatures expects"""
+    doors = {"02-Mar": 2, "04-May": 4, ">5": 5}
+    levy = pd.to_numeric(df["Levy"].astype(str), errors="coerce")
+    records = pd.DataFrame({
+        "Levy": levy.fillna(levy.median()),
+        "Manufacturer": df["Manufacturer"].astype(str),
+        "Model": df["Model"].astype(str),
+        "Prod. year": df["Prod. year"].astype(int),
+        "Category": df["Category"].astype(str),
+        "Leather interior": (df["Leather interior"].astype(str) == "Yes").astype(int),
+        "Fuel type": df["Fuel type"].astype(str),
+        "Engine volume": df["Engine volume"].astype(str).str.split(" ").str[0].astype(float),
+        "Mileage": df["Mileage"].astype(str).str.removesuffix(" km").astype(float),
+        "Cylinders": df["Cylinders"].astype(int),
+        "Gear box type": df["Gear box type"].astype(str),
+        "Drive wheels": df["Drive wheels"].astype(str),
+        "Doors": df["Doors"].astype(str).map(doors).astype(int),
+        "Wheel": df["Wheel"].astype(str),
+        "Color": df["Color"].astype(str),
+        "Airbags": df["Airbags"].astype(int)
+    })
+    return records.to_dict("records")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="CSV path to write the listings to")
+    args = parser.parse_args()
+    synthetic_listings(args.rows, args.seed).to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration for the production API
+
+Run with: gunicorn -c gunicorn.conf.py app:app
+
+The app, and with it the model, is imported once in the master process before
+the workers are forked (preload_app). The model's NumPy arrays are then shared
+copy-on-write between workers instead of being loaded once per worker.
+"""
+import gc
+import multiprocessing
+from car_price_prediction.config.configuration import ConfigurationManager
+
+serving_config = ConfigurationManager().get_serving_config()
+
+bind = serving_config.bind
+workers = serving_config.workers or multiprocessing.cpu_count()
+threads = serving_config.threads
+timeout = serving_config.timeout
+graceful_timeout = serving_config.graceful_timeout
+max_requests = serving_config.max_requests
+max_requests_jitter = max_requests // 10
+preload_app = True
+accesslog = '-'
+
+
+def pre_fork(server, worker):
+    """Move everything allocated so far out of the garbage collector's reach
+
+    Otherwise the first collection in each worker writes to the GC headers of
+    every object inherited from the master and un-shares those pages.
+    """
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Start the per-worker background threads"""
+    import app
+    app.start_background_tasks()
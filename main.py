@@ -1,10 +1,14 @@
 from car_price_prediction import logger
+from car_price_prediction.config.configuration import ConfigurationManager
+from car_price_prediction.pipeline.stage_runner import StageRunner
 from car_price_prediction.pipeline.stage_01_data_ingestion import DataIngestionTrainingPipeline
 from car_price_prediction.pipeline.stage_02_prepare_base_model import PrepareBaseModelTrainingPipeline
-from car_price_prediction.pipeline.stage_03_training import ModelTrainingPipeline
 from car_price_prediction.pipeline.stage_03_advanced_training import AdvancedModelTrainingPipeline
 from car_price_prediction.pipeline.stage_04_evaluation import EvaluationPipeline
-import sys
+from car_price_prediction.pipeline.stage_04_feature_importance import FeatureImportancePipeline
+from car_price_prediction.pipeline.stage_04_experiment_tracking import ExperimentTrackingPipeline
+from car_price_prediction.pipeline.stage_04_model_versioning import ModelVersioningPipeline
+import argparse
 import warnings
 import os
 import logging
@@ -21,69 +25,34 @@ os.environ['MLFLOW_TRACKING_URI'] = 'sqlite:///mlflow.db'
 os.environ['MLFLOW_REGISTRY_STORE_URI'] = 'sqlite:///mlflow.db'
 
 
-STAGE_NAME = "Data Ingestion stage"
-try:
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<") 
-   data_ingestion = DataIngestionTrainingPipeline()
-   data_ingestion.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-
-STAGE_NAME = "Prepare base model"
-try: 
-   logger.info(f"*******************")
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   prepare_base_model = PrepareBaseModelTrainingPipeline()
-   prepare_base_model.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-
-STAGE_NAME = "Training"
-use_advanced = '--advanced' in sys.argv or True  # Use advanced training by default
-try: 
-   logger.info(f"*******************")
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   
-   if use_advanced:
-      logger.info("Using ADVANCED training pipeline with model comparison and MLflow tracking")
-      model_trainer = AdvancedModelTrainingPipeline()
-   else:
-      logger.info("Using BASIC training pipeline")
-      model_trainer = ModelTrainingPipeline()
-   
-   model_trainer.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-
-
-
-STAGE_NAME = "Evaluation stage"
-try:
-   logger.info(f"*******************")
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   model_evalution = EvaluationPipeline()
-   model_evalution.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-
-
-
+# Stage names match dvc.yaml, which declares their deps, params and outs
+PIPELINES = {
+    'data_ingestion': DataIngestionTrainingPipeline,
+    'prepare_base_model': PrepareBaseModelTrainingPipeline,
+    'training': AdvancedModelTrainingPipeline,
+    'evaluation': EvaluationPipeline,
+    'feature_importance': FeatureImportancePipeline,
+    'experiment_tracking': ExperimentTrackingPipeline,
+    'model_versioning': ModelVersioningPipeline
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline stages that are out of date")
+    parser.add_argument("stages", nargs="*", metavar="stage",
+                        help=f"One of {', '.join(PIPELINES)} (default: stage_runner.targets in config.yaml)")
+    parser.add_argument("--force", action="store_true", help="Run the named stages even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run")
+    parser.add_argument("--workers", type=int,
+                        help="Stage processes to run concurrently (default: stage_runner.workers in config.yaml)")
+    args = parser.parse_args()
+    unknown = [stage for stage in args.stages if stage not in PIPELINES]
+    if unknown:
+        parser.error(f"unknown stages {unknown}")
+
+    runner = StageRunner(ConfigurationManager().get_stage_runner_config(), PIPELINES)
+    runner.run(args.stages, force=args.force, dry_run=args.dry_run, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,115 +3,53 @@ Advanced preprocessing and feature engineering for car price prediction
 """
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from pathlib import Path
+from sklearn.model_selection import train_test_split
 from car_price_prediction import logger
+from car_price_prediction.components.preprocessing_pipeline import PreprocessingPipeline
+from car_price_prediction.components.field_parsers import parse_numeric_column
+from car_price_prediction.components.data_ingestion import iter_dataset_chunks
 import warnings
 warnings.filterwarnings('ignore')
 
 
 class AdvancedPreprocessor:
-    """Advanced data preprocessing with feature engineering"""
+    """Advanced data preprocessing with feature engineering
     
-    def __init__(self):
-        self.scaler = StandardScaler()
-        self.label_encoders = {}
-        self.feature_stats = {}
+    Row-level cleaning (raw field parsing, missing targets, outliers) happens
+    here. Column transforms (imputation, engineered features, encoding and
+    scaling) are delegated to the fitted PreprocessingPipeline in ``pipeline``,
+    which is the artifact shared with evaluation and serving.
+    """
+    
+    def __init__(self, feature_columns=None):
+        self.pipeline = PreprocessingPipeline(feature_columns)
     
     def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and prepare raw data"""
+        df = self._clean_rows(df)
+        logger.info(f"Data cleaned: {df.shape[0]} rows, {df.shape[1]} columns")
+        return df
+    
+    def _clean_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """clean_data without logging, also applied to every streamed chunk"""
         df = df.copy()
         
         # Remove ID column (not useful for prediction)
         if 'ID' in df.columns:
             df = df.drop('ID', axis=1)
         
-        # Clean numeric columns with object type
-        # Robust parsing for Engine volume (e.g. '2.0 Turbo') and Mileage (e.g. '186005 km')
-        if 'Engine volume' in df.columns:
-            eng = df['Engine volume'].astype(str).str.replace(',', '.')
-            eng_num = eng.str.extract(r'([0-9]+(?:\.[0-9]+)?)', expand=False)
-            df['Engine volume'] = pd.to_numeric(eng_num, errors='coerce')
-
-        if 'Mileage' in df.columns:
-            mile = df['Mileage'].astype(str).str.replace('[^0-9]', '', regex=True)
-            mile = mile.replace('', '0')
-            df['Mileage'] = pd.to_numeric(mile, errors='coerce')
-        
-        # Handle Levy column (convert to numeric)
-        if 'Levy' in df.columns:
-            df['Levy'] = df['Levy'].replace('-', '0').astype(str)
-            df['Levy'] = pd.to_numeric(df['Levy'], errors='coerce').fillna(0)
+        # Clean numeric columns with object type, e.g. '186005 km', '-'. Engine
+        # volume stays raw: the pipeline reads both the volume and the turbo
+        # flag from strings such as '2.0 Turbo'
+        for col in ['Mileage', 'Levy']:
+            if col in df.columns:
+                df[col] = parse_numeric_column(col, df[col]).values
 
-        # Only drop rows missing Price (target); fill other numeric NaNs with median
+        # Only drop rows missing Price (target); other missing values are
+        # imputed by the pipeline with medians fitted on the training split
         if 'Price' in df.columns:
             df = df.dropna(subset=['Price'])
-
-        # Fill remaining numeric missing values with median
-        try:
-            df = df.fillna(df.median(numeric_only=True))
-        except Exception:
-            # fallback: fill numeric columns individually
-            num_cols = df.select_dtypes(include=[float, int]).columns
-            for c in num_cols:
-                df[c] = df[c].fillna(df[c].median())
-        
-        logger.info(f"Data cleaned: {df.shape[0]} rows, {df.shape[1]} columns")
-        return df
-    
-    def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create engineered features from raw features"""
-        df = df.copy()
-        
-        # Age of vehicle
-        df['Vehicle_Age'] = 2020 - df['Prod. year']
-        
-        # Engine size categories
-        df['Engine_Size_Category'] = pd.cut(df['Engine volume'], 
-                                             bins=[0, 1.5, 2.5, 3.5, float('inf')],
-                                             labels=['Small', 'Medium', 'Large', 'XLarge'])
-        
-        # Mileage categories
-        df['Mileage_Category'] = pd.cut(df['Mileage'], 
-                                        bins=[0, 50000, 100000, 150000, float('inf')],
-                                        labels=['Low', 'Medium', 'High', 'Very_High'])
-        
-        # Price per year
-        df['Price_per_Year'] = df['Price'] / (df['Vehicle_Age'] + 1)
-        
-        # Interaction features
-        df['Engine_Cylinders'] = df['Engine volume'] * df['Cylinders']
-        df['Mileage_Age_Interaction'] = df['Mileage'] * df['Vehicle_Age']
-        
-        # Premium indicators
-        df['Premium_Leather'] = (df['Leather interior'] == 'Yes').astype(int)
-        df['Premium_Airbags'] = (df['Airbags'] > 6).astype(int)
-        
-        logger.info(f"Features created: {df.shape[1]} features total")
-        return df
-    
-    def encode_categorical(self, df: pd.DataFrame, fit=True) -> pd.DataFrame:
-        """Encode categorical variables"""
-        df = df.copy()
-        
-        categorical_cols = df.select_dtypes(include='object').columns.tolist()
-        
-        for col in categorical_cols:
-            if col not in ['Engine_Size_Category', 'Mileage_Category']:  # Skip already encoded
-                if fit:
-                    le = LabelEncoder()
-                    df[col] = le.fit_transform(df[col].astype(str))
-                    self.label_encoders[col] = le
-                else:
-                    if col in self.label_encoders:
-                        le = self.label_encoders[col]
-                        df[col] = le.transform(df[col].astype(str))
-        
-        # Handle categorical features we created
-        for col in ['Engine_Size_Category', 'Mileage_Category']:
-            if col in df.columns:
-                df[col] = pd.factorize(df[col])[0]
-        
-        logger.info(f"Categorical variables encoded: {len(categorical_cols)} columns")
         return df
     
     def remove_outliers(self, df: pd.DataFrame, target_col='Price', iqr_multiplier=1.5) -> pd.DataFrame:
@@ -123,13 +61,7 @@ class AdvancedPreprocessor:
             logger.warning("remove_outliers called with empty dataframe")
             return df
 
-        Q1 = df[target_col].quantile(0.25)
-        Q3 = df[target_col].quantile(0.75)
-        IQR = Q3 - Q1
-
-        # Define bounds
-        lower_bound = Q1 - (iqr_multiplier * IQR)
-        upper_bound = Q3 + (iqr_multiplier * IQR)
+        lower_bound, upper_bound = self.outlier_bounds(df[target_col], iqr_multiplier)
 
         # Filter data
         initial_rows = len(df)
@@ -140,36 +72,288 @@ class AdvancedPreprocessor:
         logger.info(f"Outliers removed: {removed} rows ({pct:.1f}%)")
         return df
     
-    def normalize_features(self, X, fit=True):
-        """Normalize numeric features"""
-        if fit:
-            X_scaled = self.scaler.fit_transform(X)
-        else:
-            X_scaled = self.scaler.transform(X)
-        
-        return X_scaled
+    @staticmethod
+    def outlier_bounds(target, iqr_multiplier=1.5) -> tuple:
+        """Lower and upper IQR bounds of the target (missing values ignored)"""
+        target = pd.Series(target)
+        Q1 = target.quantile(0.25)
+        Q3 = target.quantile(0.75)
+        IQR = Q3 - Q1
+        return Q1 - (iqr_multiplier * IQR), Q3 + (iqr_multiplier * IQR)
+    
+    def split_features_target(self, df: pd.DataFrame, target_col='Price') -> tuple:
+        """Select the raw feature columns and the target"""
+        X = df[self.pipeline.raw_columns]
+        y = df[target_col]
+        return X, y
     
-    def preprocess(self, df: pd.DataFrame, target_col='Price', fit=True) -> tuple:
-        """Complete preprocessing pipeline"""
-        # Clean data
+    def clean(self, df: pd.DataFrame, target_col='Price') -> tuple:
+        """Clean data and remove outliers, returning raw features and target"""
         df = self.clean_data(df)
-        
-        # Remove outliers
         df = self.remove_outliers(df, target_col=target_col)
+        return self.split_features_target(df, target_col=target_col)
+    
+    def preprocess(self, df: pd.DataFrame, target_col='Price', fit=True, inplace=False) -> tuple:
+        """Complete preprocessing pipeline
         
-        # Create features
-        df = self.create_features(df)
+        Args:
+            inplace: Use the copy-free path, see preprocess_inplace
+        """
+        if inplace:
+            return self.preprocess_inplace(df, target_col=target_col, fit=fit)
         
-        # Encode categorical
-        df = self.encode_categorical(df, fit=fit)
+        X, y = self.clean(df, target_col=target_col)
         
-        # Separate features and target
-        X = df.drop(target_col, axis=1)
-        y = df[target_col]
+        if fit:
+            self.pipeline.fit(X)
         
-        # Normalize features
-        X_scaled = self.normalize_features(X, fit=fit)
-        X_scaled = pd.DataFrame(X_scaled, columns=X.columns)
+        X_scaled = pd.DataFrame(
+            self.pipeline.transform(X),
+            columns=self.pipeline.feature_names,
+            index=X.index
+        )
         
         logger.info(f"Preprocessing complete: X shape {X_scaled.shape}, y shape {y.shape}")
         return X_scaled, y
+    
+    def preprocess_inplace(self, df: pd.DataFrame, target_col='Price', fit=True,
+                           dtype=np.float32, fit_rows=None) -> tuple:
+        """Copy-free preprocessing into one preallocated matrix
+        
+        Takes ownership of ``df``: missing targets and outliers become a row
+        mask instead of filtered copies, and each raw feature column is
+        deleted from ``df`` as soon as it is written into the matrix.
+        
+        Args:
+            fit_rows: Function of the number of kept rows returning the
+                positions among them to fit on, e.g. the training split
+                from split_positions; defaults to all kept rows
+        
+        Returns:
+            Tuple of the scaled feature matrix (ndarray of ``dtype``) and the target
+        """
+        target = df[target_col].to_numpy(dtype=float)
+        known = ~np.isnan(target)
+        lower_bound, upper_bound = self.outlier_bounds(target[known])
+        rows = np.flatnonzero(known & (target >= lower_bound) & (target <= upper_bound))
+        
+        y = df[target_col].take(rows)
+        if fit:
+            X = self.pipeline.fit_transform_into(
+                df, rows, dtype=dtype, release=True,
+                fit_rows=fit_rows(len(rows)) if fit_rows is not None else None
+            )
+        else:
+            X = self.pipeline.transform_into(df, rows, dtype=dtype, release=True)
+        
+        logger.info(
+            f"Preprocessing complete (in place): {len(target) - len(rows)} rows dropped, "
+            f"X shape {X.shape}, y shape {y.shape}"
+        )
+        return X, y
+    
+    def fit_stream(self, source_path, target_col='Price', chunksize=100_000,
+                   sample_size=200_000, iqr_multiplier=1.5, random_state=42,
+                   fit_rows=None):
+        """Fit the pipeline and outlier bounds chunk by chunk
+        
+        Equivalent to ``preprocess(df, fit=True)`` without loading the file:
+        
+        - a pass over the target column alone keeps its exact value counts,
+          giving exact IQR bounds and the number of rows transform_stream
+          will write
+        - a pass over all columns collects exact vocabularies from the rows
+          within the bounds, so categories that only occur in outlier rows
+          drop out
+        - medians and scaler mean/var come from a uniform sample of
+          ``sample_size`` rows within the bounds (exact when fewer rows are kept)
+        
+        Args:
+            fit_rows: Function of the number of kept rows returning the
+                positions among them to fit on, as in preprocess_inplace.
+                The outlier bounds always come from every row.
+        
+        Returns:
+            Number of rows the transform pass will produce
+        """
+        target_counts = pd.Series(dtype=float)
+        n_rows = 0
+        for chunk in iter_dataset_chunks(source_path, chunksize, columns=[target_col]):
+            n_rows += len(chunk)
+            target = chunk[target_col].astype(float).dropna()
+            target_counts = target_counts.add(target.value_counts(), fill_value=0)
+        self.source_rows = n_rows
+        
+        target_counts = target_counts.sort_index()
+        q1, q3 = _quantiles_from_counts(target_counts, [0.25, 0.75])
+        iqr = q3 - q1
+        lower_bound, upper_bound = q1 - iqr_multiplier * iqr, q3 + iqr_multiplier * iqr
+        self.target_bounds = (lower_bound, upper_bound)
+        
+        in_bounds = (target_counts.index >= lower_bound) & (target_counts.index <= upper_bound)
+        n_kept = int(target_counts[in_bounds].sum())
+        
+        fitted = None
+        if fit_rows is not None:
+            fitted = np.zeros(n_kept, dtype=bool)
+            fitted[fit_rows(n_kept)] = True
+        
+        vocabularies = {col: set() for col in self.pipeline.categorical_columns}
+        reservoir = RowReservoir(sample_size, random_state=random_state)
+        offset = 0
+        for chunk in iter_dataset_chunks(source_path, chunksize):
+            chunk = self._clean_rows(chunk)
+            target = chunk[target_col].to_numpy(dtype=float)
+            chunk = chunk[(target >= lower_bound) & (target <= upper_bound)]
+            if fitted is not None:
+                end = offset + len(chunk)
+                chunk, offset = chunk[fitted[offset:end]], end
+            parsed = self.pipeline.parse(chunk)
+            for col in vocabularies:
+                vocabularies[col].update(parsed[col].unique())
+            reservoir.add(parsed)
+        
+        sample = reservoir.to_frame()
+        self.pipeline.fit_parsed(sample, vocabularies)
+        
+        n_cleaned = int(target_counts.sum())
+        logger.info(
+            f"Streaming fit over {n_rows} rows: {n_cleaned - n_kept} outliers, "
+            f"{n_kept} rows kept ({n_kept if fitted is None else int(fitted.sum())} fitted), "
+            f"statistics from a sample of {len(sample)}"
+        )
+        return n_kept
+    
+    def transform_stream(self, source_path, output_dir, n_rows, target_col='Price',
+                         chunksize=100_000):
+        """Last streaming pass: write the feature matrix and target to .npy files
+        
+        The file position of every written row goes to ``index.npy``; they are
+        the index labels the in-memory path gives the same rows.
+        
+        Args:
+            n_rows: Row count returned by fit_stream
+        
+        Returns:
+            Tuple of read-only memory-mapped X and y
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        X_path, y_path = output_dir / 'X.npy', output_dir / 'y.npy'
+        X = np.lib.format.open_memmap(X_path, mode='w+', dtype=np.float64,
+                                      shape=(n_rows, self.pipeline.n_features))
+        y = np.lib.format.open_memmap(y_path, mode='w+', dtype=np.float64, shape=(n_rows,))
+        index = np.lib.format.open_memmap(output_dir / 'index.npy', mode='w+', dtype=np.int64,
+                                          shape=(n_rows,))
+        
+        lower_bound, upper_bound = self.target_bounds
+        offset = 0
+        position = 0
+        for chunk in iter_dataset_chunks(source_path, chunksize):
+            chunk.index = pd.RangeIndex(position, position + len(chunk))
+            position += len(chunk)
+            chunk = self._clean_rows(chunk)
+            target = chunk[target_col].to_numpy(dtype=float)
+            keep = (target >= lower_bound) & (target <= upper_bound)
+            end = offset + int(keep.sum())
+            if end > n_rows:
+                raise ValueError(f"{source_path} changed between the streaming passes")
+            
+            X[offset:end] = self.pipeline.transform(chunk[keep])
+            y[offset:end] = target[keep]
+            index[offset:end] = chunk.index[keep]
+            offset = end
+        
+        if offset != n_rows:
+            raise ValueError(f"{source_path} changed between the streaming passes")
+        X.flush()
+        y.flush()
+        index.flush()
+        del X, y, index
+        
+        logger.info(f"Streamed {n_rows} preprocessed rows to {output_dir}")
+        return np.load(X_path, mmap_mode='r'), np.load(y_path, mmap_mode='r')
+    
+    def preprocess_stream(self, source_path, output_dir, target_col='Price',
+                          chunksize=100_000, sample_size=200_000, fit_rows=None):
+        """Streaming preprocessing of a CSV/Feather/Parquet file into on-disk arrays
+        
+        Peak memory is bounded by the chunk size and the statistics sample
+        instead of the size of the file.
+        """
+        n_rows = self.fit_stream(source_path, target_col=target_col, chunksize=chunksize,
+                                 sample_size=sample_size, fit_rows=fit_rows)
+        return self.transform_stream(source_path, output_dir, n_rows, target_col=target_col,
+                                     chunksize=chunksize)
+
+
+def split_positions(n_rows, test_size=0.2, random_state=42):
+    """Train and test positions of ``train_test_split`` over ``n_rows`` rows
+    
+    The split only depends on the row count, so the in-place and streaming
+    paths can fit on the training rows before their matrix exists and still
+    split like the in-memory path.
+    """
+    return train_test_split(np.arange(n_rows), test_size=test_size, random_state=random_state)
+
+
+class RowReservoir:
+    """Uniform random sample of a fixed number of rows from a stream of dataframes
+    
+    Algorithm R: keeps every row until the sample is full, then the i-th row
+    replaces a random slot with probability ``capacity / (i + 1)``.
+    """
+    
+    def __init__(self, capacity, random_state=None):
+        self.capacity = capacity
+        self.n_seen = 0
+        self.columns = None
+        self._rng = np.random.default_rng(random_state)
+    
+    def add(self, df: pd.DataFrame):
+        """Offer all rows of a chunk to the sample"""
+        arrays = {col: df[col].to_numpy() for col in df.columns}
+        free = max(self.capacity - self.n_seen, 0)
+        
+        if free:
+            head = {col: values[:free].copy() for col, values in arrays.items()}
+            if self.columns is None:
+                self.columns = head
+            else:
+                self.columns = {
+                    col: np.concatenate([self.columns[col], values])
+                    for col, values in head.items()
+                }
+        
+        n_rest = len(df) - free
+        if n_rest > 0:
+            positions = self.n_seen + free + np.arange(n_rest)
+            slots = (self._rng.random(n_rest) * (positions + 1)).astype(np.int64)
+            rows = np.flatnonzero(slots < self.capacity)
+            slots = slots[rows]
+            # Later rows win when several replace the same slot
+            _, last = np.unique(slots[::-1], return_index=True)
+            keep = len(slots) - 1 - last
+            for col, values in arrays.items():
+                self.columns[col][slots[keep]] = values[free:][rows[keep]]
+        
+        self.n_seen += len(df)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Sampled rows as a dataframe"""
+        return pd.DataFrame(self.columns or {})
+
+
+def _quantiles_from_counts(counts: pd.Series, quantiles):
+    """Linearly interpolated quantiles (as pandas/NumPy) from sorted value counts"""
+    values = counts.index.to_numpy(dtype=float)
+    cumulative = np.cumsum(counts.to_numpy())
+    n = cumulative[-1]
+    result = []
+    for q in quantiles:
+        position = (n - 1) * q
+        lower = int(np.floor(position))
+        below = values[np.searchsorted(cumulative, lower, side='right')]
+        above = values[np.searchsorted(cumulative, min(lower + 1, n - 1), side='right')]
+        result.append(below + (position - lower) * (above - below))
+    return result
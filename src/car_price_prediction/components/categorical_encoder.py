@@ -0,0 +1,95 @@
+"""
+Compiled categorical encoder for the serving path
+"""
+import numpy as np
+import pandas as pd
+
+
+UNKNOWN_CATEGORY_CODE = -1
+
+
+class CategoricalEncoder:
+    """Plain dict lookup tables for the categorical columns
+
+    Fitting a LabelEncoder per request is expensive and maps every category
+    to 0. The fitted PreprocessingPipeline registers each vocabulary once and
+    only lookups happen afterwards. Categories that were not seen during
+    training are mapped to ``unknown_code``.
+    """
+
+    def __init__(self, categories=None, unknown_code=UNKNOWN_CATEGORY_CODE):
+        """Initialize encoder
+
+        Args:
+            categories: Dictionary of column name -> ordered list of categories
+            unknown_code: Code returned for categories unseen during training
+        """
+        self.unknown_code = unknown_code
+        self.categories = {}
+        self.tables = {}
+        self._lookups = {}
+        for column, values in (categories or {}).items():
+            self.add_column(column, values)
+
+    @property
+    def columns(self):
+        """Columns handled by the encoder"""
+        return list(self.tables.keys())
+
+    def add_column(self, column, values):
+        """Register the ordered categories of a column"""
+        values = [str(v) for v in values]
+        self.categories[column] = pd.Index(values)
+        self.tables[column] = {value: code for code, value in enumerate(values)}
+        self._compile(column)
+
+    def extend_column(self, column, values):
+        """Append unseen categories after the existing ones, keeping their codes
+
+        Returns:
+            List of the categories that were added
+        """
+        table = self.tables[column]
+        added = [value for value in dict.fromkeys(str(v) for v in values) if value not in table]
+        if added:
+            first_code = len(self.categories[column])
+            self.categories[column] = self.categories[column].append(pd.Index(added))
+            for code, value in enumerate(added, start=first_code):
+                table[value] = code
+            self._compile(column)
+        return added
+
+    def add_alias(self, column, alias, category):
+        """Map an alternative spelling onto the code of an existing category"""
+        table = self.tables[column]
+        if category in table:
+            table[str(alias)] = table[category]
+            self._compile(column)
+
+    def _compile(self, column):
+        """Build the index used for vectorized lookups of a column"""
+        table = self.tables[column]
+        self._lookups[column] = (
+            pd.Index(list(table.keys())),
+            np.fromiter(table.values(), dtype=np.int64, count=len(table))
+        )
+
+    def encode_value(self, column, value):
+        """Encode a single value; columns without a table are passed through"""
+        table = self.tables.get(column)
+        if table is None:
+            return value
+        return table.get(str(value), self.unknown_code)
+
+    def encode_column(self, column, values) -> np.ndarray:
+        """Encode a whole column in one vectorized lookup"""
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            # Encode each category once; missing values (code -1) encode as 'nan'
+            table = np.append(
+                self.encode_column(column, values.cat.categories.to_series()),
+                self.encode_value(column, np.nan)
+            )
+            return table[values.cat.codes.to_numpy()]
+        keys, codes = self._lookups[column]
+        positions = keys.get_indexer(pd.Series(values, dtype=object).astype(str))
+        return np.where(positions >= 0, codes[positions], self.unknown_code)
@@ -0,0 +1,342 @@
+"""
+Tree ensembles flattened into NumPy node arrays for low-latency inference
+"""
+import json
+import hashlib
+import numpy as np
+from pathlib import Path
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.dummy import DummyRegressor
+from car_price_prediction import logger
+
+try:
+    from xgboost import XGBRegressor
+except ImportError:  # pragma: no cover - xgboost is a hard dependency of training
+    XGBRegressor = None
+
+
+# XGBoost objectives whose prediction is the raw margin
+IDENTITY_OBJECTIVES = {'reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror'}
+
+
+def file_digest(path):
+    """sha1 of a file's contents, used to tie a compiled model to its model.pkl"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CompiledTreeEnsemble:
+    """Tree ensemble stored as contiguous node arrays with a vectorized predictor
+
+    All trees share one set of arrays and are walked together, one level per
+    step, for every row at once. Leaves point to themselves so a fixed number
+    of steps (the deepest tree) needs no masking. Inputs are rounded to
+    float32 and leaf values are summed in tree order, as sklearn and XGBoost
+    do, so predictions are identical to ``model.predict``.
+
+    Node arrays:
+        feature: Split feature per node (0 for leaves)
+        threshold: Go left when ``x <= threshold`` (+inf for leaves)
+        left, right: Child node indices (the node itself for leaves)
+        missing: Child taken when the feature is NaN
+        value: Leaf value per node, already multiplied by the learning rate
+        roots: Root node of every tree; tree 0 is a single leaf holding the
+            base prediction
+    """
+
+    ARRAYS = ('roots', 'feature', 'threshold', 'left', 'right', 'missing', 'value')
+
+    def __init__(self, roots, feature, threshold, left, right, missing, value,
+                 max_depth, n_features, divisor=1.0, kind='', source_digest=None):
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.missing = np.ascontiguousarray(missing, dtype=np.intp)
+        self.value = np.ascontiguousarray(value)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.divisor = float(divisor)
+        self.kind = kind
+        self.source_digest = source_digest
+        # children[2 * node + went_left] lets one gather pick the next node
+        self.children = np.ascontiguousarray(np.column_stack([self.right, self.left]).ravel())
+
+    @property
+    def n_trees(self):
+        """Number of trees, excluding the base prediction leaf"""
+        return len(self.roots) - 1
+
+    @property
+    def n_nodes(self):
+        """Total number of nodes in all trees"""
+        return len(self.feature)
+
+    @classmethod
+    def from_model(cls, model):
+        """Compile a fitted RandomForest, GradientBoosting or XGBoost regressor
+
+        Raises:
+            ValueError: if the model type or configuration is not supported
+        """
+        if isinstance(model, RandomForestRegressor):
+            return cls._from_random_forest(model)
+        if isinstance(model, GradientBoostingRegressor):
+            return cls._from_gradient_boosting(model)
+        if XGBRegressor is not None and isinstance(model, XGBRegressor):
+            return cls._from_xgboost(model)
+        raise ValueError(f"Cannot compile model of type {type(model).__name__}")
+
+    @classmethod
+    def _from_sklearn_trees(cls, trees, n_features, base, scale, divisor, kind):
+        """Concatenate fitted sklearn ``tree_`` objects"""
+        builder = _NodeArrayBuilder(base, np.float64)
+        for tree in trees:
+            is_leaf = tree.children_left == -1
+            builder.add_tree(
+                feature=tree.feature,
+                threshold=tree.threshold,
+                left=tree.children_left,
+                right=tree.children_right,
+                # sklearn regressors cannot route NaN in this version; keep the walk total
+                missing=tree.children_right,
+                value=scale * tree.value[:, 0, 0],
+                is_leaf=is_leaf,
+                depth=tree.max_depth
+            )
+        return builder.build(cls, n_features, divisor, kind)
+
+    @classmethod
+    def _from_random_forest(cls, model):
+        if model.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        # Forest prediction: sum of tree predictions divided by the number of trees
+        return cls._from_sklearn_trees(
+            trees, model.n_features_in_, base=0.0, scale=1.0,
+            divisor=len(trees), kind='random_forest'
+        )
+
+    @classmethod
+    def _from_gradient_boosting(cls, model):
+        init = model.init_
+        if not isinstance(init, DummyRegressor) or init.strategy not in ('mean', 'median', 'quantile', 'constant'):
+            raise ValueError("Only gradient boosting with a constant init estimator can be compiled")
+        trees = [stage[0].tree_ for stage in model.estimators_]
+        # Boosting prediction: init + sum of learning_rate * tree prediction, in stage order
+        return cls._from_sklearn_trees(
+            trees, model.n_features_in_, base=float(np.ravel(init.constant_)[0]),
+            scale=model.learning_rate, divisor=1.0, kind='gradient_boosting'
+        )
+
+    @classmethod
+    def _from_xgboost(cls, model):
+        booster = model.get_booster()
+        learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+        gbm = learner['gradient_booster']
+
+        if gbm['name'] != 'gbtree':
+            raise ValueError(f"Cannot compile XGBoost booster '{gbm['name']}'")
+        if learner['objective']['name'] not in IDENTITY_OBJECTIVES:
+            raise ValueError(f"Cannot compile XGBoost objective '{learner['objective']['name']}'")
+        if int(learner['learner_model_param']['num_target']) != 1:
+            raise ValueError("Only single-target XGBoost models can be compiled")
+
+        trees = gbm['model']['trees']
+        best_iteration = booster.attr('best_iteration')
+        if best_iteration is not None:
+            # predict() stops at the best iteration after early stopping
+            per_round = int(gbm['model']['gbtree_model_param']['num_parallel_tree'])
+            trees = trees[:(int(best_iteration) + 1) * per_round]
+
+        base = np.float32(float(learner['learner_model_param']['base_score']))
+        builder = _NodeArrayBuilder(base, np.float32)
+        for tree in trees:
+            if any(tree['split_type']):
+                raise ValueError("XGBoost categorical splits cannot be compiled")
+            left = np.asarray(tree['left_children'])
+            right = np.asarray(tree['right_children'])
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            is_leaf = left == -1
+            # XGBoost goes left when x < condition; for float32 inputs that is
+            # x <= the next float32 below the condition
+            threshold = np.nextafter(conditions, np.float32(-np.inf)).astype(np.float64)
+            default_left = np.asarray(tree['default_left'], dtype=bool)
+            builder.add_tree(
+                feature=np.asarray(tree['split_indices']),
+                threshold=threshold,
+                left=left,
+                right=right,
+                missing=np.where(default_left, left, right),
+                value=conditions,
+                is_leaf=is_leaf,
+                depth=_tree_depth(left, right)
+            )
+        return builder.build(cls, int(learner['learner_model_param']['num_feature']), 1.0, 'xgboost')
+
+    # Up to this many row x node decisions, evaluate every split at once
+    DECISION_BUDGET = 1 << 15
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node reached in every tree, shape (n_rows, n_trees + 1)"""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input with {self.n_features} features, got shape {X.shape}")
+
+        has_missing = np.isnan(X).any()
+        if len(X) * self.n_nodes <= self.DECISION_BUDGET:
+            return self._apply_all_splits(X, has_missing)
+        return self._apply_by_level(X, has_missing)
+
+    def _apply_all_splits(self, X, has_missing) -> np.ndarray:
+        """Decide every split up front, then each level is a single gather
+
+        Cheapest for a few rows of a small ensemble (boosted trees).
+        """
+        x = X[:, self.feature]
+        next_node = np.where(x <= self.threshold, self.left, self.right)
+        if has_missing:
+            next_node = np.where(np.isnan(x), self.missing, next_node)
+
+        # Row r's copy of node i lives at r * n_nodes + i in the flattened table
+        row_offset = np.arange(0, next_node.size, self.n_nodes)[:, np.newaxis]
+        flat_next = (next_node + row_offset).ravel()
+        node = self.roots + row_offset
+        for _ in range(self.max_depth):
+            node = flat_next.take(node)
+        return node - row_offset
+
+    def _apply_by_level(self, X, has_missing) -> np.ndarray:
+        """Walk all trees one level per step, only touching the visited nodes
+
+        Used for larger batches and ensembles with many nodes (deep forests).
+        """
+        # Gather from the flattened input: row r, feature f is at r * n_features + f
+        flat = X.ravel()
+        row_offset = np.arange(0, X.size, self.n_features)[:, np.newaxis]
+        node = np.repeat(self.roots[np.newaxis, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            x = flat.take(self.feature.take(node) + row_offset)
+            went_left = x <= self.threshold.take(node)
+            next_node = self.children.take(node * 2 + went_left)
+            if has_missing:
+                next_node = np.where(np.isnan(x), self.missing.take(node), next_node)
+            node = next_node
+        return node
+
+    def predict(self, X) -> np.ndarray:
+        """Predict with the same rounding and summation order as the source model"""
+        leaf_values = self.value.take(self.apply(X))
+        # cumsum adds strictly left to right, matching the per-tree accumulation
+        prediction = np.cumsum(leaf_values, axis=1, dtype=self.value.dtype)[:, -1]
+        if self.divisor != 1.0:
+            prediction = prediction / self.divisor
+        return prediction
+
+    def agrees_with(self, model, X, rtol=1e-9) -> bool:
+        """Whether predictions match ``model.predict`` on X
+
+        Forests add up their trees on several threads, so the last bits of
+        ``model.predict`` itself can vary between calls; allow for that.
+        """
+        return np.allclose(self.predict(X), model.predict(X), rtol=rtol, atol=0)
+
+    def save(self, path):
+        """Write the node arrays to an .npz file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            **{name: getattr(self, name) for name in self.ARRAYS},
+            max_depth=self.max_depth,
+            n_features=self.n_features,
+            divisor=self.divisor,
+            kind=self.kind,
+            source_digest=self.source_digest or ''
+        )
+        logger.info(
+            f"Compiled {self.kind} saved to {path}: {self.n_trees} trees, "
+            f"{self.n_nodes} nodes, depth {self.max_depth}"
+        )
+
+    @staticmethod
+    def save_placeholder(path, reason):
+        """Write a compiled model file without node arrays
+
+        Used when the model cannot be compiled, so the training output always
+        exists; load returns None for it and the API serves model.pkl.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, reason=reason)
+        logger.info(f"No compiled model exported, placeholder saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load node arrays written by save, None for a placeholder"""
+        with np.load(Path(path), allow_pickle=False) as data:
+            if 'roots' not in data.files:
+                logger.info(f"No compiled model in {path}: {data['reason']}")
+                return None
+            compiled = cls(
+                **{name: data[name] for name in cls.ARRAYS},
+                max_depth=int(data['max_depth']),
+                n_features=int(data['n_features']),
+                divisor=float(data['divisor']),
+                kind=str(data['kind']),
+                source_digest=str(data['source_digest']) or None
+            )
+        logger.info(f"Compiled {compiled.kind} loaded from {path}")
+        return compiled
+
+
+class _NodeArrayBuilder:
+    """Accumulates per-tree node arrays with global node indices"""
+
+    def __init__(self, base, dtype):
+        self.dtype = dtype
+        self.parts = {name: [] for name in CompiledTreeEnsemble.ARRAYS if name != 'roots'}
+        self.roots = []
+        self.n_nodes = 0
+        self.max_depth = 0
+        # Tree 0: a single leaf holding the base prediction, so it is summed first
+        self.add_tree(
+            feature=np.zeros(1), threshold=np.zeros(1), left=np.full(1, -1),
+            right=np.full(1, -1), missing=np.full(1, -1),
+            value=np.array([base], dtype=dtype), is_leaf=np.ones(1, dtype=bool), depth=0
+        )
+
+    def add_tree(self, feature, threshold, left, right, missing, value, is_leaf, depth):
+        offset = self.n_nodes
+        n = len(is_leaf)
+        own = np.arange(n) + offset
+        self.parts['feature'].append(np.where(is_leaf, 0, feature))
+        self.parts['threshold'].append(np.where(is_leaf, np.inf, threshold))
+        self.parts['left'].append(np.where(is_leaf, own, np.asarray(left) + offset))
+        self.parts['right'].append(np.where(is_leaf, own, np.asarray(right) + offset))
+        self.parts['missing'].append(np.where(is_leaf, own, np.asarray(missing) + offset))
+        self.parts['value'].append(np.where(is_leaf, value, 0).astype(self.dtype))
+        self.roots.append(offset)
+        self.n_nodes += n
+        self.max_depth = max(self.max_depth, int(depth))
+
+    def build(self, cls, n_features, divisor, kind):
+        arrays = {name: np.concatenate(parts) for name, parts in self.parts.items()}
+        return cls(
+            roots=np.asarray(self.roots), **arrays, max_depth=self.max_depth,
+            n_features=n_features, divisor=divisor, kind=kind
+        )
+
+
+def _tree_depth(left, right):
+    """Depth of a tree given child index arrays (-1 for leaves)"""
+    depth = np.zeros(len(left), dtype=int)
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max())
@@ -1,11 +1,122 @@
 import os
 import zipfile
+import pandas as pd
 from urllib.request import urlretrieve
 from car_price_prediction import logger
 from car_price_prediction.utils.common import get_size
 from car_price_prediction.entity.config_entity import DataIngestionConfig
 from pathlib import Path
 
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+    from pyarrow import parquet
+except ImportError:
+    pa = None
+    feather = None
+    parquet = None
+
+
+# Explicit dtypes so the listings are never re-inferred. Raw string fields
+# ('186005 km', '2.0 Turbo', '-') stay categoricals: each distinct value is
+# stored and parsed once. Numeric columns are float64 so blank cells load as
+# NaN (and rows without a Price are dropped by clean_data) instead of failing
+# the int64 parse.
+DATASET_DTYPES = {
+    'ID': 'float64',
+    'Price': 'float64',
+    'Levy': 'category',
+    'Manufacturer': 'category',
+    'Model': 'category',
+    'Prod. year': 'float64',
+    'Category': 'category',
+    'Leather interior': 'category',
+    'Fuel type': 'category',
+    'Engine volume': 'category',
+    'Mileage': 'category',
+    'Cylinders': 'float64',
+    'Gear box type': 'category',
+    'Drive wheels': 'category',
+    'Doors': 'category',
+    'Wheel': 'category',
+    'Color': 'category',
+    'Airbags': 'float64'
+}
+
+CACHE_SUFFIX = '.feather'
+
+
+def dataset_cache_path(csv_path) -> Path:
+    """Columnar cache written next to an extracted CSV"""
+    return Path(csv_path).with_suffix(CACHE_SUFFIX)
+
+
+def _source_metadata(csv_path) -> dict:
+    """Size and mtime of the CSV a cache was built from"""
+    stat = Path(csv_path).stat()
+    return {b'source_size': str(stat.st_size).encode(), b'source_mtime_ns': str(stat.st_mtime_ns).encode()}
+
+
+def read_dataset_csv(csv_path) -> pd.DataFrame:
+    """Parse the listings CSV with the explicit dataset dtypes"""
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    dtypes = {col: dtype for col, dtype in DATASET_DTYPES.items() if col in columns}
+    return pd.read_csv(csv_path, dtype=dtypes)
+
+
+def load_dataset(csv_path) -> pd.DataFrame:
+    """Load the listings from the columnar cache, falling back to the CSV
+
+    The Feather file is uncompressed and memory-mapped, so numeric columns
+    are not copied and categoricals arrive already dictionary-encoded.
+    """
+    csv_path = Path(csv_path)
+    cache_path = dataset_cache_path(csv_path)
+    if feather is not None and cache_path.exists():
+        table = feather.read_table(cache_path, memory_map=True)
+        metadata = table.schema.metadata or {}
+        source = _source_metadata(csv_path) if csv_path.exists() else None
+        if source is None or all(metadata.get(key) == value for key, value in source.items()):
+            logger.info(f"Dataset loaded from cache {cache_path}")
+            return table.to_pandas(split_blocks=True)
+        logger.warning(f"Dataset cache {cache_path} is older than {csv_path}, reading the CSV")
+
+    logger.info(f"Dataset loaded from {csv_path}")
+    return read_dataset_csv(csv_path)
+
+
+def iter_dataset_chunks(path, chunksize=100_000, columns=None):
+    """Yield the listings in a CSV, Feather or Parquet file as dataframe chunks
+
+    Only one chunk is materialized at a time, so files larger than memory
+    can be processed in passes.
+
+    Args:
+        columns: Only read these columns, defaults to all of them
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == '.csv':
+        header = pd.read_csv(path, nrows=0).columns
+        selected = header if columns is None else columns
+        dtypes = {col: dtype for col, dtype in DATASET_DTYPES.items() if col in selected}
+        yield from pd.read_csv(path, dtype=dtypes, usecols=columns, chunksize=chunksize)
+        return
+
+    if suffix not in (CACHE_SUFFIX, '.parquet'):
+        raise ValueError(f"Unsupported dataset format: {path}")
+    if pa is None:
+        raise ImportError(f"pyarrow is required to read {path}")
+
+    if suffix == CACHE_SUFFIX:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        for offset in range(0, table.num_rows, chunksize):
+            yield table.slice(offset, chunksize).to_pandas(split_blocks=True)
+    else:
+        for batch in parquet.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas(split_blocks=True)
+
 class DataIngestion:
     def __init__(self, config: DataIngestionConfig):
         self.config = config
@@ -28,4 +139,37 @@ class DataIngestion:
         os.makedirs(unzip_path, exist_ok=True)
         with zipfile.ZipFile(self.config.local_data_file, 'r') as zip_ref:
             zip_ref.extractall(unzip_path)
-        logger.info(f"Extracted zip file to {unzip_path}")
\ No newline at end of file
+            extracted = zip_ref.namelist()
+        logger.info(f"Extracted zip file to {unzip_path}")
+        return [Path(unzip_path) / name for name in extracted]
+
+    def build_dataset_cache(self, csv_paths=None):
+        """
+        Writes a typed Feather cache next to every extracted CSV.
+        """
+        if feather is None:
+            logger.warning("pyarrow is not installed; stages will read the CSV directly")
+            return []
+
+        if csv_paths is None:
+            csv_paths = Path(self.config.unzip_dir).glob('*.csv')
+
+        cache_paths = []
+        for csv_path in csv_paths:
+            csv_path = Path(csv_path)
+            if csv_path.suffix != '.csv':
+                continue
+            df = read_dataset_csv(csv_path)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}), **_source_metadata(csv_path)
+            })
+
+            # Write next to the target and rename so readers never see a partial file
+            cache_path = dataset_cache_path(csv_path)
+            tmp_path = cache_path.with_suffix(CACHE_SUFFIX + '.tmp')
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, cache_path)
+            logger.info(f"Dataset cache written to {cache_path} ({get_size(cache_path)})")
+            cache_paths.append(cache_path)
+        return cache_paths
\ No newline at end of file
@@ -12,44 +12,18 @@ class Evaluation:
     def __init__(self, config: EvaluationConfig):
         self.config = config
         self.model = None
-        self.scaler = None
-        self.label_encoders = None
 
     def load_model(self):
         """Load the trained model"""
         self.model = joblib.load(self.config.path_of_model)
         logger.info(f"Model loaded from {self.config.path_of_model}")
 
-    def load_scaler(self):
-        """Load the scaler used during training"""
-        scaler_path = self.config.path_of_model.parent / "scaler.pkl"
-        if os.path.exists(scaler_path):
-            self.scaler = joblib.load(scaler_path)
-            logger.info(f"Scaler loaded from {scaler_path}")
-        else:
-            logger.warning("Scaler not found, using unscaled data")
-
-    def load_label_encoders(self):
-        """Load the label encoders used during training"""
-        encoders_path = self.config.path_of_model.parent / "label_encoders.pkl"
-        if os.path.exists(encoders_path):
-            self.label_encoders = joblib.load(encoders_path)
-            logger.info(f"Label encoders loaded from {encoders_path}")
-        else:
-            logger.warning("Label encoders not found")
-
     def evaluate(self, X_test, y_test):
-        """Evaluate the model on test data"""
+        """Evaluate the model on test data already transformed by the preprocessing pipeline"""
         logger.info("Starting model evaluation")
         
-        # Scale test data if scaler exists
-        if self.scaler:
-            X_test_scaled = self.scaler.transform(X_test)
-        else:
-            X_test_scaled = X_test
-        
         # Make predictions
-        y_pred = self.model.predict(X_test_scaled)
+        y_pred = self.model.predict(X_test)
         
         # Calculate metrics
         mse = mean_squared_error(y_test, y_pred)
@@ -3,11 +3,145 @@ import numpy as np
 import json
 from pathlib import Path
 import matplotlib.pyplot as plt
+from scipy import sparse, stats
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.inspection import permutation_importance
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from car_price_prediction import logger
 import joblib
 
+try:
+    import xgboost
+    from xgboost import XGBRegressor
+except ImportError:
+    xgboost = None
+    XGBRegressor = None
+
+
+# Rows x features of permuted input passed to one predict call
+PERMUTATION_BATCH_ELEMENTS = 1 << 22
+
+
+def stratified_sample(y, max_rows, n_strata=10, random_state=42) -> np.ndarray:
+    """Row positions of a subsample stratified by target quantiles
+
+    Returns:
+        Sorted positions; all rows when there are at most max_rows
+    """
+    n_rows = len(y)
+    if max_rows is None or n_rows <= max_rows:
+        return np.arange(n_rows)
+    strata = pd.qcut(pd.Series(np.asarray(y)).rank(method='first'), n_strata, labels=False)
+    rows, _ = train_test_split(
+        np.arange(n_rows), train_size=max_rows, stratify=strata, random_state=random_state
+    )
+    return np.sort(rows)
+
+
+def correlated_feature_groups(X, threshold=0.8) -> list:
+    """Group features whose |Spearman correlation| reaches the threshold
+
+    Engineered features (car age, mileage bins, interactions) move with the
+    raw columns they come from; permuting them one at a time understates
+    the importance of the shared signal. Groups are the connected components
+    of the correlation graph.
+
+    Returns:
+        List of lists of column positions, ordered by their first column
+    """
+    n_features = X.shape[1]
+    if threshold is None or threshold > 1:
+        return [[i] for i in range(n_features)]
+
+    corr = pd.DataFrame(np.asarray(X)).corr(method='spearman').abs().fillna(0).to_numpy()
+    parent = list(range(n_features))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(corr >= threshold, k=1))):
+        parent[root(i)] = root(j)
+
+    groups = {}
+    for i in range(n_features):
+        groups.setdefault(root(i), []).append(i)
+    return sorted(groups.values())
+
+
+def tree_contributions(model, X):
+    """Per-row additive feature contributions of a tree ensemble
+
+    XGBoost gives exact TreeSHAP values (``pred_contribs``). For sklearn
+    forests and gradient boosting the contribution of a split is the change
+    in node mean along each row's decision path (Saabas); it is additive but
+    not a Shapley value. In both cases ``bias + contributions.sum(axis=1)``
+    is the model prediction, so the pass also serves as the predict call.
+
+    Returns:
+        Tuple of (contributions (n_rows, n_features), bias (n_rows,)), or
+        None if the model is not a supported tree ensemble
+    """
+    X = np.asarray(X, dtype=np.float32)
+    if XGBRegressor is not None and isinstance(model, XGBRegressor):
+        booster = model.get_booster()
+        best_iteration = getattr(model, 'best_iteration', None)
+        iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        contributions = booster.predict(
+            xgboost.DMatrix(X), pred_contribs=True, iteration_range=iteration_range
+        ).astype(np.float64)
+        return contributions[:, :-1], contributions[:, -1]
+
+    if isinstance(model, RandomForestRegressor) and model.n_outputs_ == 1:
+        indicator, _ = model.decision_path(X)
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        weights = sparse.vstack([_split_contributions(tree, X.shape[1]) for tree in trees])
+        n_trees = len(trees)
+        contributions = np.asarray((indicator @ weights).todense()) / n_trees
+        bias = sum(tree.value[0, 0, 0] for tree in trees) / n_trees
+        return contributions, np.full(len(X), bias)
+
+    if isinstance(model, GradientBoostingRegressor) and hasattr(model.init_, 'constant_'):
+        contributions = np.zeros(X.shape)
+        bias = float(np.ravel(model.init_.constant_)[0])
+        for stage in model.estimators_:
+            tree = stage[0].tree_
+            weights = _split_contributions(tree, X.shape[1])
+            contributions += model.learning_rate * np.asarray((tree.decision_path(X) @ weights).todense())
+            bias += model.learning_rate * tree.value[0, 0, 0]
+        return contributions, np.full(len(X), bias)
+
+    return None
+
+
+def _split_contributions(tree, n_features):
+    """Sparse (n_nodes, n_features) matrix: reaching a node adds its mean
+    minus its parent's mean to the parent's split feature"""
+    values = tree.value[:, 0, 0]
+    internal = np.nonzero(tree.children_left != -1)[0]
+    children = np.concatenate([tree.children_left[internal], tree.children_right[internal]])
+    parents = np.concatenate([internal, internal])
+    return sparse.csr_matrix(
+        (values[children] - values[parents], (children, tree.feature[parents])),
+        shape=(tree.node_count, n_features)
+    )
+
+
+def _interval_half_width(values, confidence=0.95) -> float:
+    """Half-width of the t confidence interval of the mean"""
+    if len(values) < 2:
+        return float('inf')
+    t = stats.t.ppf(0.5 + confidence / 2, len(values) - 1)
+    return float(t * np.std(values, ddof=1) / np.sqrt(len(values)))
+
+
+def _interval_is_tight(values, tolerance, floor=1e-4) -> bool:
+    return _interval_half_width(values) <= max(tolerance * abs(np.mean(values)), floor)
+
 
 class FeatureImportanceAnalyzer:
     """Analyze and visualize feature importance"""
@@ -16,6 +150,7 @@ class FeatureImportanceAnalyzer:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.feature_importance = None
+        self.contribution_importance = None
         self.feature_names = None
     
     def calculate_linear_coefficients(self, model, feature_names):
@@ -91,6 +226,98 @@ class FeatureImportanceAnalyzer:
             logger.error(f"Error calculating permutation importance: {e}")
             return None
     
+    def calculate_tree_contributions(self, model, X, feature_names):
+        """Mean absolute per-row contribution of each feature (see tree_contributions)
+        
+        Returns:
+            Predictions for X reconstructed from the contributions, or None
+            if the model is not a supported tree ensemble
+        """
+        try:
+            result = tree_contributions(model, X)
+            if result is None:
+                logger.info(f"No tree contributions for {type(model).__name__}")
+                return None
+            contributions, bias = result
+            
+            mean_abs = np.abs(contributions).mean(axis=0)
+            self.contribution_importance = pd.DataFrame({
+                'feature': feature_names,
+                'importance': mean_abs / mean_abs.sum() if mean_abs.sum() > 0 else mean_abs,
+                'mean_abs_contribution': mean_abs
+            }).sort_values('importance', ascending=False)
+            
+            logger.info(f"Tree contributions calculated on {len(X)} rows")
+            return bias + contributions.sum(axis=1)
+        except Exception as e:
+            logger.error(f"Error calculating tree contributions: {e}")
+            return None
+    
+    def calculate_grouped_permutation_importance(self, model, X, y, feature_names, groups=None,
+                                                 min_repeats=3, max_repeats=10, ci_tolerance=0.1,
+                                                 random_state=42, baseline_prediction=None):
+        """Permutation importance with adaptive repeats and grouped columns
+        
+        All columns of a group are shuffled with the same row permutation.
+        After min_repeats, a group stops being repeated once the 95%
+        confidence interval of its mean R² drop is within ci_tolerance of
+        the mean (or below 1e-4). The permuted copies of all groups that are
+        still active are scored in one batched predict call per repeat.
+        
+        Args:
+            groups: Lists of column positions; one group per feature if None
+            baseline_prediction: Predictions for X if already computed
+        """
+        try:
+            X = np.asarray(X, dtype=np.float64)
+            y = np.asarray(y, dtype=np.float64)
+            n_rows = len(X)
+            groups = groups or [[i] for i in range(X.shape[1])]
+            if baseline_prediction is None:
+                baseline_prediction = model.predict(X)
+            baseline = r2_score(y, baseline_prediction)
+            
+            rng = np.random.default_rng(random_state)
+            drops = [[] for _ in groups]
+            active = list(range(len(groups)))
+            n_predictions = 0
+            groups_per_call = max(1, PERMUTATION_BATCH_ELEMENTS // max(X.size, 1))
+            for repeat in range(max_repeats):
+                for start in range(0, len(active), groups_per_call):
+                    batch = active[start:start + groups_per_call]
+                    X_permuted = np.tile(X, (len(batch), 1))
+                    for k, g in enumerate(batch):
+                        columns = groups[g]
+                        block = X_permuted[k * n_rows:(k + 1) * n_rows]
+                        block[:, columns] = X[rng.permutation(n_rows)][:, columns]
+                    predictions = model.predict(X_permuted).reshape(len(batch), n_rows)
+                    n_predictions += 1
+                    for k, g in enumerate(batch):
+                        drops[g].append(baseline - r2_score(y, predictions[k]))
+                
+                if repeat + 1 >= min_repeats:
+                    active = [g for g in active if not _interval_is_tight(drops[g], ci_tolerance)]
+                if not active:
+                    break
+            
+            self.feature_importance = pd.DataFrame({
+                'feature': [' + '.join(feature_names[i] for i in group) for group in groups],
+                'importance': [float(np.mean(d)) for d in drops],
+                'std': [float(np.std(d)) for d in drops],
+                'ci_half_width': [_interval_half_width(d) for d in drops],
+                'n_repeats': [len(d) for d in drops]
+            }).sort_values('importance', ascending=False)
+            
+            self.feature_names = feature_names
+            logger.info(
+                f"Permutation importance of {len(groups)} feature groups on {n_rows} rows: "
+                f"{sum(len(d) for d in drops)} permutations in {n_predictions} predict calls"
+            )
+            return self.feature_importance
+        except Exception as e:
+            logger.error(f"Error calculating grouped permutation importance: {e}")
+            return None
+    
     def plot_feature_importance(self, top_n=15, figsize=(12, 6)):
         """Plot feature importance"""
         if self.feature_importance is None:
@@ -141,7 +368,13 @@ class FeatureImportanceAnalyzer:
                 json.dump(importance_dict, f, indent=4)
             logger.info(f"Feature importance saved to {json_path}")
             
-            return {'csv': csv_path, 'json': json_path}
+            paths = {'csv': csv_path, 'json': json_path}
+            if self.contribution_importance is not None:
+                contributions_path = self.output_dir / 'tree_contributions.csv'
+                self.contribution_importance.to_csv(contributions_path, index=False)
+                logger.info(f"Tree contribution importance saved to {contributions_path}")
+                paths['contributions'] = contributions_path
+            return paths
         except Exception as e:
             logger.error(f"Error saving feature importance: {e}")
             return None
@@ -184,10 +417,38 @@ class FeatureImportanceAnalyzer:
 class FeatureAnalysisPipeline:
     """Complete pipeline for feature analysis"""
     
-    def __init__(self, model, feature_names, output_dir='artifacts/feature_importance'):
+    def __init__(self, model, feature_names, output_dir='artifacts/feature_importance', config=None):
+        """
+        Args:
+            config: FeatureImportanceConfig; without one the full sklearn
+                permutation importance is used
+        """
         self.model = model
-        self.feature_names = feature_names
+        self.feature_names = list(feature_names)
+        self.config = config
         self.analyzer = FeatureImportanceAnalyzer(output_dir)
+        self.groups = None
+    
+    def run_fast_permutation(self, X_test, y_test):
+        """Tree contributions and grouped, adaptive permutation importance on a stratified sample"""
+        config = self.config
+        rows = stratified_sample(y_test, config.max_rows, random_state=config.random_state)
+        X = np.asarray(X_test)[rows]
+        y = np.asarray(y_test)[rows]
+        
+        baseline_prediction = None
+        if config.tree_contributions:
+            baseline_prediction = self.analyzer.calculate_tree_contributions(self.model, X, self.feature_names)
+        
+        self.groups = correlated_feature_groups(X, config.group_threshold)
+        return self.analyzer.calculate_grouped_permutation_importance(
+            self.model, X, y, self.feature_names, self.groups,
+            min_repeats=config.min_repeats,
+            max_repeats=config.max_repeats,
+            ci_tolerance=config.ci_tolerance,
+            random_state=config.random_state,
+            baseline_prediction=baseline_prediction
+        )
     
     def run_analysis(self, X_test=None, y_test=None):
         """Run complete feature analysis"""
@@ -202,10 +463,14 @@ class FeatureAnalysisPipeline:
             
             # If test data provided, also calculate permutation importance
             if X_test is not None and y_test is not None:
-                logger.info("Calculating permutation importance")
-                self.analyzer.calculate_permutation_importance(
-                    self.model, X_test, y_test, self.feature_names
-                )
+                if self.config is not None and self.config.mode == 'fast':
+                    logger.info("Calculating fast permutation importance")
+                    self.run_fast_permutation(X_test, y_test)
+                else:
+                    logger.info("Calculating permutation importance")
+                    self.analyzer.calculate_permutation_importance(
+                        self.model, X_test, y_test, self.feature_names
+                    )
             
             # Save and visualize
             self.analyzer.save_importance()
@@ -224,4 +489,11 @@ class FeatureAnalysisPipeline:
             'statistics': self.analyzer.get_feature_stats(),
             'total_features': len(self.feature_names)
         }
+        if self.analyzer.contribution_importance is not None:
+            top = self.analyzer.contribution_importance.head(10)
+            report['tree_contributions'] = dict(zip(top['feature'], top['importance'].round(6)))
+        if self.groups is not None:
+            report['feature_groups'] = [
+                [self.feature_names[i] for i in group] for group in self.groups if len(group) > 1
+            ]
         return report
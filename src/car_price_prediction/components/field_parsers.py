@@ -0,0 +1,119 @@
+"""
+Parsers for the raw string fields of the listings ('2.0 Turbo', '186005 km', '-')
+"""
+import re
+import numpy as np
+import pandas as pd
+
+
+_NUMBER_PATTERN = re.compile(r'[0-9]+(?:\.[0-9]+)?')
+_NON_DIGIT_PATTERN = re.compile(r'[^0-9]')
+_TURBO_PATTERN = re.compile(r'turbo', re.IGNORECASE)
+
+
+def _parse_engine_volume(value):
+    """Parse strings like '2.0 Turbo' or '1,6'"""
+    match = _NUMBER_PATTERN.search(str(value).replace(',', '.'))
+    return float(match.group(0)) if match else np.nan
+
+
+def _parse_mileage(value):
+    """Parse strings like '186005 km'"""
+    digits = _NON_DIGIT_PATTERN.sub('', str(value))
+    return float(digits) if digits else 0.0
+
+
+def _parse_levy(value):
+    """Levy is '-' when not applicable"""
+    return 0.0
+
+
+FIELD_PARSERS = {
+    'Engine volume': _parse_engine_volume,
+    'Mileage': _parse_mileage,
+    'Levy': _parse_levy
+}
+
+
+def parse_numeric_value(column, value):
+    """Parse a single raw numeric field, returning NaN when it is unusable"""
+    if value is None:
+        parsed = np.nan
+    else:
+        try:
+            parsed = float(value)
+        except (TypeError, ValueError):
+            parser = FIELD_PARSERS.get(column)
+            parsed = parser(value) if parser else np.nan
+    if column == 'Levy' and parsed != parsed:
+        return 0.0
+    return parsed
+
+
+def parse_turbo_value(value):
+    """1.0 if a raw 'Engine volume' value marks a turbo engine, else 0.0"""
+    return 1.0 if value is not None and _TURBO_PATTERN.search(str(value)) else 0.0
+
+
+def factorize_column(values: pd.Series) -> tuple:
+    """Distinct values of a column and the position of each row among them
+
+    Categoricals reuse their codes; other columns are factorized. Missing
+    values get code -1.
+
+    Returns:
+        Tuple of (codes ndarray, uniques)
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+def broadcast(parsed_uniques, codes, missing_value=np.nan) -> np.ndarray:
+    """Expand values parsed per distinct string back to one value per row"""
+    table = np.append(np.asarray(parsed_uniques, dtype=float), missing_value)
+    return table[codes]
+
+
+def _parse_uniques(column, uniques) -> np.ndarray:
+    """Parse distinct raw values; plain numbers skip the field parser"""
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.to_numeric(uniques, errors='coerce').astype(float)
+    parser = FIELD_PARSERS.get(column)
+    if parser is not None:
+        needs_parsing = parsed.isna() & uniques.notna()
+        if needs_parsing.any():
+            parsed[needs_parsing] = uniques[needs_parsing].map(parser)
+    return parsed.to_numpy()
+
+
+def parse_numeric_column(column, values) -> pd.Series:
+    """Parse a whole raw numeric column
+
+    The raw fields have few distinct strings, so each one is parsed once and
+    the result broadcast back. Numeric columns pass through untouched.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+        parsed = values.astype(float)
+    else:
+        codes, uniques = factorize_column(values)
+        parsed = pd.Series(broadcast(_parse_uniques(column, uniques), codes), index=values.index)
+    if column == 'Levy':
+        parsed = parsed.fillna(0.0)
+    return parsed
+
+
+def parse_engine_column(values) -> tuple:
+    """Parse 'Engine volume' into the volume and the turbo flag in one factorization
+
+    Returns:
+        Tuple of (volume ndarray, turbo flag ndarray of 0.0/1.0)
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.to_numpy(dtype=float, copy=True), np.zeros(len(values))
+    codes, uniques = factorize_column(values)
+    volume = broadcast(_parse_uniques('Engine volume', uniques), codes)
+    turbo = broadcast([parse_turbo_value(value) for value in uniques], codes, missing_value=0.0)
+    return volume, turbo
@@ -0,0 +1,218 @@
+"""
+Incremental retraining on listings appended since the last model version
+"""
+import json
+import hashlib
+import numpy as np
+from pathlib import Path
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+from car_price_prediction import logger
+from car_price_prediction.components.compiled_model import file_digest
+
+try:
+    from xgboost import XGBRegressor
+except ImportError:
+    XGBRegressor = None
+
+
+def data_snapshot(data_path, n_rows):
+    """Identity of the dataset a model version was trained on
+
+    Stored in the ModelVersioning metadata so the next run can tell whether
+    the file only grew by appended rows.
+    """
+    data_path = Path(data_path)
+    return {
+        'path': str(data_path),
+        'size': data_path.stat().st_size,
+        'sha1': file_digest(data_path),
+        'n_rows': int(n_rows)
+    }
+
+
+def appended_rows(data_path, snapshot):
+    """Number of rows the dataset had at the snapshot if it has only been appended to
+
+    Returns:
+        Previous row count, or None when the file was rewritten (or shrank)
+    """
+    data_path = Path(data_path)
+    if not data_path.exists() or data_path.stat().st_size < snapshot['size']:
+        return None
+
+    digest = hashlib.sha1()
+    remaining = snapshot['size']
+    last = b''
+    with open(data_path, 'rb') as f:
+        while remaining:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+            last = block[-1:]
+
+    # The old file must end on a complete line for the new bytes to be new rows
+    if digest.hexdigest() != snapshot['sha1'] or last not in (b'\n', b''):
+        return None
+    return snapshot['n_rows']
+
+
+def check_drift(pipeline, model, X_new, y_new, reference_r2, n_reference, thresholds):
+    """Decide whether new listings can be absorbed incrementally
+
+    Args:
+        pipeline: Preprocessing pipeline the current model was trained with
+        model: Current model
+        X_new, y_new: Cleaned raw features and target of the new rows
+        reference_r2: Test R² recorded for the current model version
+        n_reference: Rows the current model was trained and tested on
+        thresholds: IncrementalTrainingConfig with the drift limits
+
+    Returns:
+        Report dictionary; ``drifted`` is True when a full retrain is needed
+    """
+    reasons = []
+    new_fraction = len(X_new) / max(n_reference, 1)
+    if new_fraction > thresholds.max_new_fraction:
+        reasons.append(f"{new_fraction:.0%} new rows exceeds {thresholds.max_new_fraction:.0%}")
+
+    # Feature shift in units of the fitted scaler: mean moves and spread ratio
+    X_scaled = pipeline.transform(X_new)
+    numeric = [
+        i for i, name in enumerate(pipeline.feature_names)
+        if name not in pipeline.categorical_columns
+    ]
+    mean_shift = np.abs(X_scaled[:, numeric].mean(axis=0))
+    std_ratio = X_scaled[:, numeric].std(axis=0) if len(X_new) > 1 else np.ones(len(numeric))
+    for position, i in enumerate(numeric):
+        name = pipeline.feature_names[i]
+        if mean_shift[position] > thresholds.max_mean_shift:
+            reasons.append(f"{name} mean moved {mean_shift[position]:.2f} std")
+        ratio = std_ratio[position]
+        if ratio > 0 and max(ratio, 1 / ratio) > thresholds.max_std_ratio:
+            reasons.append(f"{name} spread changed {ratio:.2f}x")
+
+    # Listings with categories the encoder has never seen
+    unseen = {}
+    for col in pipeline.categorical_columns:
+        rate = float(X_new[col].astype(str).map(pipeline.encoder.tables[col]).isna().mean())
+        unseen[col] = rate
+        if rate > thresholds.max_unseen_category_rate:
+            reasons.append(f"{rate:.0%} unseen {col} values")
+
+    # Accuracy of the current model on the new rows
+    new_r2 = float(r2_score(y_new, model.predict(X_scaled))) if len(y_new) > 1 else None
+    if new_r2 is not None and reference_r2 is not None and reference_r2 - new_r2 > thresholds.max_r2_drop:
+        reasons.append(f"R² on new rows {new_r2:.3f} vs {reference_r2:.3f}")
+
+    report = {
+        'drifted': bool(reasons),
+        'reasons': reasons,
+        'new_rows': int(len(X_new)),
+        'new_fraction': float(new_fraction),
+        'max_mean_shift': float(mean_shift.max()) if len(mean_shift) else 0.0,
+        'unseen_category_rate': unseen,
+        'new_rows_r2': new_r2
+    }
+    if reasons:
+        logger.info(f"Drift detected, full retrain needed: {'; '.join(reasons)}")
+    else:
+        logger.info(f"No drift on {len(X_new)} new rows (R² {new_r2})")
+    return report
+
+
+def rescale_model(model, old_mean, old_scale, new_mean, new_scale):
+    """Re-express a fitted model for inputs scaled with updated scaler statistics
+
+    Standard scaling is affine per feature, so a split ``x_old <= t`` is the
+    same as ``x_new <= a * t + b`` and linear coefficients can be rewritten
+    the same way. Predictions on the new scaling match the old model on the
+    old scaling, except for rows within float32 rounding of an XGBoost cut.
+
+    Raises:
+        ValueError: if the model type is not supported
+    """
+    a = np.asarray(old_scale) / np.asarray(new_scale)
+    b = (np.asarray(old_mean) - np.asarray(new_mean)) / np.asarray(new_scale)
+
+    if isinstance(model, RandomForestRegressor):
+        for estimator in model.estimators_:
+            _rescale_tree(estimator.tree_, a, b)
+    elif isinstance(model, GradientBoostingRegressor):
+        for stage in model.estimators_:
+            _rescale_tree(stage[0].tree_, a, b)
+    elif XGBRegressor is not None and isinstance(model, XGBRegressor):
+        _rescale_xgboost(model, a, b)
+    elif isinstance(model, LinearRegression):
+        model.intercept_ = model.intercept_ - np.dot(model.coef_, b / a)
+        model.coef_ = model.coef_ / a
+    else:
+        raise ValueError(f"Cannot rescale model of type {type(model).__name__}")
+    return model
+
+
+def _rescale_tree(tree, a, b):
+    """Move the thresholds of a fitted sklearn tree in place"""
+    threshold = tree.threshold
+    split = tree.children_left != -1
+    features = tree.feature[split]
+    threshold[split] = a[features] * threshold[split] + b[features]
+
+
+def _rescale_xgboost(model, a, b):
+    """Move the split conditions of every XGBoost tree via the JSON model
+
+    Histogram cut points are often equal to training values and XGBoost
+    splits on ``x < t``, so the moved condition is lowered by a few float32
+    ulps of its operands to keep those rows on the right after rounding.
+    """
+    booster = model.get_booster()
+    raw = json.loads(booster.save_raw(raw_format='json'))
+    tolerance = 4 * np.finfo(np.float32).eps
+    for tree in raw['learner']['gradient_booster']['model']['trees']:
+        left = np.asarray(tree['left_children'])
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float64)
+        features = np.asarray(tree['split_indices'])
+        split = left != -1
+        scaled = a[features[split]] * conditions[split]
+        shift = b[features[split]]
+        conditions[split] = scaled + shift - tolerance * (np.abs(scaled) + np.abs(shift) + 1e-3)
+        tree['split_conditions'] = conditions.tolist()
+    booster.load_model(bytearray(json.dumps(raw).encode()))
+
+
+def continue_training(model, X, y, extra_rounds=20, extra_trees=20):
+    """Grow a fitted ensemble on new rows instead of refitting it
+
+    XGBoost and gradient boosting add ``extra_rounds`` boosting rounds fitted
+    on the residuals of the current ensemble; random forests add
+    ``extra_trees`` trees via warm_start. An early-stopped XGBoost model
+    continues from its best round, without early stopping.
+
+    Raises:
+        ValueError: if the model cannot be trained incrementally
+    """
+    if XGBRegressor is not None and isinstance(model, XGBRegressor):
+        booster = model.get_booster()
+        best_iteration = booster.attr('best_iteration')
+        if best_iteration is not None:
+            # An early-stopped model predicts with the rounds up to its best one only
+            booster = booster[:int(best_iteration) + 1]
+        # New rows come without a validation set, so no early stopping here
+        model.set_params(n_estimators=extra_rounds, early_stopping_rounds=None)
+        model.fit(X, y, xgb_model=booster, verbose=False)
+        # A stale best_iteration would make predict() ignore the new rounds
+        model.get_booster().set_attr(best_iteration=None, best_score=None)
+        model.set_params(n_estimators=model.get_booster().num_boosted_rounds())
+    elif isinstance(model, (RandomForestRegressor, GradientBoostingRegressor)):
+        extra = extra_trees if isinstance(model, RandomForestRegressor) else extra_rounds
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + extra)
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+    else:
+        raise ValueError(f"{type(model).__name__} cannot be trained incrementally")
+    logger.info(f"{type(model).__name__} continued on {len(X)} new rows")
+    return model
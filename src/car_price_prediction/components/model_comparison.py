@@ -3,11 +3,15 @@ import numpy as np
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression
 from xgboost import XGBRegressor
-from sklearn.model_selection import cross_val_score, cross_validate
+from sklearn.model_selection import cross_val_score, cross_validate, check_cv, train_test_split
+from sklearn.base import clone
+from joblib import Parallel, delayed, cpu_count
+from threadpoolctl import threadpool_limits
 from car_price_prediction import logger
 import joblib
 from pathlib import Path
 import json
+import time
 
 
 class ModelFactory:
@@ -16,6 +20,7 @@ class ModelFactory:
     def __init__(self, random_state=42):
         self.random_state = random_state
         self.models = {}
+        self.fitted_models = {}
         self._initialize_models()
     
     def _initialize_models(self):
@@ -71,53 +76,283 @@ class ModelFactory:
             logger.error(f"Error training {model_name}: {e}")
             raise
     
-    def compare_models(self, X_train, y_train, X_test, y_test, cv_folds=5):
-        """Compare all models with cross-validation and test metrics"""
-        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+    def compare_models(self, X_train, y_train, X_test, y_test, cv_folds=5, n_jobs=-1,
+                       evict_losers=False, model_names=None, early_stopping_rounds=None):
+        """Compare all models with cross-validation and test metrics
+        
+        Every (model, fold) fit and the full-train fit of every model form one
+        flat job set that runs on a process pool. The pool gets the whole core
+        budget and each job a fixed share of it, so estimators never start
+        their own nested thread pools on top. The fitted full-train estimators
+        are kept in ``self.fitted_models`` so the winner can be used as-is.
+        
+        Args:
+            n_jobs: Total number of cores to use, -1 for all cores
+            evict_losers: Only keep the best fitted estimator seen so far in
+                memory instead of all of them
+            model_names: Models to compare, all of them by default
+            early_stopping_rounds: Let XGBoost stop early on a held-out part
+                of each training set
+        """
+        X_train = np.asarray(X_train)
+        y_train = np.asarray(y_train)
+        X_test = np.asarray(X_test)
+        y_test = np.asarray(y_test)
+        
+        names = list(model_names or self.models)
+        folds = list(check_cv(cv_folds, y_train, classifier=False).split(X_train, y_train))
+        # Full-train fits are the longest jobs, so they are scheduled first
+        jobs = [(name, None) for name in names]
+        jobs += [(name, fold) for fold in range(len(folds)) for name in names]
+        
+        pool, workers, threads = _job_pool(n_jobs, len(jobs))
+        logger.info(
+            f"Comparing {len(names)} models: {len(jobs)} jobs on "
+            f"{workers} workers x {threads} threads"
+        )
+        
+        start = time.perf_counter()
+        # Results are consumed as they arrive so evicted estimators are freed early
+        outputs = pool(
+            delayed(_fit_and_score)(
+                self.models[name], X_train, y_train,
+                X_test if fold is None else None, y_test if fold is None else None,
+                folds[fold] if fold is not None else None, threads,
+                early_stopping_rounds=early_stopping_rounds
+            )
+            for name, fold in jobs
+        )
+        
+        self.fitted_models = {}
+        by_model = {name: {'folds': {}, 'full': None} for name in names}
+        for (name, fold), output in zip(jobs, outputs):
+            if fold is not None:
+                by_model[name]['folds'][fold] = output
+                continue
+            
+            estimator = output.pop('estimator', None)
+            by_model[name]['full'] = output
+            if estimator is None:
+                continue
+            
+            # Hand back the model with the thread settings it was configured with
+            _set_n_jobs(estimator, self.models[name].get_params().get('n_jobs'))
+            if evict_losers and self.fitted_models:
+                (kept,) = self.fitted_models
+                if _selection_score(by_model[kept]['full']['metrics']) >= _selection_score(output['metrics']):
+                    logger.info(f"Evicting fitted {name}: {kept} scores higher")
+                    continue
+                logger.info(f"Evicting fitted {kept}: {name} scores higher")
+                self.fitted_models.clear()
+            self.fitted_models[name] = estimator
+        logger.info(f"Model comparison jobs finished in {time.perf_counter() - start:.1f}s")
         
         results = {}
+        for model_name, model_outputs in by_model.items():
+            fold_outputs = [model_outputs['folds'][fold] for fold in range(len(folds))]
+            full = model_outputs['full']
+            errors = [o['error'] for o in fold_outputs + [full] if 'error' in o]
+            if errors:
+                logger.error(f"Error evaluating {model_name}: {errors[0]}")
+                results[model_name] = {'error': errors[0]}
+                self.fitted_models.pop(model_name, None)
+                continue
+            
+            cv_scores = np.array([o['r2'] for o in fold_outputs])
+            metrics = full['metrics']
+            results[model_name] = {
+                'cv_mean': float(cv_scores.mean()),
+                'cv_std': float(cv_scores.std()),
+                **metrics
+            }
+            
+            fit_seconds = sum(o['seconds'] for o in fold_outputs + [full])
+            logger.info(
+                f"{model_name}: CV R² = {cv_scores.mean():.4f} ± {cv_scores.std():.4f}, "
+                f"Test R² = {metrics['test_r2']:.4f}, RMSE = {metrics['test_rmse']:.2f} "
+                f"({fit_seconds:.1f}s of fitting)"
+            )
         
-        for model_name, model in self.models.items():
-            logger.info(f"Evaluating {model_name}...")
+        return results
+
+
+    def successive_halving(self, X_train, y_train, X_test, y_test, cv_folds=5, n_jobs=-1,
+                           evict_losers=False, factor=3, min_rows=1000, min_estimators=20,
+                           early_stopping_rounds=None):
+        """Successive-halving selection followed by a full comparison of the finalists
+        
+        All candidates are first fitted on a small subsample of the training
+        rows, with proportionally fewer trees, and scored on a fixed
+        validation split. Only the best 1/factor advance to the next rung,
+        which has factor times more rows. The finalists then go through
+        compare_models. Models dropped on the way are reported in the same
+        format with the validation R² and test metrics of their last rung
+        (cv_std is 0 for a single split).
+        
+        Returns:
+            Tuple of (results per model, names of the finalists)
+        """
+        X_train = np.asarray(X_train)
+        y_train = np.asarray(y_train)
+        X_test = np.asarray(X_test)
+        y_test = np.asarray(y_test)
+        
+        # Nested subsamples: each rung uses a prefix of the same permutation
+        order = np.random.default_rng(self.random_state).permutation(len(X_train))
+        n_valid = max(1, len(order) // 5)
+        valid_idx, pool_idx = order[:n_valid], order[n_valid:]
+        
+        results = {}
+        candidates = list(self.models)
+        rows = min_rows
+        while len(candidates) > 1 and rows < len(pool_idx):
+            fold = (pool_idx[:rows], valid_idx)
+            share = rows / len(X_train)
+            pool, workers, threads = _job_pool(n_jobs, len(candidates))
             
-            try:
-                # Cross-validation scores
-                cv_scores = cross_val_score(
-                    model, X_train, y_train,
-                    cv=cv_folds,
-                    scoring='r2',
-                    n_jobs=-1
+            start = time.perf_counter()
+            outputs = dict(zip(candidates, pool(
+                delayed(_fit_and_score)(
+                    self.models[name], X_train, y_train, X_test, y_test, fold, threads,
+                    params=self._budget_params(name, share, min_estimators),
+                    early_stopping_rounds=early_stopping_rounds
                 )
-                
-                # Train on full training set and evaluate on test set
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-                
-                # Calculate metrics
+                for name in candidates
+            )))
+            
+            ranked = sorted(
+                candidates,
+                key=lambda name: outputs[name].get('r2', float('-inf')),
+                reverse=True
+            )
+            keep = max(1, int(np.ceil(len(candidates) / factor)))
+            for name in ranked[keep:]:
+                output = outputs[name]
+                if 'error' in output:
+                    results[name] = {'error': output['error']}
+                else:
+                    results[name] = {'cv_mean': output['r2'], 'cv_std': 0.0, **output['metrics']}
+            
+            logger.info(
+                f"Halving rung with {rows} rows ({time.perf_counter() - start:.1f}s): "
+                + ", ".join(f"{name} R² = {outputs[name].get('r2', float('nan')):.4f}" for name in ranked)
+                + f"; advancing {ranked[:keep]}"
+            )
+            candidates = ranked[:keep]
+            rows *= factor
+        
+        results.update(self.compare_models(
+            X_train, y_train, X_test, y_test, cv_folds, n_jobs=n_jobs,
+            evict_losers=evict_losers, model_names=candidates,
+            early_stopping_rounds=early_stopping_rounds
+        ))
+        return {name: results[name] for name in self.models}, candidates
+    
+    def _budget_params(self, model_name, share, min_estimators):
+        """Scale the number of trees of an ensemble to a share of the full budget"""
+        params = self.models[model_name].get_params()
+        if 'n_estimators' not in params:
+            return {}
+        n_estimators = int(round(params['n_estimators'] * share))
+        return {'n_estimators': min(params['n_estimators'], max(min_estimators, n_estimators))}
+
+
+def _selection_score(result):
+    """Score used to pick the best model: test R², errors rank last"""
+    if 'error' in result:
+        return float('-inf')
+    return result.get('test_r2', float('-inf'))
+
+
+def _resolve_core_budget(n_jobs):
+    """Number of cores for n_jobs in the joblib convention (-1 = all cores)"""
+    cores = cpu_count()
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, cores + 1 + n_jobs)
+    return min(n_jobs, cores)
+
+
+def _job_pool(n_jobs, n_tasks):
+    """Process pool sized to the core budget, and the thread share of each job"""
+    budget = _resolve_core_budget(n_jobs)
+    workers = min(budget, n_tasks)
+    threads = max(1, budget // workers)
+    pool = Parallel(n_jobs=workers, backend='loky', return_as='generator')
+    return pool, workers, threads
+
+
+def _set_n_jobs(estimator, n_jobs):
+    """Set the thread count of an estimator that has an n_jobs parameter"""
+    if 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=n_jobs)
+
+
+def _fit_estimator(estimator, X, y, early_stopping_rounds=None, random_state=42):
+    """Fit an estimator; XGBoost stops early on a held-out tenth of the rows"""
+    if early_stopping_rounds and isinstance(estimator, XGBRegressor):
+        X_fit, X_valid, y_fit, y_valid = train_test_split(
+            X, y, test_size=0.1, random_state=random_state
+        )
+        estimator.set_params(early_stopping_rounds=early_stopping_rounds)
+        estimator.fit(X_fit, y_fit, eval_set=[(X_valid, y_valid)], verbose=False)
+    else:
+        estimator.fit(X, y)
+    return estimator
+
+
+def _fit_and_score(model, X_train, y_train, X_test, y_test, fold, threads,
+                   params=None, early_stopping_rounds=None):
+    """Fit one comparison job in a pool worker
+    
+    Args:
+        model: Unfitted estimator, cloned before fitting
+        X_test, y_test: Test set to compute test metrics on, None to skip them
+        fold: (fit indices, validation indices) into the training set to fit
+            on a subset and report the validation R², or None to fit on the
+            full training set
+        threads: Threads the job may use, for the estimator and for BLAS/OpenMP
+        params: Parameter overrides, e.g. a smaller n_estimators
+        early_stopping_rounds: Early stopping for XGBoost, None to disable
+    
+    Returns:
+        Dictionary with the validation R² for fold jobs, test metrics when a
+        test set is given and the fitted estimator for full-train jobs;
+        'error' if fitting failed
+    """
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+    
+    start = time.perf_counter()
+    try:
+        estimator = clone(model)
+        if params:
+            estimator.set_params(**params)
+        _set_n_jobs(estimator, threads)
+        with threadpool_limits(limits=threads):
+            if fold is not None:
+                fit_idx, valid_idx = fold
+                _fit_estimator(estimator, X_train[fit_idx], y_train[fit_idx], early_stopping_rounds)
+                r2 = r2_score(y_train[valid_idx], estimator.predict(X_train[valid_idx]))
+                output = {'r2': float(r2)}
+            else:
+                _fit_estimator(estimator, X_train, y_train, early_stopping_rounds)
+                output = {'estimator': estimator}
+            
+            if X_test is not None:
+                y_pred = estimator.predict(X_test)
                 mse = mean_squared_error(y_test, y_pred)
-                rmse = np.sqrt(mse)
-                mae = mean_absolute_error(y_test, y_pred)
-                r2 = r2_score(y_test, y_pred)
-                
-                results[model_name] = {
-                    'cv_mean': float(cv_scores.mean()),
-                    'cv_std': float(cv_scores.std()),
-                    'test_r2': float(r2),
-                    'test_rmse': float(rmse),
-                    'test_mae': float(mae),
+                output['metrics'] = {
+                    'test_r2': float(r2_score(y_test, y_pred)),
+                    'test_rmse': float(np.sqrt(mse)),
+                    'test_mae': float(mean_absolute_error(y_test, y_pred)),
                     'test_mse': float(mse)
                 }
-                
-                logger.info(
-                    f"{model_name}: CV R² = {cv_scores.mean():.4f} ± {cv_scores.std():.4f}, "
-                    f"Test R² = {r2:.4f}, RMSE = {rmse:.2f}"
-                )
-                
-            except Exception as e:
-                logger.error(f"Error evaluating {model_name}: {e}")
-                results[model_name] = {'error': str(e)}
-        
-        return results
+    except Exception as e:
+        return {'error': str(e), 'seconds': time.perf_counter() - start}
+    
+    output['seconds'] = time.perf_counter() - start
+    return output
 
 
 class ModelComparison:
@@ -127,13 +362,41 @@ class ModelComparison:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.comparison_results = None
+        self.factory = None
+        self.finalists = None
     
-    def run_comparison(self, X_train, y_train, X_test, y_test, cv_folds=5):
-        """Run model comparison"""
-        factory = ModelFactory()
-        self.comparison_results = factory.compare_models(
-            X_train, y_train, X_test, y_test, cv_folds
-        )
+    def run_comparison(self, X_train, y_train, X_test, y_test, cv_folds=5, n_jobs=-1,
+                       evict_losers=False, mode='full', halving_factor=3,
+                       halving_min_rows=1000, halving_min_estimators=20,
+                       early_stopping_rounds=None):
+        """Run model comparison
+        
+        Args:
+            n_jobs: Total core budget for the comparison, -1 for all cores
+            evict_losers: Keep only the best fitted estimator in memory
+            mode: 'full' cross-validates every model on all rows;
+                'successive_halving' drops weak models on small subsamples first
+            halving_factor: Rows grow and candidates shrink by this factor per rung
+            halving_min_rows: Rows in the first rung
+            halving_min_estimators: Fewest trees an ensemble is fitted with
+            early_stopping_rounds: XGBoost early stopping in successive halving mode
+        """
+        self.factory = ModelFactory()
+        if mode == 'successive_halving':
+            self.comparison_results, self.finalists = self.factory.successive_halving(
+                X_train, y_train, X_test, y_test, cv_folds, n_jobs=n_jobs,
+                evict_losers=evict_losers, factor=halving_factor,
+                min_rows=halving_min_rows, min_estimators=halving_min_estimators,
+                early_stopping_rounds=early_stopping_rounds
+            )
+        elif mode == 'full':
+            self.comparison_results = self.factory.compare_models(
+                X_train, y_train, X_test, y_test, cv_folds, n_jobs=n_jobs,
+                evict_losers=evict_losers
+            )
+            self.finalists = None
+        else:
+            raise ValueError(f"Unknown comparison mode: {mode}")
         return self.comparison_results
     
     def save_comparison(self):
@@ -154,14 +417,23 @@ class ModelComparison:
             logger.error("No comparison results available")
             return None
         
-        best_model_name = max(
-            self.comparison_results.items(),
-            key=lambda x: x[1].get('test_r2', float('-inf')) if 'error' not in x[1] else float('-inf')
-        )[0]
+        # Models dropped by successive halving were only scored on subsamples
+        candidates = [
+            item for item in self.comparison_results.items()
+            if self.finalists is None or item[0] in self.finalists
+        ]
+        best_model_name = max(candidates, key=lambda x: _selection_score(x[1]))[0]
         
         logger.info(f"Best model: {best_model_name}")
         return best_model_name
     
+    def get_best_estimator(self, best_model_name=None):
+        """Fitted full-train estimator of the best model, None if it was not kept"""
+        best_model_name = best_model_name or self.get_best_model()
+        if best_model_name is None or self.factory is None:
+            return None
+        return self.factory.fitted_models.get(best_model_name)
+    
     def get_comparison_summary(self):
         """Get a summary of the comparison"""
         if not self.comparison_results:
@@ -0,0 +1,319 @@
+"""
+Model loading, warm-up and readiness state for the serving path
+"""
+import time
+import hashlib
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from car_price_prediction import logger
+from car_price_prediction.components.preprocessing_pipeline import PreprocessingPipeline
+from car_price_prediction.components.compiled_model import CompiledTreeEnsemble, file_digest
+
+
+class ModelBundle:
+    """Model and preprocessing pipeline that are always served together"""
+
+    def __init__(self, model, preprocessor, version=None, load_seconds=0.0,
+                 compiled=None, compiled_max_rows=0):
+        self.model = model
+        self.preprocessor = preprocessor
+        self.version = version
+        self.load_seconds = load_seconds
+        self.compiled = compiled
+        self.compiled_max_rows = compiled_max_rows
+        self.warmup_seconds = 0.0
+        self.loaded_at = pd.Timestamp.now()
+
+    def predict(self, X):
+        """Predict with the compiled trees for small inputs, the model otherwise"""
+        if self.compiled is not None and len(X) <= self.compiled_max_rows:
+            return self.compiled.predict(X)
+        return self.model.predict(X)
+
+
+class ModelStore:
+    """Load the serving artifacts once at startup and track readiness
+
+    Request handlers read ``store.bundle`` once per request and never load
+    anything from disk. A reload builds and validates a complete new bundle
+    off to the side and publishes it with a single reference assignment, so
+    in-flight requests keep using the bundle they started with.
+    """
+
+    NOT_LOADED = 'not_loaded'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, model_path, preprocessor_path, warmup=True,
+                 compiled_model_path=None, compiled_max_rows=32):
+        self.model_path = Path(model_path)
+        self.preprocessor_path = Path(preprocessor_path)
+        self.compiled_model_path = Path(compiled_model_path) if compiled_model_path else None
+        self.compiled_max_rows = compiled_max_rows
+        self.warmup = warmup
+        self.bundle = None
+        self.state = self.NOT_LOADED
+        self.error = None
+        self.last_reload = None
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
+    @property
+    def ready(self):
+        """Whether a warmed-up bundle is available for requests"""
+        return self.state == self.READY and self.bundle is not None
+
+    @property
+    def version(self):
+        """Version of the bundle currently being served"""
+        bundle = self.bundle
+        return bundle.version if bundle else None
+
+    @property
+    def reloading(self):
+        """Whether a reload is in progress"""
+        return self._reload_lock.locked()
+
+    def add_listener(self, callback):
+        """Register a callback invoked with the new bundle after every swap"""
+        self._listeners.append(callback)
+
+    def fingerprint(self):
+        """Version string derived from the artifact files, None if any is missing"""
+        digest = hashlib.sha1()
+        for path in (self.model_path, self.preprocessor_path):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return None
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+        # The compiled model is optional but still part of what is being served
+        if self.compiled_model_path is not None and self.compiled_model_path.exists():
+            stat = self.compiled_model_path.stat()
+            digest.update(f"{self.compiled_model_path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+        return digest.hexdigest()[:12]
+
+    def load(self):
+        """Load, warm up and publish the model bundle
+
+        Returns:
+            The loaded ModelBundle, or None if loading failed
+        """
+        self.state = self.LOADING
+        try:
+            bundle = self._load_bundle()
+        except FileNotFoundError as e:
+            self.state = self.FAILED
+            self.error = str(e)
+            logger.error(f"Error loading model: {e}")
+            return None
+        except Exception as e:
+            self.state = self.FAILED
+            self.error = str(e)
+            logger.exception(f"Error loading model: {e}")
+            return None
+
+        self._publish(bundle)
+        logger.info(
+            f"Model {bundle.version} ready: loaded in {bundle.load_seconds:.3f}s, "
+            f"warmed up in {bundle.warmup_seconds:.3f}s"
+        )
+        return bundle
+
+    def reload(self):
+        """Load the current artifacts and swap them in atomically
+
+        The new bundle is validated with the warm-up smoke predictions before
+        it is published. On failure the previous bundle keeps serving.
+
+        Returns:
+            The new ModelBundle, or None if the reload failed or another
+            reload was already in progress
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            logger.warning("Model reload already in progress")
+            return None
+
+        try:
+            previous = self.version
+            start = time.perf_counter()
+            try:
+                bundle = self._load_bundle(validate=True)
+            except Exception as e:
+                self.last_reload = {
+                    'status': 'failed',
+                    'error': str(e),
+                    'at': str(pd.Timestamp.now())
+                }
+                logger.error(f"Model reload failed, keeping version {previous}: {e}")
+                return None
+
+            self._publish(bundle)
+            self.last_reload = {
+                'status': 'succeeded',
+                'previous_version': previous,
+                'version': bundle.version,
+                'seconds': time.perf_counter() - start,
+                'at': str(pd.Timestamp.now())
+            }
+            logger.info(f"Model reloaded: {previous} -> {bundle.version}")
+            return bundle
+        finally:
+            self._reload_lock.release()
+
+    def reload_async(self):
+        """Run reload on a background thread"""
+        thread = threading.Thread(target=self.reload, name='model-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def start_watcher(self, interval):
+        """Poll the artifact files and reload when they change
+
+        A change is only picked up once the fingerprint is stable across two
+        polls, so a reload never starts while training is still writing.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name='model-watcher', daemon=True
+        )
+        self._watcher.start()
+        logger.info(f"Watching serving artifacts every {interval}s")
+        return self._watcher
+
+    def stop_watcher(self):
+        """Stop the artifact watcher"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval):
+        """Watcher loop"""
+        pending = None
+        while not self._stop_watching.wait(interval):
+            current = self.fingerprint()
+            if current is None or current == self.version:
+                pending = None
+                continue
+            if current == pending:
+                self.reload()
+                pending = None
+            else:
+                pending = current
+
+    def _publish(self, bundle):
+        """Swap in a fully loaded bundle and notify listeners"""
+        self.bundle = bundle
+        self.state = self.READY
+        self.error = None
+        for callback in self._listeners:
+            try:
+                callback(bundle)
+            except Exception as e:
+                logger.error(f"Model reload listener failed: {e}")
+
+    def _load_bundle(self, validate=False):
+        """Read the artifacts from disk and warm them up
+
+        Args:
+            validate: Run the warm-up smoke predictions even if warm-up is disabled
+        """
+        version = self.fingerprint()
+        if version is None:
+            for path in (self.model_path, self.preprocessor_path):
+                if not path.exists():
+                    raise FileNotFoundError(f"Serving artifact not found at {path}")
+
+        start = time.perf_counter()
+        model = joblib.load(self.model_path)
+        logger.info(f"Model loaded from {self.model_path}")
+        preprocessor = PreprocessingPipeline.load(self.preprocessor_path)
+        bundle = ModelBundle(
+            model, preprocessor, version=version,
+            compiled=self._load_compiled(), compiled_max_rows=self.compiled_max_rows,
+            load_seconds=time.perf_counter() - start
+        )
+
+        if self.fingerprint() != version:
+            raise RuntimeError("Serving artifacts changed while loading")
+
+        if self.warmup or validate:
+            self.warm_up(bundle)
+        return bundle
+
+    def _load_compiled(self):
+        """Load the compiled trees if they were exported from the current model.pkl"""
+        path = self.compiled_model_path
+        if path is None or not path.exists():
+            return None
+        try:
+            compiled = CompiledTreeEnsemble.load(path)
+        except Exception as e:
+            logger.warning(f"Ignoring compiled model at {path}: {e}")
+            return None
+        if compiled is None:
+            return None
+        if compiled.source_digest != file_digest(self.model_path):
+            logger.warning(f"Ignoring compiled model at {path}: exported from a different model.pkl")
+            return None
+        return compiled
+
+    @staticmethod
+    def synthetic_record(preprocessor):
+        """Build a plausible raw record from the fitted pipeline statistics"""
+        record = dict(preprocessor.medians)
+        for col in preprocessor.categorical_columns:
+            record[col] = preprocessor.encoder.categories[col][0]
+        return record
+
+    def warm_up(self, bundle):
+        """Run single-row and batch predictions on a synthetic record
+
+        Pays lazy imports, first-call allocations and thread pool start-up
+        before the first real request does.
+        """
+        start = time.perf_counter()
+        record = self.synthetic_record(bundle.preprocessor)
+
+        single_X = bundle.preprocessor.transform_one(record)
+        single = bundle.model.predict(single_X)
+        batch = bundle.model.predict(bundle.preprocessor.transform_batch([record, record]))
+        if not (np.all(np.isfinite(single)) and np.all(np.isfinite(batch))):
+            raise ValueError("Warm-up prediction returned non-finite values")
+
+        if bundle.compiled is not None and not bundle.compiled.agrees_with(bundle.model, single_X):
+            logger.warning("Compiled model disagrees with model.pkl; serving model.pkl only")
+            bundle.compiled = None
+
+        bundle.warmup_seconds = time.perf_counter() - start
+        return bundle.warmup_seconds
+
+    def status(self):
+        """Readiness and load timings for the status endpoint"""
+        bundle = self.bundle
+        return {
+            'ready': self.ready,
+            'state': self.state,
+            'error': self.error,
+            'model_version': bundle.version if bundle else None,
+            'reloading': self.reloading,
+            'last_reload': self.last_reload,
+            'model_loaded': bundle is not None,
+            'compiled_model': bundle.compiled.kind if bundle and bundle.compiled else None,
+            'preprocessor_loaded': bundle is not None,
+            'model_path': str(self.model_path),
+            'preprocessor_path': str(self.preprocessor_path),
+            'loaded_at': str(bundle.loaded_at) if bundle else None,
+            'load_time_seconds': bundle.load_seconds if bundle else None,
+            'warmup_time_seconds': bundle.warmup_seconds if bundle else None
+        }
@@ -0,0 +1,105 @@
+"""
+Bounded LRU/TTL cache for single-listing price predictions
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with a time-to-live per entry
+
+    Keys combine the model version with the parsed request features, so an
+    entry can never be served for a different model. The API also clears the
+    cache whenever a new model is published.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300):
+        """Initialize cache
+
+        Args:
+            max_entries: Maximum number of cached predictions, 0 disables the cache
+            ttl_seconds: Seconds an entry stays valid, 0 means no expiry
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        """Whether the cache stores anything"""
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(version, features):
+        """Cache key for the canonical feature values of a validated request
+
+        Args:
+            version: Version of the model bundle that produces the prediction
+            features: Parsed feature values in feature column order
+        """
+        return (version, tuple(features))
+
+    def get(self, key):
+        """Return the cached value or None"""
+        if not self.enabled or key is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        if not self.enabled or key is None:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries, e.g. after a model reload"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """Counters for the status endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -2,7 +2,8 @@ import pandas as pd
 from pathlib import Path
 import joblib
 from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import LabelEncoder
+from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+from car_price_prediction.components.data_ingestion import load_dataset
 from car_price_prediction.entity.config_entity import PrepareBaseModelConfig
 from car_price_prediction import logger
 
@@ -11,37 +12,16 @@ class PrepareBaseModel:
     def __init__(self, config: PrepareBaseModelConfig):
         self.config = config
         self.model = None
-        self.label_encoders = {}
+        self.preprocessor = AdvancedPreprocessor(config.feature_columns)
 
     def preprocess_data(self, df: pd.DataFrame):
         """
-        Preprocess the dataframe: handle missing values, encode categorical features
+        Preprocess the dataframe with the shared preprocessing pipeline
         """
-        df = df.copy()
-        
-        # Replace '-' with NaN
-        df = df.replace('-', pd.NA)
-        
-        # Drop rows with missing target
-        df = df.dropna(subset=[self.config.target_column])
-        
-        # Handle categorical columns by label encoding
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        for col in categorical_cols:
-            if col in self.config.feature_columns:
-                df[col] = df[col].fillna('Unknown')
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
-                self.label_encoders[col] = le
-        
-        # Fill remaining numeric NaN with median
-        numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            if df[col].isna().any():
-                df[col].fillna(df[col].median(), inplace=True)
-        
-        return df
+        df = self.preprocessor.clean_data(df)
+        X, y = self.preprocessor.split_features_target(df, self.config.target_column)
+        X = self.preprocessor.pipeline.fit_transform(X)
+        return X, y
 
     def get_base_model(self):
         """
@@ -55,18 +35,10 @@ class PrepareBaseModel:
         """
         Load dataset, train model on training data, and save updated model.
         """
-        df = pd.read_csv(self.config.test_data_path)
-        
-        # Preprocess data
-        df = self.preprocess_data(df)
-
-        # Extract features and target
-        X = df[self.config.feature_columns]
-        y = df[self.config.target_column]
+        df = load_dataset(self.config.test_data_path)
         
-        # Ensure numeric types
-        y = pd.to_numeric(y, errors='coerce').dropna()
-        X = X.loc[y.index]
+        # Preprocess data and extract features and target
+        X, y = self.preprocess_data(df)
 
         # Train the model
         self.model.fit(X, y)
@@ -0,0 +1,237 @@
+"""
+Preprocessed train/test matrices persisted by training for the later stages
+"""
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sklearn.model_selection import train_test_split
+from car_price_prediction import logger
+from car_price_prediction.entity.config_entity import PreparedDataConfig
+from car_price_prediction.components import advanced_preprocessing, preprocessing_pipeline, field_parsers
+from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+from car_price_prediction.components.preprocessing_pipeline import PreprocessingPipeline
+from car_price_prediction.components.data_ingestion import load_dataset
+from car_price_prediction.components.compiled_model import file_digest
+
+
+# Modules whose code decides what the matrices contain
+PREPROCESSING_MODULES = (advanced_preprocessing, preprocessing_pipeline, field_parsers)
+
+
+def preprocessing_fingerprint(data_path, feature_columns, target_column, test_size, random_state):
+    """Fingerprint of everything the preprocessed matrices depend on
+
+    Covers the raw data file contents, the preprocessing parameters and the
+    source of the preprocessing code.
+    """
+    digest = hashlib.sha1()
+    digest.update(file_digest(data_path).encode())
+    digest.update(json.dumps({
+        'feature_columns': list(feature_columns),
+        'target_column': target_column,
+        'test_size': test_size,
+        'random_state': random_state
+    }, sort_keys=True).encode())
+    for module in PREPROCESSING_MODULES:
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class PreparedData:
+    """Train/test split after cleaning and the fitted preprocessing pipeline"""
+
+    ARRAYS = ('X_train', 'X_test', 'y_train', 'y_test', 'train_index', 'test_index')
+
+    def __init__(self, X_train, X_test, y_train, y_test, train_index, test_index,
+                 feature_names, fingerprint=None):
+        self.X_train = X_train
+        self.X_test = X_test
+        self.y_train = y_train
+        self.y_test = y_test
+        self.train_index = train_index
+        self.test_index = test_index
+        self.feature_names = list(feature_names)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_split(cls, X_train, X_test, y_train, y_test, feature_names, fingerprint=None):
+        """Build from transformed matrices and the (cleaned, untransformed) target series"""
+        return cls(
+            np.asarray(X_train), np.asarray(X_test),
+            np.asarray(y_train), np.asarray(y_test),
+            np.asarray(y_train.index), np.asarray(y_test.index),
+            feature_names, fingerprint
+        )
+
+    @classmethod
+    def recompute(cls, df: pd.DataFrame, preprocessor, target_column='Price',
+                  test_size=0.2, random_state=42, fingerprint=None, split=None):
+        """Recreate the training split with an already fitted preprocessing pipeline
+
+        Args:
+            df: Raw listings
+            preprocessor: AdvancedPreprocessor whose pipeline was fitted by training
+            split: Row labels (train_index, test_index) of the split the model
+                was trained on. When given, those exact rows are transformed
+                instead of splitting again: an incrementally updated model
+                trained on rows a fresh split could put in the test set.
+        """
+        if split is None:
+            X, y = preprocessor.clean(df, target_col=target_column)
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size, random_state=random_state
+            )
+        else:
+            # The saved labels already exclude the outliers of their run
+            X, y = preprocessor.split_features_target(
+                preprocessor.clean_data(df), target_col=target_column
+            )
+            train_rows = pd.Index(split[0]).intersection(X.index, sort=False)
+            test_rows = pd.Index(split[1]).intersection(X.index, sort=False)
+            X_train, X_test = X.loc[train_rows], X.loc[test_rows]
+            y_train, y_test = y.loc[train_rows], y.loc[test_rows]
+        pipeline = preprocessor.pipeline
+        return cls.from_split(
+            pipeline.transform(X_train), pipeline.transform(X_test),
+            y_train, y_test, pipeline.feature_names, fingerprint
+        )
+
+
+class PreparedDataStore:
+    """Reads and writes PreparedData as .npy files plus a metadata.json
+
+    The metadata is written last and removed first, so a half-written
+    directory is never mistaken for a valid one. Arrays are loaded
+    memory-mapped and read-only.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = Path(root_dir)
+        self.metadata_path = self.root_dir / 'metadata.json'
+
+    def save(self, prepared: PreparedData, preprocessor_path=None, data_path=None):
+        """Persist the matrices
+
+        Args:
+            preprocessor_path: Fitted pipeline the matrices were produced with;
+                its digest is stored so a refitted pipeline invalidates them
+            data_path: Raw dataset the split was made from; its digest lets
+                incremental training find the split of that exact file
+        """
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.metadata_path.unlink(missing_ok=True)
+
+        # Write-then-rename, so stages reading concurrently (memory-mapped
+        # or not) never see a half-written array
+        for name in PreparedData.ARRAYS:
+            tmp_path = self.root_dir / f"{name}.npy.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, getattr(prepared, name))
+            tmp_path.replace(self.root_dir / f"{name}.npy")
+
+        metadata = {
+            'fingerprint': prepared.fingerprint,
+            'preprocessor_digest': file_digest(preprocessor_path) if preprocessor_path else None,
+            'data_digest': file_digest(data_path) if data_path else None,
+            'feature_names': prepared.feature_names,
+            'n_train': int(len(prepared.X_train)),
+            'n_test': int(len(prepared.X_test)),
+            'created_at': str(pd.Timestamp.now())
+        }
+        tmp_path = self.metadata_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=4)
+        tmp_path.replace(self.metadata_path)
+        logger.info(
+            f"Prepared data saved to {self.root_dir}: {metadata['n_train']} train / "
+            f"{metadata['n_test']} test rows, fingerprint {prepared.fingerprint}"
+        )
+
+    def load(self, fingerprint, preprocessor_path=None):
+        """Load the matrices if they match the fingerprint (and pipeline)
+
+        Returns:
+            PreparedData, or None if missing or stale
+        """
+        if not self.metadata_path.exists():
+            logger.info(f"No prepared data in {self.root_dir}")
+            return None
+
+        with open(self.metadata_path) as f:
+            metadata = json.load(f)
+
+        if metadata['fingerprint'] != fingerprint:
+            logger.info(
+                f"Prepared data in {self.root_dir} is stale "
+                f"({metadata['fingerprint']} != {fingerprint})"
+            )
+            return None
+        if preprocessor_path is not None and metadata.get('preprocessor_digest') != file_digest(preprocessor_path):
+            logger.info(f"Prepared data in {self.root_dir} was made with a different preprocessor")
+            return None
+
+        arrays = {
+            name: np.load(self.root_dir / f"{name}.npy", mmap_mode='r')
+            for name in PreparedData.ARRAYS
+        }
+        logger.info(f"Prepared data loaded from {self.root_dir} (fingerprint {fingerprint})")
+        return PreparedData(**arrays, feature_names=metadata['feature_names'], fingerprint=fingerprint)
+
+    def load_split(self, data_digest):
+        """Row labels of the train/test split made from a given dataset file
+
+        Returns:
+            Tuple of (train_index, test_index), or None if the saved split
+            belongs to another file
+        """
+        if not self.metadata_path.exists():
+            return None
+        with open(self.metadata_path) as f:
+            metadata = json.load(f)
+        if metadata.get('data_digest') != data_digest:
+            return None
+        return (np.load(self.root_dir / 'train_index.npy'),
+                np.load(self.root_dir / 'test_index.npy'))
+
+
+def config_fingerprint(config: PreparedDataConfig):
+    """Fingerprint of the data and split described by a PreparedDataConfig"""
+    return preprocessing_fingerprint(
+        config.data_path, config.feature_columns, config.target_column,
+        config.test_size, config.random_state
+    )
+
+
+def load_prepared_data(config: PreparedDataConfig) -> PreparedData:
+    """Load the matrices saved by training, recomputing them if they are stale
+
+    Recomputing reuses the fitted preprocessor.pkl and, when the saved split
+    was made from the same data file, its row labels, so the result matches
+    what training would have saved; it is written back for the next stage.
+    """
+    fingerprint = config_fingerprint(config)
+    store = PreparedDataStore(config.root_dir)
+    prepared = store.load(fingerprint, config.preprocessor_path)
+    if prepared is not None:
+        return prepared
+
+    split = store.load_split(file_digest(config.data_path))
+    logger.info(
+        "Recomputing prepared data from the raw dataset "
+        f"({'with the saved split' if split is not None else 'with a new split'})"
+    )
+    preprocessor = AdvancedPreprocessor(config.feature_columns)
+    preprocessor.pipeline = PreprocessingPipeline.load(config.preprocessor_path)
+    prepared = PreparedData.recompute(
+        load_dataset(config.data_path), preprocessor,
+        target_column=config.target_column,
+        test_size=config.test_size,
+        random_state=config.random_state,
+        fingerprint=fingerprint,
+        split=split
+    )
+    store.save(prepared, config.preprocessor_path, config.data_path)
+    return prepared
@@ -0,0 +1,345 @@
+"""
+Fitted preprocessing pipeline shared by training, evaluation and serving
+"""
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sklearn.preprocessing import StandardScaler
+from car_price_prediction import logger
+from car_price_prediction.components.categorical_encoder import CategoricalEncoder
+from car_price_prediction.components.field_parsers import (parse_numeric_value, parse_numeric_column,
+                                                           parse_engine_column, parse_turbo_value)
+
+
+RAW_FEATURE_COLUMNS = [
+    'Levy', 'Manufacturer', 'Model', 'Prod. year', 'Category', 'Leather interior',
+    'Fuel type', 'Engine volume', 'Mileage', 'Cylinders', 'Gear box type',
+    'Drive wheels', 'Doors', 'Wheel', 'Color', 'Airbags'
+]
+
+CATEGORICAL_COLUMNS = [
+    'Manufacturer', 'Model', 'Category', 'Leather interior', 'Fuel type',
+    'Gear box type', 'Drive wheels', 'Doors', 'Wheel', 'Color'
+]
+
+ENGINEERED_COLUMNS = [
+    'Vehicle_Age', 'Engine_Size_Category', 'Mileage_Category', 'Engine_Cylinders',
+    'Mileage_Age_Interaction', 'Premium_Leather', 'Premium_Airbags', 'Engine_Turbo'
+]
+
+REFERENCE_YEAR = 2020
+# Rows per scaler update when the in-place path fits on a subset of rows
+FIT_SLICE_ROWS = 100_000
+ENGINE_SIZE_BINS = np.array([0, 1.5, 2.5, 3.5, np.inf])
+MILEAGE_BINS = np.array([0, 50000, 100000, 150000, np.inf])
+
+# API clients send numbers for fields that are stored as strings in the dataset
+CATEGORY_ALIASES = {
+    'Leather interior': {
+        'Yes': ['1', '1.0', 'True', 'true', 'yes'],
+        'No': ['0', '0.0', 'False', 'false', 'no']
+    },
+    'Doors': {
+        '02-Mar': ['2', '3', '2.0', '3.0'],
+        '04-May': ['4', '5', '4.0', '5.0'],
+        '>5': ['6', '7', '8', '6.0', '7.0', '8.0']
+    }
+}
+
+
+def _category_values(values: pd.Series):
+    """Distinct values of a raw categorical column as the strings parse produces"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        present = values.cat.remove_unused_categories().cat.categories.astype(str)
+        return present.append(pd.Index(['nan'])) if values.isna().any() else present
+    return values.astype(str).unique()
+
+
+class PreprocessingPipeline:
+    """Single fitted transform from raw car listings to the model feature matrix
+
+    Covers parsing of the raw string fields, median imputation, categorical
+    encoding, engineered features and standard scaling. It is fitted by the
+    training stage, serialized next to model.pkl and loaded as-is by
+    evaluation, the prediction pipeline and the API.
+    """
+
+    def __init__(self, feature_columns=None):
+        self.raw_columns = list(feature_columns or RAW_FEATURE_COLUMNS)
+        self.categorical_columns = [c for c in self.raw_columns if c in CATEGORICAL_COLUMNS]
+        self.numeric_columns = [c for c in self.raw_columns if c not in CATEGORICAL_COLUMNS]
+        self.feature_names = self.raw_columns + ENGINEERED_COLUMNS
+        self.encoder = CategoricalEncoder()
+        self.scaler = StandardScaler()
+        self.medians = {}
+        self.is_fitted = False
+
+    @property
+    def n_features(self):
+        """Number of columns produced by transform"""
+        return len(self.feature_names)
+
+    @property
+    def turbo_position(self):
+        """Matrix column of the turbo flag, None for pipelines saved before it existed"""
+        if 'Engine_Turbo' in self.feature_names and 'Engine volume' in self.raw_columns:
+            return self.feature_names.index('Engine_Turbo')
+        return None
+
+    def parse(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Parse raw fields: numeric columns become floats, categoricals strings"""
+        parsed = pd.DataFrame(index=df.index)
+        for col in self.raw_columns:
+            values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+            if col in self.categorical_columns:
+                parsed[col] = values.astype(str)
+            elif col == 'Engine volume':
+                parsed[col], turbo = parse_engine_column(values)
+                if self.turbo_position is not None:
+                    parsed['Engine_Turbo'] = turbo
+            else:
+                parsed[col] = parse_numeric_column(col, values).values
+        return parsed
+
+    def fit(self, df: pd.DataFrame):
+        """Fit imputation medians, category vocabularies and the scaler"""
+        return self.fit_parsed(self.parse(df))
+
+    def fit_parsed(self, parsed: pd.DataFrame, vocabularies=None):
+        """Fit on the output of parse
+
+        Args:
+            parsed: Parsed rows the medians and scaler are fitted on
+            vocabularies: Optional column -> categories, e.g. collected over more
+                rows than ``parsed`` holds; defaults to the values in ``parsed``
+        """
+        self.medians = {
+            col: float(parsed[col].median()) for col in self.numeric_columns
+        }
+
+        if vocabularies is None:
+            vocabularies = {col: parsed[col].unique() for col in self.categorical_columns}
+
+        self.encoder = CategoricalEncoder()
+        for col in self.categorical_columns:
+            self._register_categories(col, vocabularies[col])
+
+        self.scaler = StandardScaler()
+        self.scaler.fit(self._build_matrix(parsed))
+        self.is_fitted = True
+
+        logger.info(
+            f"Preprocessing pipeline fitted on {len(parsed)} rows: "
+            f"{self.n_features} features"
+        )
+        return self
+
+    def partial_fit(self, df: pd.DataFrame):
+        """Update a fitted pipeline with new rows
+
+        Unseen categories are appended to the vocabularies (existing codes do
+        not change) and the scaler mean/var are updated with the new rows.
+        Imputation medians are kept. Models trained on the previous scaling
+        must be rescaled, see incremental_training.rescale_model.
+        """
+        parsed = self.parse(df)
+        added = {}
+        for col in self.categorical_columns:
+            new_values = self.encoder.extend_column(col, _category_values(parsed[col]))
+            if new_values:
+                added[col] = len(new_values)
+
+        self.scaler.partial_fit(self._build_matrix(parsed))
+        logger.info(
+            f"Preprocessing pipeline updated with {len(parsed)} rows "
+            f"({self.scaler.n_samples_seen_} seen), new categories: {added or 'none'}"
+        )
+        return self
+
+    def fit_transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Fit the pipeline and transform the same data"""
+        return self.fit(df).transform(df)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Transform a dataframe of raw listings into scaled model features"""
+        return self.transform_parsed(self.parse(df))
+
+    def transform_parsed(self, parsed: pd.DataFrame) -> np.ndarray:
+        """Transform the output of parse into scaled model features"""
+        return self._scale(self._build_matrix(parsed))
+
+    def fit_transform_into(self, df: pd.DataFrame, rows=None, dtype=np.float32,
+                           release=False, fit_rows=None) -> np.ndarray:
+        """Fit and transform without intermediate frames
+
+        Same result as ``fit_transform(df.iloc[rows])``, but each raw column
+        is parsed or encoded on its own and written straight into one
+        preallocated matrix.
+
+        Args:
+            rows: Positions of the rows to use, defaults to all rows
+            dtype: dtype of the preallocated matrix
+            release: Delete each raw column from ``df`` once it is written
+            fit_rows: Positions within the output rows to fit on, e.g. the
+                training split; the other rows are only transformed.
+                Defaults to all output rows
+        """
+        return self._fill_matrix(df, rows, None, dtype, release, fit=True, fit_rows=fit_rows)
+
+    def transform_into(self, df: pd.DataFrame, rows=None, out=None, dtype=np.float32,
+                       release=False) -> np.ndarray:
+        """Transform into ``out`` (or a new matrix) without intermediate frames
+
+        Args:
+            rows: Positions of the rows to use, defaults to all rows
+            out: Preallocated (n_rows, n_features) matrix to write into
+            dtype: dtype of the matrix when ``out`` is not given
+            release: Delete each raw column from ``df`` once it is written
+        """
+        return self._fill_matrix(df, rows, out, dtype, release, fit=False)
+
+    def transform_batch(self, records) -> np.ndarray:
+        """Transform a list of raw feature dictionaries (or a dataframe)"""
+        if not isinstance(records, pd.DataFrame):
+            records = pd.DataFrame.from_records(records, columns=self.raw_columns)
+        return self.transform(records)
+
+    def transform_one(self, record: dict) -> np.ndarray:
+        """Transform a single raw feature dictionary into a (1, n_features) array
+
+        Plain Python per field; avoids building a dataframe on the request path.
+        """
+        row = np.empty((1, self.n_features))
+        for i, col in enumerate(self.raw_columns):
+            value = record.get(col)
+            if col in self.encoder.tables:
+                row[0, i] = self.encoder.encode_value(col, value)
+            else:
+                value = parse_numeric_value(col, value)
+                row[0, i] = self.medians[col] if value != value else value
+        turbo = self.turbo_position
+        if turbo is not None:
+            row[0, turbo] = parse_turbo_value(record.get('Engine volume'))
+        self._add_engineered(row)
+        return self._scale(row)
+
+    def save(self, path):
+        """Serialize the fitted pipeline"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+        logger.info(f"Preprocessing pipeline saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load a fitted pipeline"""
+        pipeline = joblib.load(Path(path))
+        logger.info(f"Preprocessing pipeline loaded from {path}")
+        return pipeline
+
+    def _register_categories(self, col, values):
+        """Add a fitted vocabulary and the API aliases of its categories"""
+        # Sorted vocabularies give the same codes as sklearn's LabelEncoder
+        self.encoder.add_column(col, sorted(values))
+        for canonical, names in CATEGORY_ALIASES.get(col, {}).items():
+            for name in names:
+                self.encoder.add_alias(col, name, canonical)
+
+    def _fill_matrix(self, df, rows, out, dtype, release, fit, fit_rows=None):
+        """Column-at-a-time parse, impute and encode into one matrix, then scale in place"""
+        n_rows = len(df) if rows is None else len(rows)
+        if out is None:
+            out = np.empty((n_rows, self.n_features), dtype=dtype)
+        elif out.shape != (n_rows, self.n_features):
+            raise ValueError(f"out has shape {out.shape}, expected {(n_rows, self.n_features)}")
+        if fit:
+            self.encoder = CategoricalEncoder()
+            self.medians = {}
+            if fit_rows is not None:
+                fit_rows = np.sort(np.asarray(fit_rows))
+        turbo = self.turbo_position
+
+        for i, col in enumerate(self.raw_columns):
+            values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+            if rows is not None:
+                values = values.take(rows)
+
+            if col in self.categorical_columns:
+                if fit:
+                    fitted = values if fit_rows is None else values.take(fit_rows)
+                    self._register_categories(col, _category_values(fitted))
+                out[:, i] = self.encoder.encode_column(col, values)
+            else:
+                if col == 'Engine volume':
+                    parsed, flags = parse_engine_column(values)
+                    if turbo is not None:
+                        out[:, turbo] = flags
+                else:
+                    parsed = parse_numeric_column(col, values).to_numpy(dtype=float)
+                missing = np.isnan(parsed)
+                if fit:
+                    fitted = parsed if fit_rows is None else parsed[fit_rows]
+                    fitted = fitted[~np.isnan(fitted)]
+                    self.medians[col] = float(np.median(fitted)) if len(fitted) else np.nan
+                parsed[missing] = self.medians.get(col, np.nan)
+                out[:, i] = parsed
+
+            del values
+            if release and col in df.columns:
+                del df[col]
+
+        self._add_engineered(out)
+        if fit:
+            self.scaler = StandardScaler()
+            if fit_rows is None:
+                self.scaler.fit(out)
+            else:
+                # In slices, so the fitted rows are never copied out whole
+                for start in range(0, len(fit_rows), FIT_SLICE_ROWS):
+                    self.scaler.partial_fit(out[fit_rows[start:start + FIT_SLICE_ROWS]])
+            self.is_fitted = True
+            logger.info(
+                f"Preprocessing pipeline fitted on {n_rows if fit_rows is None else len(fit_rows)} "
+                f"rows: {self.n_features} features ({out.dtype})"
+            )
+        return self._scale(out)
+
+    def _build_matrix(self, parsed: pd.DataFrame) -> np.ndarray:
+        """Impute, encode and add engineered features (unscaled)"""
+        matrix = np.empty((len(parsed), self.n_features))
+        for i, col in enumerate(self.raw_columns):
+            if col in self.categorical_columns:
+                matrix[:, i] = self.encoder.encode_column(col, parsed[col])
+            else:
+                matrix[:, i] = parsed[col].fillna(self.medians.get(col, np.nan)).values
+        turbo = self.turbo_position
+        if turbo is not None:
+            matrix[:, turbo] = parsed['Engine_Turbo'].values
+        self._add_engineered(matrix)
+        return matrix
+
+    def _add_engineered(self, matrix: np.ndarray):
+        """Fill the engineered columns in place from the raw columns"""
+        n_raw = len(self.raw_columns)
+        column = {col: matrix[:, i] for i, col in enumerate(self.raw_columns)}
+
+        vehicle_age = REFERENCE_YEAR - column['Prod. year']
+        engine = column['Engine volume']
+        mileage = column['Mileage']
+
+        matrix[:, n_raw] = vehicle_age
+        # Right-closed bins as in pd.cut; values outside the bins get -1
+        matrix[:, n_raw + 1] = np.searchsorted(ENGINE_SIZE_BINS, engine, side='left') - 1
+        matrix[:, n_raw + 2] = np.searchsorted(MILEAGE_BINS, mileage, side='left') - 1
+        matrix[:, n_raw + 3] = engine * column['Cylinders']
+        matrix[:, n_raw + 4] = mileage * vehicle_age
+        leather_yes = self.encoder.tables.get('Leather interior', {}).get('Yes', np.nan)
+        matrix[:, n_raw + 5] = column['Leather interior'] == leather_yes
+        matrix[:, n_raw + 6] = column['Airbags'] > 6
+
+    def _scale(self, matrix: np.ndarray) -> np.ndarray:
+        """Apply the fitted standard scaling without sklearn input validation"""
+        matrix -= self.scaler.mean_
+        matrix /= self.scaler.scale_
+        return matrix
@@ -3,16 +3,16 @@ import pandas as pd
 import joblib
 from pathlib import Path
 from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
 from car_price_prediction.entity.config_entity import TrainingConfig
+from car_price_prediction.components.preprocessing_pipeline import PreprocessingPipeline
 from car_price_prediction import logger
 
 
 class Training:
-    def __init__(self, config: TrainingConfig):
+    def __init__(self, config: TrainingConfig, preprocessor: PreprocessingPipeline = None):
         self.config = config
         self.model = None
-        self.scaler = StandardScaler()
+        self.preprocessor = preprocessor or PreprocessingPipeline()
 
     def get_base_model(self):
         """Load the base model from the updated base model path"""
@@ -23,12 +23,8 @@ class Training:
         """Train the model on full training data"""
         logger.info("Training model on full dataset")
         
-        # Ensure numeric types
-        X_train = X_train.copy()
-        y_train = y_train.copy()
-        
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
+        # Fit encoding, engineered features and scaling on the raw features
+        X_train_scaled = self.preprocessor.fit_transform(X_train)
         
         # Train model
         self.model.fit(X_train_scaled, y_train)
@@ -40,8 +36,6 @@ class Training:
         joblib.dump(self.model, path)
         logger.info(f"Model saved at {path}")
         
-    def save_scaler(self, path: Path):
-        """Save the scaler for later use in predictions"""
-        scaler_path = path.parent / "scaler.pkl"
-        joblib.dump(self.scaler, scaler_path)
-        logger.info(f"Scaler saved at {scaler_path}")
+    def save_preprocessor(self, path: Path):
+        """Save the preprocessing pipeline for later use in predictions"""
+        self.preprocessor.save(path.parent / "preprocessor.pkl")
@@ -7,7 +7,14 @@ from car_price_prediction.entity.config_entity import (DataIngestionConfig,
                                                        PrepareBaseModelConfig,
                                                        PrepareCallbacksConfig,
                                                        TrainingConfig,
-                                                       EvaluationConfig
+                                                       ModelComparisonConfig,
+                                                       PreparedDataConfig,
+                                                       IncrementalTrainingConfig,
+                                                       FeatureImportanceConfig,
+                                                       EvaluationConfig,
+                                                       ExperimentTrackingConfig,
+                                                       StageRunnerConfig,
+                                                       ServingConfig
                                                        )
 
 class ConfigurationManager:
@@ -45,7 +52,12 @@ class ConfigurationManager:
         preprocessing_config = PreprocessingConfig(
             target_column=preprocessing.target_column,
             test_size=params.TEST_SIZE,
-            random_state=params.RANDOM_STATE
+            random_state=params.RANDOM_STATE,
+            inplace=params.preprocessing.inplace,
+            streaming=params.preprocessing.streaming,
+            chunksize=params.preprocessing.chunksize,
+            sample_size=params.preprocessing.sample_size,
+            stream_dir=Path(preprocessing.stream_dir)
         )
 
         return preprocessing_config
@@ -99,6 +111,7 @@ class ConfigurationManager:
         training_config = TrainingConfig(
             root_dir=Path(training.root_dir),
             trained_model_path=Path(training.trained_model_path),
+            training_run_path=Path(training.training_run_path),
             updated_base_model_path=Path(prepare_base_model.updated_base_model_path),
             training_data=Path(training_data),
             params_epochs=params.EPOCHS,
@@ -111,6 +124,83 @@ class ConfigurationManager:
     
 
 
+    def get_model_comparison_config(self) -> ModelComparisonConfig:
+        config = self.config.model_comparison
+        params = self.params.comparison
+
+        create_directories([config.root_dir])
+
+        model_comparison_config = ModelComparisonConfig(
+            root_dir=Path(config.root_dir),
+            cv_folds=params.cv_folds,
+            n_jobs=params.n_jobs,
+            evict_losers=params.evict_losers,
+            mode=params.mode,
+            halving_factor=params.halving_factor,
+            halving_min_rows=params.halving_min_rows,
+            halving_min_estimators=params.halving_min_estimators,
+            early_stopping_rounds=params.early_stopping_rounds,
+            timing_report_path=Path(config.timing_report_path)
+        )
+
+        return model_comparison_config
+    
+
+
+    def get_prepared_data_config(self) -> PreparedDataConfig:
+        config = self.config.prepared_data
+
+        prepared_data_config = PreparedDataConfig(
+            root_dir=Path(config.root_dir),
+            data_path=Path(self.config.prepare_base_model.test_data_path),
+            preprocessor_path=Path(config.preprocessor_path),
+            feature_columns=list(self.params.model.feature_columns),
+            target_column=self.params.model.target_column,
+            test_size=self.params.split.test_size,
+            random_state=self.params.split.random_state
+        )
+
+        return prepared_data_config
+    
+
+
+    def get_incremental_training_config(self) -> IncrementalTrainingConfig:
+        params = self.params.incremental
+
+        incremental_training_config = IncrementalTrainingConfig(
+            enabled=params.enabled,
+            extra_rounds=params.extra_rounds,
+            extra_trees=params.extra_trees,
+            max_new_fraction=params.max_new_fraction,
+            max_mean_shift=params.max_mean_shift,
+            max_std_ratio=params.max_std_ratio,
+            max_unseen_category_rate=params.max_unseen_category_rate,
+            max_r2_drop=params.max_r2_drop
+        )
+
+        return incremental_training_config
+    
+
+
+
+    def get_feature_importance_config(self) -> FeatureImportanceConfig:
+        params = self.params.feature_importance
+
+        feature_importance_config = FeatureImportanceConfig(
+            mode=params.mode,
+            max_rows=params.max_rows,
+            min_repeats=params.min_repeats,
+            max_repeats=params.max_repeats,
+            ci_tolerance=params.ci_tolerance,
+            group_threshold=params.group_threshold,
+            tree_contributions=params.tree_contributions,
+            random_state=self.params.split.random_state,
+            timing_report_path=Path(self.config.feature_importance.timing_report_path)
+        )
+
+        return feature_importance_config
+    
+
 
     def get_validation_config(self) -> EvaluationConfig:
         eval_config = EvaluationConfig(
@@ -120,4 +210,59 @@ class ConfigurationManager:
             params_image_size=self.params.IMAGE_SIZE,
             params_batch_size=self.params.BATCH_SIZE
         )
-        return eval_config
\ No newline at end of file
+        return eval_config
+
+
+
+    def get_experiment_tracking_config(self) -> ExperimentTrackingConfig:
+        config = self.config.experiment_tracking
+
+        experiment_tracking_config = ExperimentTrackingConfig(
+            tracking_uri=config.tracking_uri,
+            experiment_name=config.experiment_name,
+            max_queue_size=config.max_queue_size,
+            flush_timeout=config.flush_timeout,
+            timing_report_path=Path(config.timing_report_path)
+        )
+
+        return experiment_tracking_config
+
+
+
+    def get_stage_runner_config(self) -> StageRunnerConfig:
+        config = self.config.stage_runner
+
+        stage_runner_config = StageRunnerConfig(
+            dvc_file=Path(config.dvc_file),
+            state_file=Path(config.state_file),
+            targets=list(config.targets),
+            workers=config.workers
+        )
+
+        return stage_runner_config
+
+
+
+    def get_serving_config(self) -> ServingConfig:
+        config = self.config.serving
+
+        serving_config = ServingConfig(
+            model_path=Path(config.model_path),
+            preprocessor_path=Path(config.preprocessor_path),
+            compiled_model_path=Path(config.compiled_model_path),
+            compiled_max_rows=config.compiled_max_rows,
+            warmup=config.warmup,
+            watch_artifacts=config.watch_artifacts,
+            watch_interval=config.watch_interval,
+            bind=config.bind,
+            workers=config.workers,
+            threads=config.threads,
+            timeout=config.timeout,
+            graceful_timeout=config.graceful_timeout,
+            max_requests=config.max_requests,
+            cache_max_entries=config.cache_max_entries,
+            cache_ttl_seconds=config.cache_ttl_seconds,
+            timing=config.timing
+        )
+
+        return serving_config
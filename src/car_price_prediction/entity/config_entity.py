@@ -16,6 +16,11 @@ class PreprocessingConfig:
     target_column: str
     test_size: float
     random_state: int
+    inplace: bool
+    streaming: bool
+    chunksize: int
+    sample_size: int
+    stream_dir: Path
 
 
 @dataclass(frozen=True)
@@ -40,6 +45,7 @@ class PrepareCallbacksConfig:
 class TrainingConfig:
     root_dir: Path
     trained_model_path: Path
+    training_run_path: Path
     updated_base_model_path: Path
     training_data: Path
     params_epochs: int
@@ -49,6 +55,60 @@ class TrainingConfig:
 
 
 
+@dataclass(frozen=True)
+class ModelComparisonConfig:
+    root_dir: Path
+    cv_folds: int
+    n_jobs: int
+    evict_losers: bool
+    mode: str
+    halving_factor: int
+    halving_min_rows: int
+    halving_min_estimators: int
+    early_stopping_rounds: int
+    timing_report_path: Path
+
+
+
+@dataclass(frozen=True)
+class IncrementalTrainingConfig:
+    enabled: bool
+    extra_rounds: int
+    extra_trees: int
+    max_new_fraction: float
+    max_mean_shift: float
+    max_std_ratio: float
+    max_unseen_category_rate: float
+    max_r2_drop: float
+
+
+
+@dataclass(frozen=True)
+class PreparedDataConfig:
+    root_dir: Path
+    data_path: Path
+    preprocessor_path: Path
+    feature_columns: list
+    target_column: str
+    test_size: float
+    random_state: int
+
+
+
+@dataclass(frozen=True)
+class FeatureImportanceConfig:
+    mode: str
+    max_rows: int
+    min_repeats: int
+    max_repeats: int
+    ci_tolerance: float
+    group_threshold: float
+    tree_contributions: bool
+    random_state: int
+    timing_report_path: Path
+
+
+
 @dataclass(frozen=True)
 class EvaluationConfig:
     path_of_model: Path
@@ -56,3 +116,43 @@ class EvaluationConfig:
     all_params: dict
     params_image_size: list
     params_batch_size: int
+
+
+
+@dataclass(frozen=True)
+class ExperimentTrackingConfig:
+    tracking_uri: str
+    experiment_name: str
+    max_queue_size: int
+    flush_timeout: int
+    timing_report_path: Path
+
+
+
+@dataclass(frozen=True)
+class StageRunnerConfig:
+    dvc_file: Path
+    state_file: Path
+    targets: list
+    workers: int
+
+
+
+@dataclass(frozen=True)
+class ServingConfig:
+    model_path: Path
+    preprocessor_path: Path
+    compiled_model_path: Path
+    compiled_max_rows: int
+    warmup: bool
+    watch_artifacts: bool
+    watch_interval: int
+    bind: str
+    workers: int
+    threads: int
+    timeout: int
+    graceful_timeout: int
+    max_requests: int
+    cache_max_entries: int
+    cache_ttl_seconds: int
+    timing: bool
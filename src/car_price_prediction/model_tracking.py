@@ -1,4 +1,7 @@
 import json
+import queue
+import threading
+import time
 from pathlib import Path
 from car_price_prediction import logger
 import pandas as pd
@@ -8,59 +11,210 @@ try:
     import mlflow
     import mlflow.sklearn
     import mlflow.xgboost
+    from mlflow.entities import Metric, Param, RunTag
+    from mlflow.tracking import MlflowClient
     MLFLOW_AVAILABLE = True
 except ImportError:
     MLFLOW_AVAILABLE = False
     logger.warning("MLflow not available - model tracking disabled")
 
 
+# Per-request limits of MlflowClient.log_batch
+MAX_BATCH_METRICS = 1000
+MAX_BATCH_PARAMS = 100
+MAX_BATCH_TAGS = 100
+MAX_BATCH_ENTITIES = 1000
+
+
 class MLFlowTracker:
-    """Track and manage models using MLflow (gracefully handles when MLflow is unavailable)"""
+    """Track and manage models using MLflow (gracefully handles when MLflow is unavailable)
+
+    Every call only puts an operation on a bounded queue and returns. A
+    background thread talks to the tracking store: metrics, params and tags
+    waiting in the queue are sent together in MlflowClient.log_batch
+    requests, so a run costs a handful of round trips instead of one per
+    key. When the store is slow or down the queue fills up and further
+    logging is dropped (counted in ``dropped``) rather than blocking
+    training. Run boundaries are never dropped for lack of room: start_run
+    and end_run wait up to ``flush_timeout`` seconds for a free slot, and
+    end_run then waits for the rest of that time for the queue to drain.
+    """
     
-    def __init__(self, tracking_uri='http://localhost:5001', experiment_name='car_price_prediction'):
+    def __init__(self, tracking_uri='http://localhost:5001', experiment_name='car_price_prediction',
+                 max_queue_size=10000, flush_timeout=30):
         """Initialize MLflow tracker
         
         Args:
             tracking_uri: MLflow server URI
             experiment_name: Experiment name
+            max_queue_size: Operations buffered for the background thread
+            flush_timeout: Seconds flush() and end_run() wait for the queue to drain
         """
         self.enabled = False
+        self.tracking_uri = tracking_uri
+        self.experiment_name = experiment_name
+        self.flush_timeout = flush_timeout
+        self.run_id = None
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._client = None
+        self._experiment_id = None
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._run_started = threading.Event()
+        self._run_started.set()
         
         if not MLFLOW_AVAILABLE:
             logger.warning("MLflow tracking disabled - library not available")
             return
             
-        try:
-            mlflow.set_tracking_uri(tracking_uri)
-            mlflow.set_experiment(experiment_name)
-            self.enabled = True
-            logger.info(f"MLflow tracking initialized: {tracking_uri}")
-        except Exception as e:
-            logger.warning(f"Could not initialize MLflow: {e} - tracking disabled")
+        # Connecting to the store happens on the background thread
+        self.enabled = True
+        logger.info(f"MLflow tracking initialized: {tracking_uri}")
     
-    def log_model(self, model, model_name, artifact_path="model"):
-        """Log a model to MLflow
+    def _submit(self, operation, *args, block=False):
+        """Queue an operation for the background thread
         
         Args:
-            model: Trained model object
-            model_name: Name of the model
-            artifact_path: Path to save the model
+            block: Wait up to flush_timeout for room instead of dropping the
+                operation when the queue is full
         """
         if not self.enabled:
             return False
-            
+        self._ensure_worker()
         try:
-            # Log model based on type
+            if block:
+                self._queue.put((operation, args), timeout=self.flush_timeout)
+            else:
+                self._queue.put_nowait((operation, args))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning("MLflow queue full - tracking store too slow, dropping tracking data")
+            return False
+    
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._drain, name='mlflow-tracker', daemon=True)
+                self._worker.start()
+    
+    def _drain(self):
+        """Background loop: take everything queued, send it in as few requests as possible"""
+        while True:
+            operations = [self._queue.get()]
+            while True:
+                try:
+                    operations.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process(operations)
+            finally:
+                for _ in operations:
+                    self._queue.task_done()
+    
+    def _process(self, operations):
+        """Apply queued operations in order, coalescing consecutive logging into batches"""
+        metrics, params, tags = [], {}, {}
+        for operation, args in operations:
+            if operation in ('metrics', 'params', 'tags'):
+                entities = args[0]
+                if operation == 'metrics':
+                    metrics.extend(entities)
+                elif operation == 'params':
+                    params.update((p.key, p) for p in entities)
+                else:
+                    tags.update((t.key, t) for t in entities)
+                continue
+            # Runs, artifacts and models depend on everything logged before them
+            self._log_batch(metrics, list(params.values()), list(tags.values()))
+            metrics, params, tags = [], {}, {}
+            try:
+                getattr(self, f"_do_{operation}")(*args)
+            except Exception as e:
+                logger.debug(f"MLflow {operation} failed: {e}")
+        self._log_batch(metrics, list(params.values()), list(tags.values()))
+    
+    def _log_batch(self, metrics, params, tags):
+        """Send entities in log_batch requests within MLflow's size limits"""
+        if not (metrics or params or tags):
+            return
+        if self.run_id is None:
+            logger.debug(f"No MLflow run - dropped {len(metrics) + len(params) + len(tags)} entities")
+            return
+        while metrics or params or tags:
+            batch_params, params = params[:MAX_BATCH_PARAMS], params[MAX_BATCH_PARAMS:]
+            batch_tags, tags = tags[:MAX_BATCH_TAGS], tags[MAX_BATCH_TAGS:]
+            room = min(MAX_BATCH_METRICS, MAX_BATCH_ENTITIES - len(batch_params) - len(batch_tags))
+            batch_metrics, metrics = metrics[:room], metrics[room:]
+            try:
+                self._client.log_batch(self.run_id, metrics=batch_metrics, params=batch_params, tags=batch_tags)
+                logger.debug(f"Logged {len(batch_metrics)} metrics, {len(batch_params)} parameters "
+                             f"and {len(batch_tags)} tags to MLflow")
+            except Exception as e:
+                logger.debug(f"Could not log batch to MLflow: {e}")
+    
+    def _do_start_run(self, run_name, tags):
+        self.run_id = None
+        try:
+            if self._client is None:
+                self._client = MlflowClient(tracking_uri=self.tracking_uri)
+            if self._experiment_id is None:
+                experiment = self._client.get_experiment_by_name(self.experiment_name)
+                self._experiment_id = (experiment.experiment_id if experiment is not None
+                                       else self._client.create_experiment(self.experiment_name))
+            run = self._client.create_run(self._experiment_id, run_name=run_name, tags=tags or {})
+            self.run_id = run.info.run_id
+            logger.debug(f"MLflow run started: {run_name}")
+        finally:
+            self._run_started.set()
+    
+    def _do_end_run(self, status):
+        if self.run_id is None:
+            return
+        self._client.set_terminated(self.run_id, status=status)
+        logger.debug("MLflow run ended")
+        self.run_id = None
+    
+    def _do_artifact(self, local_path, artifact_path):
+        if self.run_id is None:
+            return
+        self._client.log_artifact(self.run_id, local_path, artifact_path=artifact_path)
+        logger.debug(f"Artifact logged to MLflow: {local_path}")
+    
+    def _do_model(self, model, model_name, artifact_path):
+        if self.run_id is None:
+            return
+        # Flavor log_model needs an active run, resumed here on the background thread
+        mlflow.set_tracking_uri(self.tracking_uri)
+        with mlflow.start_run(run_id=self.run_id):
             if 'xgboost' in str(type(model)).lower():
                 mlflow.xgboost.log_model(model, artifact_path=artifact_path)
             else:
                 mlflow.sklearn.log_model(model, artifact_path=artifact_path)
-            
-            logger.info(f"Model '{model_name}' logged to MLflow")
-            return True
-        except Exception as e:
-            logger.debug(f"Could not log model to MLflow: {e}")
-            return False
+        logger.info(f"Model '{model_name}' logged to MLflow")
+    
+    def _do_register(self, model_uri, model_name):
+        mlflow.set_tracking_uri(self.tracking_uri)
+        mlflow.register_model(model_uri, model_name)
+        logger.info(f"Model registered: {model_name}")
+    
+    def log_model(self, model, model_name, artifact_path="model"):
+        """Log a model to MLflow
+        
+        Args:
+            model: Trained model object
+            model_name: Name of the model
+            artifact_path: Path to save the model
+        
+        Returns:
+            True if the model was queued for logging
+        """
+        return self._submit('model', model, model_name, artifact_path)
     
     def log_metrics(self, metrics, step=None):
         """Log metrics to MLflow
@@ -72,12 +226,13 @@ class MLFlowTracker:
         if not self.enabled:
             return
             
+        timestamp = int(time.time() * 1000)
         try:
-            for metric_name, metric_value in metrics.items():
-                mlflow.log_metric(metric_name, metric_value, step=step)
-            logger.debug(f"Logged {len(metrics)} metrics to MLflow")
-        except Exception as e:
+            entities = [Metric(name, float(value), timestamp, step or 0) for name, value in metrics.items()]
+        except (TypeError, ValueError) as e:
             logger.debug(f"Could not log metrics to MLflow: {e}")
+            return
+        self._submit('metrics', entities)
     
     def log_params(self, params):
         """Log parameters to MLflow
@@ -88,12 +243,18 @@ class MLFlowTracker:
         if not self.enabled:
             return
             
-        try:
-            for param_name, param_value in params.items():
-                mlflow.log_param(param_name, param_value)
-            logger.debug(f"Logged {len(params)} parameters to MLflow")
-        except Exception as e:
-            logger.debug(f"Could not log parameters to MLflow: {e}")
+        self._submit('params', [Param(name, str(value)) for name, value in params.items()])
+    
+    def set_tags(self, tags):
+        """Set tags on the current MLflow run
+        
+        Args:
+            tags: Dictionary of tag names and values
+        """
+        if not self.enabled:
+            return
+            
+        self._submit('tags', [RunTag(name, str(value)) for name, value in tags.items()])
     
     def log_artifact(self, local_path, artifact_path=None):
         """Log artifact to MLflow
@@ -102,17 +263,7 @@ class MLFlowTracker:
             local_path: Local file path
             artifact_path: Remote artifact path
         """
-        if not self.enabled:
-            return
-            
-        try:
-            if artifact_path:
-                mlflow.log_artifact(local_path, artifact_path=artifact_path)
-            else:
-                mlflow.log_artifact(local_path)
-            logger.debug(f"Artifact logged to MLflow: {local_path}")
-        except Exception as e:
-            logger.debug(f"Could not log artifact to MLflow: {e}")
+        self._submit('artifact', str(local_path), artifact_path)
     
     def start_run(self, run_name=None, tags=None):
         """Start a new MLflow run
@@ -124,44 +275,76 @@ class MLFlowTracker:
         if not self.enabled:
             return
             
-        try:
-            mlflow.start_run(run_name=run_name)
-            if tags:
-                for tag_name, tag_value in tags.items():
-                    mlflow.set_tag(tag_name, tag_value)
-            logger.debug(f"MLflow run started: {run_name}")
-        except Exception as e:
-            logger.debug(f"Could not start MLflow run: {e}")
+        self._run_started.clear()
+        tags = {name: str(value) for name, value in (tags or {}).items()}
+        if not self._submit('start_run', run_name, tags, block=True):
+            self._run_started.set()
     
-    def end_run(self):
-        """End the current MLflow run"""
+    def flush(self, timeout=None):
+        """Wait for queued operations to reach the tracking store
+        
+        Args:
+            timeout: Seconds to wait at most, flush_timeout if None
+        
+        Returns:
+            True if the queue drained within the timeout
+        """
+        if not self.enabled or self._worker is None:
+            return True
+        timeout = self.flush_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"MLflow queue not flushed after {timeout}s - "
+                                   f"{self._queue.unfinished_tasks} operations still pending")
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def end_run(self, status='FINISHED'):
+        """End the current MLflow run, flushing what is still queued
+        
+        Both waiting for room for the end of the run and waiting for the
+        queue to drain share one ``flush_timeout``.
+        
+        Args:
+            status: Final run status (FINISHED, FAILED or KILLED)
+        
+        Returns:
+            True if everything queued reached the store within flush_timeout
+        """
         if not self.enabled:
-            return
+            return True
             
-        try:
-            mlflow.end_run()
-            logger.debug("MLflow run ended")
-        except Exception as e:
-            logger.debug(f"Could not end MLflow run: {e}")
+        start = time.monotonic()
+        self._submit('end_run', status, block=True)
+        flushed = self.flush(max(0.0, self.flush_timeout - (time.monotonic() - start)))
+        if self.dropped:
+            logger.warning(f"{self.dropped} MLflow operations were dropped because the queue was full")
+        return flushed
     
     def register_model(self, model_uri, model_name):
         """Register a model in the MLflow registry
         
+        Runs on the background thread after everything queued before it.
+        
         Args:
             model_uri: URI of the model to register
             model_name: Name for the registered model
+        
+        Returns:
+            True if the registration was queued
         """
-        try:
-            mlflow.register_model(model_uri, model_name)
-            logger.info(f"Model registered: {model_name}")
-        except Exception as e:
-            logger.error(f"Error registering model: {e}")
+        return self._submit('register', model_uri, model_name)
     
     def get_run_info(self):
         """Get information about the current run"""
         try:
-            run = mlflow.active_run()
-            if run:
+            self._run_started.wait(self.flush_timeout)
+            if self.run_id:
+                run = self._client.get_run(self.run_id)
                 return {
                     'run_id': run.info.run_id,
                     'run_name': run.info.run_name,
@@ -198,7 +381,7 @@ class ModelVersioning:
         with open(version_file, 'w') as f:
             json.dump(self.versions, f, indent=4)
     
-    def create_version(self, model_path, metrics, params, description=""):
+    def create_version(self, model_path, metrics, params, description="", data=None):
         """Create a new model version
         
         Args:
@@ -206,6 +389,8 @@ class ModelVersioning:
             metrics: Dictionary of metrics
             params: Dictionary of parameters
             description: Version description
+            data: Snapshot of the training data (path, size, sha1, n_rows),
+                used to detect appended rows for incremental training
         
         Returns:
             Version info dictionary
@@ -221,6 +406,8 @@ class ModelVersioning:
                 'timestamp': pd.Timestamp.now().isoformat(),
                 'status': 'active'
             }
+            if data is not None:
+                version_info['data'] = data
             
             self.versions.append(version_info)
             self._save_versions()
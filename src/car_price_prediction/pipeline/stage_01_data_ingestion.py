@@ -13,7 +13,8 @@ class DataIngestionTrainingPipeline:
         data_ingestion_config = config.get_data_ingestion_config()
         data_ingestion = DataIngestion(config=data_ingestion_config)
         data_ingestion.download_file()
-        data_ingestion.extract_zip_file()
+        extracted = data_ingestion.extract_zip_file()
+        data_ingestion.build_dataset_cache(extracted)
 
 if __name__ == '__main__':
     try:
@@ -1,48 +1,53 @@
 from car_price_prediction.config.configuration import ConfigurationManager
 from car_price_prediction.components.training import Training
 from car_price_prediction.components.model_comparison import ModelFactory, ModelComparison
-from car_price_prediction.components.feature_importance import FeatureAnalysisPipeline
-from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor, split_positions
+from car_price_prediction.components.preprocessing_pipeline import PreprocessingPipeline
+from car_price_prediction.components.incremental_training import (data_snapshot, appended_rows,
+                                                                  check_drift, rescale_model,
+                                                                  continue_training)
+from car_price_prediction.components.data_ingestion import load_dataset
+from car_price_prediction.components.compiled_model import CompiledTreeEnsemble, file_digest
+from car_price_prediction.components.prepared_data import (PreparedData, PreparedDataStore,
+                                                           config_fingerprint)
+from car_price_prediction.utils.common import save_json
+from car_price_prediction.utils.timing import TimingRegistry
 from car_price_prediction import logger
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from datetime import datetime
 import joblib
+import time
 import warnings
-import os
 
-# Suppress warnings and disable MLflow by default
+# Suppress warnings
 warnings.filterwarnings('ignore', category=UserWarning)
-os.environ['MLFLOW_TRACKING_URI'] = 'sqlite:///mlflow.db'
 
-# Import MLflow components only if needed
+# Model versions are only read here (incremental training); the model
+# versioning stage writes them
 try:
-    from car_price_prediction.model_tracking import MLFlowTracker, ModelVersioning
+    from car_price_prediction.model_tracking import ModelVersioning
 except Exception as e:
-    logger.warning(f"MLflow import failed: {e}")
-    MLFlowTracker = None
+    logger.warning(f"Model tracking import failed: {e}")
     ModelVersioning = None
 
 STAGE_NAME = "Advanced Training Stage"
 
 
 class AdvancedModelTrainingPipeline:
-    """Advanced training pipeline with multiple models, cross-validation, and tracking"""
+    """Advanced training pipeline with multiple models and cross-validation
+    
+    Feature analysis, experiment tracking and versioning run as separate
+    stages after this one, from the training run record it writes.
+    """
     
     def __init__(self):
         self.config = ConfigurationManager()
-        self.tracker = None
         self.versioning = None
         
-        # Try to initialize MLflow only if available
-        if MLFlowTracker:
-            try:
-                self.tracker = MLFlowTracker()
-            except Exception as e:
-                logger.debug(f"MLflow initialization failed: {e}")
-        
         if ModelVersioning:
             try:
                 self.versioning = ModelVersioning()
@@ -51,28 +56,54 @@ class AdvancedModelTrainingPipeline:
         
         self.best_model = None
         self.best_model_name = None
-        self.scaler = None
-        self.label_encoders = {}
-        self.preprocessor = AdvancedPreprocessor()
+        self.preprocessor = AdvancedPreprocessor(self.config.params.model.feature_columns)
+        self.timings = TimingRegistry()
     
     def preprocess_data(self, df: pd.DataFrame):
-        """Preprocess the dataframe using advanced preprocessing"""
-        # Use the advanced preprocessor
-        X, y = self.preprocessor.preprocess(df, target_col='Price', fit=True)
+        """Clean the dataframe into raw features and target"""
+        # Column transforms are fitted on the training split only
+        return self.preprocessor.clean(df, target_col='Price')
+    
+    def preprocess_stream(self, source_path, preprocessing_config, fit_rows=None):
+        """Clean, fit and transform the file in chunks instead of loading it
         
-        # Save preprocessor state for later use
-        self.scaler = self.preprocessor.scaler
-        self.label_encoders = self.preprocessor.label_encoders
+        Args:
+            fit_rows: Function of the kept row count returning the positions
+                to fit on, see AdvancedPreprocessor.fit_stream
         
-        return X, y
+        Returns:
+            Tuple of the memory-mapped scaled features and the target series,
+            indexed by file row like the in-memory path
+        """
+        stream_dir = Path(preprocessing_config.stream_dir)
+        X, y = self.preprocessor.preprocess_stream(
+            source_path, stream_dir,
+            target_col=preprocessing_config.target_column,
+            chunksize=preprocessing_config.chunksize,
+            sample_size=preprocessing_config.sample_size,
+            fit_rows=fit_rows
+        )
+        index = np.load(stream_dir / 'index.npy')
+        return X, pd.Series(y, index=index, name=preprocessing_config.target_column)
     
     def train_with_comparison(self, X_train, y_train, X_test, y_test):
         """Train and compare multiple models"""
         logger.info("Starting model comparison")
         
         # Create model comparison instance
-        comparison = ModelComparison()
-        results = comparison.run_comparison(X_train, y_train, X_test, y_test, cv_folds=5)
+        comparison_config = self.config.get_model_comparison_config()
+        comparison = ModelComparison(output_dir=comparison_config.root_dir)
+        results = comparison.run_comparison(
+            X_train, y_train, X_test, y_test,
+            cv_folds=comparison_config.cv_folds,
+            n_jobs=comparison_config.n_jobs,
+            evict_losers=comparison_config.evict_losers,
+            mode=comparison_config.mode,
+            halving_factor=comparison_config.halving_factor,
+            halving_min_rows=comparison_config.halving_min_rows,
+            halving_min_estimators=comparison_config.halving_min_estimators,
+            early_stopping_rounds=comparison_config.early_stopping_rounds
+        )
         
         # Save comparison results
         comparison.save_comparison()
@@ -81,64 +112,54 @@ class AdvancedModelTrainingPipeline:
         self.best_model_name = comparison.get_best_model()
         logger.info(f"Best model selected: {self.best_model_name}")
         
-        # Train and return the best model
-        factory = ModelFactory()
-        self.best_model = factory.train(X_train, y_train, self.best_model_name)
+        # The comparison already fitted the winner on the full training split
+        self.best_model = comparison.get_best_estimator(self.best_model_name)
+        if self.best_model is None:
+            logger.warning(f"Fitted {self.best_model_name} not available, training it again")
+            self.best_model = ModelFactory().train(X_train, y_train, self.best_model_name)
         
         return results
     
     def apply_feature_scaling(self, X_train, X_test):
-        """Apply feature scaling using StandardScaler"""
-        logger.info("Applying feature scaling")
+        """Fit the preprocessing pipeline on the training split and transform both splits"""
+        logger.info("Fitting preprocessing pipeline (encoding, features, scaling)")
         
-        self.scaler = StandardScaler()
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        pipeline = self.preprocessor.pipeline
+        X_train_scaled = pipeline.fit_transform(X_train)
+        X_test_scaled = pipeline.transform(X_test)
         
         return X_train_scaled, X_test_scaled
     
-    def analyze_features(self, X_test, y_test, feature_names):
-        """Analyze feature importance"""
-        logger.info("Analyzing feature importance")
-        
-        pipeline = FeatureAnalysisPipeline(self.best_model, feature_names)
-        pipeline.run_analysis(X_test, y_test)
-        
-        return pipeline.get_analysis_report()
-    
-    def track_experiment(self, metrics, params):
-        """Track experiment with MLflow"""
-        if not self.tracker:
-            logger.debug("MLflow tracking not available")
-            return
-            
-        logger.debug("Tracking experiment with MLflow")
-        
-        try:
-            self.tracker.start_run(
-                run_name=f"training_{self.best_model_name}",
-                tags={'model': self.best_model_name, 'stage': 'advanced_training'}
-            )
-            
-            self.tracker.log_params(params)
-            self.tracker.log_metrics(metrics)
-            
-            self.tracker.end_run()
-            logger.debug("Experiment tracked successfully")
-        except Exception as e:
-            logger.debug(f"Could not track to MLflow: {e}")
+    def evaluate_model(self, X_test, y_test):
+        """Test-set metrics of the best model"""
+        y_pred = self.best_model.predict(X_test)
+        return {
+            'mse': float(mean_squared_error(y_test, y_pred)),
+            'rmse': float(np.sqrt(mean_squared_error(y_test, y_pred))),
+            'mae': float(mean_absolute_error(y_test, y_pred)),
+            'r2': float(r2_score(y_test, y_pred))
+        }
     
-    def version_model(self, metrics, params, description=""):
-        """Version the trained model"""
-        logger.info("Versioning model")
+    def save_training_run(self, training_config, metrics, params, description, data):
+        """Record what the tracking and versioning stages need about this run
         
-        model_path = Path("artifacts/training/model.pkl")
-        version_info = self.versioning.create_version(
-            model_path, metrics, params, description
-        )
+        Written last, after the artifacts, so downstream stages never see a
+        record for a model that is not on disk yet.
+        """
+        training_run = {
+            'model': self.best_model_name,
+            'model_path': str(training_config.trained_model_path),
+            'metrics': metrics,
+            'params': params,
+            'description': description,
+            'data': data,
+            'created_at': datetime.now().isoformat()
+        }
+        save_json(Path(training_config.training_run_path), training_run)
+        return training_run
     
     def save_artifacts(self, training_config):
-        """Save model and scaler artifacts"""
+        """Save model and preprocessing pipeline artifacts"""
         logger.info("Saving artifacts")
         
         # Create directory (trained_model_path is the file path, so use its parent)
@@ -149,78 +170,310 @@ class AdvancedModelTrainingPipeline:
         joblib.dump(self.best_model, model_path)
         logger.info(f"Model saved to {model_path}")
         
-        # Save scaler
-        scaler_path = model_path.parent / "scaler.pkl"
-        joblib.dump(self.scaler, scaler_path)
-        logger.info(f"Scaler saved to {scaler_path}")
+        # Save the fitted preprocessing pipeline (cleaning, features, encoding, scaling)
+        self.preprocessor.pipeline.save(model_path.parent / "preprocessor.pkl")
+    
+    def export_compiled_model(self, training_config, X_check):
+        """Flatten the saved tree ensemble into node arrays for fast serving
+        
+        The compiled model is only written if it reproduces model.predict on
+        X_check; otherwise a placeholder keeps the stage output in place and
+        the API uses model.pkl.
+        """
+        model_path = Path(training_config.trained_model_path)
+        compiled_path = model_path.parent / "compiled_model.npz"
+        
+        # Never leave node arrays of a previous model next to the new one
+        compiled_path.unlink(missing_ok=True)
+        
+        try:
+            compiled = CompiledTreeEnsemble.from_model(self.best_model)
+        except ValueError as e:
+            logger.info(f"Skipping compiled model export: {e}")
+            CompiledTreeEnsemble.save_placeholder(compiled_path, str(e))
+            return None
+        
+        if not compiled.agrees_with(self.best_model, X_check):
+            logger.warning(f"Compiled {self.best_model_name} differs from model.predict; not exporting")
+            CompiledTreeEnsemble.save_placeholder(
+                compiled_path, f"compiled {self.best_model_name} differs from model.predict"
+            )
+            return None
+        
+        compiled.source_digest = file_digest(model_path)
+        compiled.save(compiled_path)
+        return compiled_path
+    
+    def save_prepared_data(self, prepared_data_config, X_train_scaled, X_test_scaled, y_train, y_test):
+        """Persist the transformed split so evaluation and feature analysis can reuse it"""
+        prepared = PreparedData.from_split(
+            X_train_scaled, X_test_scaled, y_train, y_test,
+            self.preprocessor.pipeline.feature_names,
+            fingerprint=config_fingerprint(prepared_data_config)
+        )
+        PreparedDataStore(prepared_data_config.root_dir).save(
+            prepared, prepared_data_config.preprocessor_path, prepared_data_config.data_path
+        )
+    
+    def incremental_main(self):
+        """Update the current model with listings appended since its version
+        
+        The split of the previous rows is kept, new rows are split with the
+        same params, and the model is grown on the new training rows after
+        the pipeline statistics are updated.
+        
+        Phase timings (load, preprocess, drift, update, scale, evaluate,
+        save, total) replace the training timing report of the last run.
+        
+        Returns:
+            Result dictionary, or None when a full retrain is needed
+        """
+        incremental_config = self.config.get_incremental_training_config()
+        training_config = self.config.get_training_config()
+        prepared_data_config = self.config.get_prepared_data_config()
+        timing_report_path = self.config.get_model_comparison_config().timing_report_path
+        data_path = prepared_data_config.data_path
+        timer = self.timings.timer
+        run_start = time.perf_counter()
+        
+        latest = self.versioning.get_latest_version() if self.versioning else None
+        snapshot = (latest or {}).get('data')
+        if not snapshot:
+            logger.info("No data snapshot in the model versions, running a full retrain")
+            return None
         
-        # Save label encoders
-        encoders_path = model_path.parent / "label_encoders.pkl"
-        joblib.dump(self.label_encoders, encoders_path)
-        logger.info(f"Label encoders saved to {encoders_path}")
+        n_old = appended_rows(data_path, snapshot)
+        if n_old is None:
+            logger.info(f"{data_path} changed beyond appended rows since version {latest['version']}")
+            return None
+        split = PreparedDataStore(prepared_data_config.root_dir).load_split(snapshot['sha1'])
+        if split is None:
+            logger.info(f"Split of version {latest['version']} not available, running a full retrain")
+            return None
+        train_index, test_index = split
+        
+        with timer('load'):
+            df = load_dataset(data_path)
+        with timer('preprocess'):
+            preprocessor = AdvancedPreprocessor(prepared_data_config.feature_columns)
+            X, y = preprocessor.split_features_target(
+                preprocessor.clean_data(df), prepared_data_config.target_column
+            )
+        
+        # New rows are filtered with the outlier bounds the previous version used
+        previous = X.index.intersection(np.concatenate([train_index, test_index]))
+        lower_bound, upper_bound = preprocessor.outlier_bounds(y[X.index < n_old])
+        new = (X.index >= n_old) & (y >= lower_bound).to_numpy() & (y <= upper_bound).to_numpy()
+        X_new, y_new = X[new], y[new]
+        if X_new.empty:
+            logger.info(f"No new listings since model version {latest['version']}")
+            self.timings.record('total', time.perf_counter() - run_start)
+            self.timings.save_json(timing_report_path)
+            return {
+                'model': latest['params'].get('model'),
+                'metrics': latest['metrics'],
+                'new_rows': 0
+            }
+        
+        with timer('load'):
+            model = joblib.load(training_config.trained_model_path)
+            pipeline = PreprocessingPipeline.load(prepared_data_config.preprocessor_path)
+        with timer('drift'):
+            drift = check_drift(
+                pipeline, model, X_new, y_new, latest['metrics'].get('r2'),
+                len(previous), incremental_config
+            )
+        if drift['drifted']:
+            return None
+        
+        if len(X_new) * prepared_data_config.test_size >= 1:
+            X_new_train, X_new_test, y_new_train, y_new_test = train_test_split(
+                X_new, y_new,
+                test_size=prepared_data_config.test_size,
+                random_state=prepared_data_config.random_state
+            )
+        else:
+            X_new_train, X_new_test, y_new_train, y_new_test = X_new, X_new.iloc[:0], y_new, y_new.iloc[:0]
+        
+        # Update the pipeline statistics, move the model onto the new scaling, then grow it
+        try:
+            with timer('update'):
+                old_mean, old_scale = pipeline.scaler.mean_.copy(), pipeline.scaler.scale_.copy()
+                pipeline.partial_fit(X_new_train)
+                rescale_model(model, old_mean, old_scale, pipeline.scaler.mean_, pipeline.scaler.scale_)
+                continue_training(
+                    model, pipeline.transform(X_new_train), y_new_train,
+                    extra_rounds=incremental_config.extra_rounds,
+                    extra_trees=incremental_config.extra_trees
+                )
+        except ValueError as e:
+            logger.info(f"{e}; running a full retrain")
+            return None
+        
+        self.best_model = model
+        self.best_model_name = latest['params'].get('model')
+        self.preprocessor.pipeline = pipeline
+        
+        train_rows = X.index.intersection(train_index)
+        test_rows = X.index.intersection(test_index)
+        y_train = pd.concat([y.loc[train_rows], y_new_train])
+        y_test = pd.concat([y.loc[test_rows], y_new_test])
+        with timer('scale'):
+            X_train_scaled = pipeline.transform(pd.concat([X.loc[train_rows], X_new_train]))
+            X_test_scaled = pipeline.transform(pd.concat([X.loc[test_rows], X_new_test]))
+        
+        with timer('evaluate'):
+            metrics = self.evaluate_model(X_test_scaled, y_test)
+        params = {
+            'model': self.best_model_name,
+            'test_size': prepared_data_config.test_size,
+            'random_state': prepared_data_config.random_state,
+            'scaler': 'StandardScaler',
+            'n_features': pipeline.n_features,
+            'mode': 'incremental',
+            'base_version': latest['version'],
+            'new_rows': int(len(X_new))
+        }
+        
+        with timer('save'):
+            self.save_artifacts(training_config)
+            self.export_compiled_model(training_config, X_test_scaled)
+            self.save_prepared_data(prepared_data_config, X_train_scaled, X_test_scaled, y_train, y_test)
+        training_run = self.save_training_run(
+            training_config, metrics, params,
+            f"Model: {self.best_model_name}, incremental update of version {latest['version']} "
+            f"with {len(X_new)} rows",
+            data=data_snapshot(data_path, len(df))
+        )
+        self.timings.record('total', time.perf_counter() - run_start)
+        self.timings.save_json(timing_report_path)
+        
+        logger.info(
+            f"Incremental update of {self.best_model_name}: +{len(X_new)} rows, "
+            f"R² {latest['metrics'].get('r2', float('nan')):.4f} -> {metrics['r2']:.4f}"
+        )
+        return {
+            'model': self.best_model_name,
+            'metrics': metrics,
+            'drift': drift,
+            'training_run': training_run,
+            'new_rows': int(len(X_new))
+        }
     
     def main(self):
         """Run the advanced training pipeline"""
         try:
+            if self.config.get_incremental_training_config().enabled:
+                results = self.incremental_main()
+                if results is not None:
+                    return results
+                # Phases of the abandoned incremental attempt are not part of the full run
+                self.timings.reset()
+            
             training_config = self.config.get_training_config()
             prepare_base_model_config = self.config.get_prepare_base_model_config()
+            prepared_data_config = self.config.get_prepared_data_config()
+            preprocessing_config = self.config.get_preprocessing_config()
+            timer = self.timings.timer
+            run_start = time.perf_counter()
             
-            # Load and preprocess data
-            logger.info("Loading training data")
-            df = pd.read_csv(prepare_base_model_config.test_data_path)
-            
-            logger.info("Preprocessing data")
-            X, y = self.preprocess_data(df)
-            
-            # Prepare features and target - already done in preprocess_data
-            
-            # Split data with train/test split
-            logger.info("Splitting data into train/test sets")
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
-            )
-            
-            # Apply feature scaling
-            X_train_scaled, X_test_scaled = self.apply_feature_scaling(X_train, X_test)
+            if preprocessing_config.streaming or preprocessing_config.inplace:
+                # The split only depends on the kept row count, so both modes
+                # fit on the training positions before the matrix exists
+                def train_positions(n_rows):
+                    return split_positions(n_rows, prepared_data_config.test_size,
+                                           prepared_data_config.random_state)[0]
+                
+                if preprocessing_config.streaming:
+                    # The file is never loaded whole; only the transformed matrix is
+                    logger.info("Streaming training data through preprocessing")
+                    with timer('preprocess'):
+                        X, y = self.preprocess_stream(prepare_base_model_config.test_data_path,
+                                                      preprocessing_config, fit_rows=train_positions)
+                    n_source_rows = self.preprocessor.source_rows
+                else:
+                    logger.info("Loading training data")
+                    with timer('load'):
+                        df = load_dataset(prepare_base_model_config.test_data_path)
+                    n_source_rows = len(df)
+                    
+                    # Consumes df column by column into one float32 matrix
+                    logger.info("Preprocessing data in place")
+                    with timer('preprocess'):
+                        X, y = self.preprocessor.preprocess_inplace(
+                            df, target_col=preprocessing_config.target_column,
+                            fit_rows=train_positions
+                        )
+                    del df
+                
+                logger.info("Splitting data into train/test sets")
+                with timer('split'):
+                    train_rows, test_rows = split_positions(
+                        len(y), prepared_data_config.test_size, prepared_data_config.random_state
+                    )
+                    X_train_scaled, X_test_scaled = X[train_rows], X[test_rows]
+                    y_train, y_test = y.iloc[train_rows], y.iloc[test_rows]
+            else:
+                # Load and preprocess data
+                logger.info("Loading training data")
+                with timer('load'):
+                    df = load_dataset(prepare_base_model_config.test_data_path)
+                n_source_rows = len(df)
+                
+                logger.info("Preprocessing data")
+                with timer('preprocess'):
+                    X, y = self.preprocess_data(df)
+                
+                # Split data with train/test split
+                logger.info("Splitting data into train/test sets")
+                with timer('split'):
+                    X_train, X_test, y_train, y_test = train_test_split(
+                        X, y,
+                        test_size=prepared_data_config.test_size,
+                        random_state=prepared_data_config.random_state
+                    )
+                
+                # Fit preprocessing on the training split and transform both splits
+                with timer('scale'):
+                    X_train_scaled, X_test_scaled = self.apply_feature_scaling(X_train, X_test)
             
             # Compare and train models
             logger.info("Comparing different models")
-            comparison_results = self.train_with_comparison(
-                X_train_scaled, y_train, X_test_scaled, y_test
-            )
-            
-            # Analyze feature importance
-            logger.info("Analyzing feature importance")
-            feature_analysis = self.analyze_features(
-                X_test_scaled, y_test, list(X.columns)
-            )
+            with timer('compare'):
+                comparison_results = self.train_with_comparison(
+                    X_train_scaled, y_train, X_test_scaled, y_test
+                )
             
             # Prepare metrics and parameters for tracking
-            from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-            y_pred = self.best_model.predict(X_test_scaled)
-            
-            metrics = {
-                'mse': float(mean_squared_error(y_test, y_pred)),
-                'rmse': float(np.sqrt(mean_squared_error(y_test, y_pred))),
-                'mae': float(mean_absolute_error(y_test, y_pred)),
-                'r2': float(r2_score(y_test, y_pred))
-            }
+            with timer('evaluate'):
+                metrics = self.evaluate_model(X_test_scaled, y_test)
             
             params = {
                 'model': self.best_model_name,
-                'test_size': 0.2,
-                'random_state': 42,
-                'scaler': 'StandardScaler'
+                'test_size': prepared_data_config.test_size,
+                'random_state': prepared_data_config.random_state,
+                'scaler': 'StandardScaler',
+                'n_features': self.preprocessor.pipeline.n_features,
+                'mode': 'full',
+                'preprocessing': ('streaming' if preprocessing_config.streaming
+                                  else 'inplace' if preprocessing_config.inplace else 'in_memory')
             }
             
-            # Track experiment
-            self.track_experiment(metrics, params)
-            
-            # Version model
-            version_info = self.version_model(metrics, params, f"Model: {self.best_model_name}")
-            
             # Save artifacts
-            self.save_artifacts(training_config)
+            with timer('save'):
+                self.save_artifacts(training_config)
+                self.export_compiled_model(training_config, X_test_scaled)
+                self.save_prepared_data(
+                    prepared_data_config, X_train_scaled, X_test_scaled, y_train, y_test
+                )
+            
+            # Record the run for the tracking and versioning stages
+            training_run = self.save_training_run(
+                training_config, metrics, params, f"Model: {self.best_model_name}",
+                data=data_snapshot(prepared_data_config.data_path, n_source_rows)
+            )
+            self.timings.record('total', time.perf_counter() - run_start)
+            self.timings.save_json(self.config.get_model_comparison_config().timing_report_path)
             
             # Log final results
             logger.info("=" * 50)
@@ -230,15 +483,13 @@ class AdvancedModelTrainingPipeline:
             logger.info(f"R² Score: {metrics['r2']:.4f}")
             logger.info(f"RMSE: ${metrics['rmse']:.2f}")
             logger.info(f"MAE: ${metrics['mae']:.2f}")
-            if version_info:
-                logger.info(f"Model Version: {version_info['version']}")
             logger.info("=" * 50)
             
             return {
                 'model': self.best_model_name,
                 'metrics': metrics,
-                'feature_analysis': feature_analysis,
-                'version_info': version_info
+                'comparison': comparison_results,
+                'training_run': training_run
             }
         
         except Exception as e:
@@ -1,10 +1,11 @@
 from car_price_prediction.config.configuration import ConfigurationManager
 from car_price_prediction.components.training import Training
+from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+from car_price_prediction.components.data_ingestion import load_dataset
 from car_price_prediction import logger
 import pandas as pd
 from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 
 STAGE_NAME = "Training Stage"
 
@@ -12,29 +13,6 @@ class ModelTrainingPipeline:
     def __init__(self):
         pass
 
-    def preprocess_data(self, df: pd.DataFrame):
-        """Preprocess the dataframe"""
-        df = df.copy()
-        
-        # Replace '-' with NaN
-        df = df.replace('-', pd.NA)
-        
-        # Handle categorical columns by label encoding
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].fillna('Unknown')
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
-        
-        # Convert to numeric and fill NaN
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Fill remaining NaN with median
-        df = df.fillna(df.median())
-        
-        return df
-
     def main(self):
         config = ConfigurationManager()
         training_config = config.get_training_config()
@@ -42,15 +20,16 @@ class ModelTrainingPipeline:
         
         # Load the data
         logger.info("Loading training data")
-        df = pd.read_csv(prepare_base_model_config.test_data_path)
+        df = load_dataset(prepare_base_model_config.test_data_path)
         
-        # Preprocess data
+        # Clean data (raw field parsing, missing targets); column transforms
+        # are fitted by the shared preprocessing pipeline during training
         logger.info("Preprocessing data")
-        df = self.preprocess_data(df)
+        preprocessor = AdvancedPreprocessor(prepare_base_model_config.feature_columns)
+        df = preprocessor.clean_data(df)
         
         # Extract features and target
-        X = df[prepare_base_model_config.feature_columns]
-        y = df[prepare_base_model_config.target_column]
+        X, y = preprocessor.split_features_target(df, prepare_base_model_config.target_column)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -59,11 +38,11 @@ class ModelTrainingPipeline:
         
         # Initialize training
         logger.info("Initializing model training")
-        training = Training(config=training_config)
+        training = Training(config=training_config, preprocessor=preprocessor.pipeline)
         training.get_base_model()
         training.train_full_model(X_train, y_train)
         training.save_model(training_config.trained_model_path)
-        training.save_scaler(training_config.trained_model_path)
+        training.save_preprocessor(training_config.trained_model_path)
         
         logger.info(f"Model training completed and saved at {training_config.trained_model_path}")
 
@@ -0,0 +1,61 @@
+from car_price_prediction.config.configuration import ConfigurationManager
+from car_price_prediction.model_tracking import MLFlowTracker
+from car_price_prediction.utils.common import load_json
+from car_price_prediction.utils.timing import TimingRegistry
+from car_price_prediction import logger
+import time
+
+STAGE_NAME = "Experiment Tracking Stage"
+
+class ExperimentTrackingPipeline:
+    def __init__(self):
+        self.timings = TimingRegistry()
+
+    def main(self):
+        run_start = time.perf_counter()
+        config = ConfigurationManager()
+        training_config = config.get_training_config()
+        tracking_config = config.get_experiment_tracking_config()
+
+        # Metrics and params of the last training run
+        training_run = load_json(training_config.training_run_path)
+
+        tracker = MLFlowTracker(
+            tracking_uri=tracking_config.tracking_uri,
+            experiment_name=tracking_config.experiment_name,
+            max_queue_size=tracking_config.max_queue_size,
+            flush_timeout=tracking_config.flush_timeout
+        )
+        if not tracker.enabled:
+            logger.info("MLflow tracking not available, skipping experiment tracking")
+            self.save_timings(tracking_config, run_start)
+            return None
+
+        with self.timings.timer('track'):
+            tracker.start_run(
+                run_name=f"training_{training_run.model}",
+                tags={'model': training_run.model, 'stage': 'advanced_training'}
+            )
+            tracker.log_params(training_run.params.to_dict())
+            tracker.log_metrics(training_run.metrics.to_dict())
+        # end_run blocks until the background thread has flushed the queue
+        with self.timings.timer('flush'):
+            tracker.end_run()
+        logger.info(f"Training run of {training_run.model} tracked with MLflow")
+        self.save_timings(tracking_config, run_start)
+        return training_run.to_dict()
+
+    def save_timings(self, tracking_config, run_start):
+        """Write the phase timings, also when tracking was skipped, so the report is never stale"""
+        self.timings.record('total', time.perf_counter() - run_start)
+        self.timings.save_json(tracking_config.timing_report_path)
+
+if __name__ == '__main__':
+    try:
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = ExperimentTrackingPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
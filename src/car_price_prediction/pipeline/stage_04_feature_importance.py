@@ -0,0 +1,50 @@
+from car_price_prediction.config.configuration import ConfigurationManager
+from car_price_prediction.components.feature_importance import FeatureAnalysisPipeline
+from car_price_prediction.components.prepared_data import load_prepared_data
+from car_price_prediction.utils.timing import TimingRegistry
+from car_price_prediction import logger
+import joblib
+import time
+
+STAGE_NAME = "Feature Importance Stage"
+
+class FeatureImportancePipeline:
+    def __init__(self):
+        self.timings = TimingRegistry()
+
+    def main(self):
+        run_start = time.perf_counter()
+        config = ConfigurationManager()
+        training_config = config.get_training_config()
+        prepared_data_config = config.get_prepared_data_config()
+        feature_importance_config = config.get_feature_importance_config()
+
+        with self.timings.timer('load'):
+            # Reuse the test split transformed by training (recomputed if stale)
+            logger.info("Loading prepared data for feature analysis")
+            prepared = load_prepared_data(prepared_data_config)
+
+            logger.info(f"Loading model from {training_config.trained_model_path}")
+            model = joblib.load(training_config.trained_model_path)
+
+        with self.timings.timer('analyze'):
+            pipeline = FeatureAnalysisPipeline(
+                model, prepared.feature_names, config=feature_importance_config
+            )
+            pipeline.run_analysis(prepared.X_test, prepared.y_test)
+
+        report = pipeline.get_analysis_report()
+        self.timings.record('total', time.perf_counter() - run_start)
+        self.timings.save_json(feature_importance_config.timing_report_path)
+        logger.info(f"Feature analysis completed for {report['total_features']} features")
+        return report
+
+if __name__ == '__main__':
+    try:
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = FeatureImportancePipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,36 @@
+from car_price_prediction.config.configuration import ConfigurationManager
+from car_price_prediction.model_tracking import ModelVersioning
+from car_price_prediction.utils.common import load_json
+from car_price_prediction import logger
+
+STAGE_NAME = "Model Versioning Stage"
+
+class ModelVersioningPipeline:
+    def __init__(self):
+        pass
+
+    def main(self):
+        config = ConfigurationManager()
+        training_config = config.get_training_config()
+
+        # Metrics, params and data snapshot of the last training run
+        training_run = load_json(training_config.training_run_path).to_dict()
+
+        versioning = ModelVersioning()
+        version_info = versioning.create_version(
+            training_run['model_path'], training_run['metrics'], training_run['params'],
+            training_run['description'], data=training_run.get('data')
+        )
+        if version_info:
+            logger.info(f"Model Version: {version_info['version']}")
+        return version_info
+
+if __name__ == '__main__':
+    try:
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = ModelVersioningPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
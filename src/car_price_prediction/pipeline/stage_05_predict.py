@@ -2,12 +2,14 @@ import joblib
 import pandas as pd
 from pathlib import Path
 from car_price_prediction.config.configuration import ConfigurationManager
+from car_price_prediction.components.preprocessing_pipeline import PreprocessingPipeline
+from car_price_prediction.components.data_ingestion import load_dataset
 from car_price_prediction import logger
 
 class PredictionPipeline:
     def __init__(self):
         self.model = None
-        self.scaler = None
+        self.preprocessor = None
         self.config = ConfigurationManager()
 
     def load_model(self):
@@ -19,21 +21,20 @@ class PredictionPipeline:
         else:
             raise FileNotFoundError(f"Model not found at {model_path}")
 
-    def load_scaler(self):
-        """Load the scaler"""
-        scaler_path = Path("artifacts/training/scaler.pkl")
-        if scaler_path.exists():
-            self.scaler = joblib.load(scaler_path)
-            logger.info(f"Scaler loaded from {scaler_path}")
+    def load_preprocessor(self):
+        """Load the fitted preprocessing pipeline"""
+        preprocessor_path = Path("artifacts/training/preprocessor.pkl")
+        if preprocessor_path.exists():
+            self.preprocessor = PreprocessingPipeline.load(preprocessor_path)
         else:
-            logger.warning("Scaler not found, predictions will use unscaled features")
+            raise FileNotFoundError(f"Preprocessing pipeline not found at {preprocessor_path}")
 
     def predict(self, data):
         """
         Make predictions on new data
         
         Args:
-            data: pandas DataFrame with features
+            data: pandas DataFrame with raw features
             
         Returns:
             predictions: numpy array of predictions
@@ -41,17 +42,14 @@ class PredictionPipeline:
         if self.model is None:
             self.load_model()
         
-        if self.scaler is None:
-            self.load_scaler()
+        if self.preprocessor is None:
+            self.load_preprocessor()
         
-        # Scale data if scaler exists
-        if self.scaler:
-            data_scaled = self.scaler.transform(data)
-        else:
-            data_scaled = data
+        # Parse, encode, add engineered features and scale
+        features = self.preprocessor.transform(data)
         
         # Make predictions
-        predictions = self.model.predict(data_scaled)
+        predictions = self.model.predict(features)
         logger.info(f"Predictions made for {len(data)} samples")
         
         return predictions
@@ -64,7 +62,7 @@ if __name__ == '__main__':
         pipeline = PredictionPipeline()
         
         # Load sample data
-        sample_data = pd.read_csv("artifacts/data_ingestion/car_price_prediction.csv").head(5)
+        sample_data = load_dataset("artifacts/data_ingestion/car_price_prediction.csv").head(5)
         prepare_base_model_config = pipeline.config.get_prepare_base_model_config()
         
         # Select only feature columns
@@ -0,0 +1,355 @@
+"""
+Runs the pipeline stages declared in dvc.yaml, skipping the ones that are up to date
+"""
+import hashlib
+import inspect
+import json
+import os
+import time
+import yaml
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from car_price_prediction import logger
+from car_price_prediction.constants import PARAMS_FILE_PATH
+from car_price_prediction.components.compiled_model import file_digest
+
+
+@dataclass
+class StageSpec:
+    """Dependencies and outputs of one dvc.yaml stage"""
+    name: str
+    deps: list
+    params: dict
+    outs: list
+
+
+def _paths(entries) -> list:
+    """Paths of a deps/outs/metrics list, whose entries may carry options"""
+    paths = []
+    for entry in entries or []:
+        paths.extend(entry.keys() if isinstance(entry, dict) else [entry])
+    return paths
+
+
+def _param_keys(entries) -> dict:
+    """Map params file -> keys; bare keys refer to params.yaml as in DVC"""
+    keys = {}
+    for entry in entries or []:
+        if isinstance(entry, dict):
+            for path, path_keys in entry.items():
+                keys.setdefault(path, []).extend(path_keys or [])
+        else:
+            keys.setdefault(str(PARAMS_FILE_PATH), []).append(entry)
+    return keys
+
+
+def load_stage_specs(dvc_file) -> dict:
+    """Parse the stages of a dvc.yaml file, in file order"""
+    with open(dvc_file) as f:
+        stages = yaml.safe_load(f)['stages']
+    return {
+        name: StageSpec(
+            name=name,
+            deps=_paths(stage.get('deps')),
+            params=_param_keys(stage.get('params')),
+            outs=_paths(stage.get('outs')) + _paths(stage.get('metrics'))
+        )
+        for name, stage in stages.items()
+    }
+
+
+def _lookup(document, key):
+    """Value of a dotted key in a parsed YAML document, None if absent"""
+    value = document
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _contains(out, dep) -> bool:
+    """True if path dep is out itself or lies inside the directory out"""
+    out, dep = Path(out), Path(dep)
+    return dep == out or out in dep.parents
+
+
+class StageRunner:
+    """Minimal stand-in for `dvc repro` that calls the stage pipelines directly
+
+    Stages form a DAG through their deps and outs and run in a process pool
+    as soon as their upstream stages are done. A stage is skipped when a fingerprint of its inputs - dependency file
+    contents, the params keys it declares and the source of its pipeline
+    module - matches the one recorded after its last successful run, and its
+    outputs still have the recorded contents. File digests are cached by
+    size and mtime so unchanged artifacts are not re-read.
+    """
+
+    def __init__(self, config, pipelines: dict):
+        """
+        Args:
+            config: StageRunnerConfig
+            pipelines: Stage name -> pipeline class with a main() method
+        """
+        self.config = config
+        self.pipelines = pipelines
+        self.specs = load_stage_specs(config.dvc_file)
+        unknown = set(pipelines) - set(self.specs)
+        if unknown:
+            raise ValueError(f"Stages not declared in {config.dvc_file}: {sorted(unknown)}")
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        path = Path(self.config.state_file)
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {'stages': {}, 'digests': {}}
+
+    def _save_state(self):
+        path = Path(self.config.state_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=4)
+        tmp_path.replace(path)
+
+    def path_digest(self, path):
+        """Content digest of a file or directory, None if it does not exist"""
+        path = Path(path)
+        if path.is_dir():
+            digest = hashlib.sha1()
+            for child in sorted(p for p in path.rglob('*') if p.is_file()):
+                digest.update(f"{child.relative_to(path).as_posix()}\0{self.path_digest(child)}\0".encode())
+            return digest.hexdigest()
+        if not path.exists():
+            return None
+
+        stat = path.stat()
+        cached = self.state['digests'].get(str(path))
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha1']
+        sha1 = file_digest(path)
+        self.state['digests'][str(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': sha1}
+        return sha1
+
+    def _params_values(self, spec) -> dict:
+        values = {}
+        for path, keys in spec.params.items():
+            with open(path) as f:
+                document = yaml.safe_load(f) or {}
+            values[path] = {key: _lookup(document, key) for key in keys}
+        return values
+
+    def fingerprint(self, name) -> str:
+        """Digest of everything a stage reads"""
+        spec = self.specs[name]
+        code = Path(inspect.getsourcefile(self.pipelines[name]))
+        inputs = {
+            'deps': {dep: self.path_digest(dep) for dep in spec.deps},
+            'params': self._params_values(spec),
+            'code': self.path_digest(code)
+        }
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    def outdated_reason(self, name):
+        """Why a stage has to run, or None if it is up to date"""
+        spec = self.specs[name]
+        recorded = self.state['stages'].get(name)
+        if recorded is None:
+            return "never run"
+        missing = [dep for dep in spec.deps if not Path(dep).exists()]
+        if missing:
+            return f"missing dependencies {missing}"
+        if recorded['fingerprint'] != self.fingerprint(name):
+            return "inputs changed"
+        for out in spec.outs:
+            digest = self.path_digest(out)
+            if digest is None:
+                return f"{out} missing"
+            if digest != recorded['outs'].get(out):
+                return f"{out} modified"
+        return None
+
+    def upstream(self, name) -> list:
+        """Stages producing an output that stage `name` depends on"""
+        deps = self.specs[name].deps
+        return [
+            other for other, spec in self.specs.items()
+            if other != name and any(_contains(out, dep) for out in spec.outs for dep in deps)
+        ]
+
+    def plan(self, targets=None) -> list:
+        """Target stages and everything upstream of them, in dependency order"""
+        targets = list(targets or self.config.targets)
+        for target in targets:
+            if target not in self.pipelines:
+                raise ValueError(f"Unknown stage '{target}', expected one of {list(self.pipelines)}")
+
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            visiting.add(name)
+            for producer in self.upstream(name):
+                if producer in self.pipelines:
+                    visit(producer)
+            visiting.discard(name)
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def dry_run(self, targets=None, force=False) -> list:
+        """Report which planned stages are outdated without running anything"""
+        targets = list(targets or self.config.targets)
+        report = []
+        outdated = set()
+        for name in self.plan(targets):
+            reason = "forced" if force and name in targets else self.outdated_reason(name)
+            if reason is None:
+                # A real run would refresh these first, which may change the inputs
+                stale_upstream = [producer for producer in self.upstream(name) if producer in outdated]
+                if stale_upstream:
+                    reason = f"upstream {', '.join(stale_upstream)} outdated"
+            if reason is not None:
+                outdated.add(name)
+            status = "outdated" if reason else "skipped"
+            report.append({'stage': name, 'status': status, 'reason': reason or "up to date",
+                           'start': 0.0, 'seconds': 0.0})
+        self.log_report(report)
+        return report
+
+    def run(self, targets=None, force=False, dry_run=False, workers=None) -> list:
+        """Bring the target stages up to date
+
+        Stages whose upstream stages are done are started as soon as a
+        worker is free, so independent stages (evaluation, feature
+        importance, tracking, versioning) run concurrently. Up-to-date
+        checks happen in this process right before a stage would start.
+
+        Args:
+            targets: Stage names; defaults to the configured targets
+            force: Run the targets even if they are up to date
+            dry_run: Only report which stages would run
+            workers: Worker processes; defaults to the configured count,
+                0 means one per CPU core and 1 runs stages in this process
+
+        Returns:
+            One dict per planned stage with its status, reason, start offset and seconds
+        """
+        if dry_run:
+            return self.dry_run(targets, force=force)
+
+        targets = list(targets or self.config.targets)
+        plan = self.plan(targets)
+        workers = self.config.workers if workers is None else workers
+        workers = workers or os.cpu_count() or 1
+        upstream = {name: [p for p in self.upstream(name) if p in plan] for name in plan}
+
+        report = {}
+        pending = list(plan)
+        done = set()
+        running = {}
+        error = None
+        run_start = time.perf_counter()
+        # Spawned workers do not inherit the OpenMP/thread state of this process
+        pool = ProcessPoolExecutor(workers, mp_context=get_context('spawn')) if workers > 1 else None
+        try:
+            while pending or running:
+                ready = [name for name in pending if all(p in done for p in upstream[name])]
+                for name in ready if error is None else []:
+                    if len(running) >= workers:
+                        break
+                    pending.remove(name)
+                    reason = "forced" if force and name in targets else self.outdated_reason(name)
+                    if reason is None:
+                        logger.info(f">>>>>> stage {name} skipped: up to date <<<<<<")
+                        report[name] = {'stage': name, 'status': "skipped", 'reason': "up to date",
+                                        'start': round(time.perf_counter() - run_start, 3), 'seconds': 0.0}
+                        done.add(name)
+                        continue
+
+                    logger.info(f">>>>>> stage {name} started ({reason}) <<<<<<")
+                    report[name] = {'stage': name, 'status': "running", 'reason': reason,
+                                    'start': round(time.perf_counter() - run_start, 3), 'seconds': 0.0}
+                    if pool is None:
+                        future = Future()
+                        try:
+                            future.set_result(_run_pipeline(self.pipelines[name]))
+                        except Exception as e:
+                            future.set_exception(e)
+                    else:
+                        future = pool.submit(_run_pipeline, self.pipelines[name])
+                    running[future] = name
+
+                if not running:
+                    if error is not None or not any(
+                            all(p in done for p in upstream[name]) for name in pending):
+                        break
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as e:
+                        logger.exception(f"Stage {name} failed: {e}")
+                        report[name]['status'] = "failed"
+                        error = error or e
+                        continue
+                    self._record(name, seconds)
+                    report[name].update(status="ran", seconds=round(seconds, 3))
+                    done.add(name)
+                    logger.info(f">>>>>> stage {name} completed in {seconds:.1f}s <<<<<<\n\nx==========x")
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+            self._save_state()
+
+        for name in pending:
+            report[name] = {'stage': name, 'status': "not run", 'reason': "upstream failed",
+                            'start': 0.0, 'seconds': 0.0}
+        report = [report[name] for name in plan]
+        self.log_report(report, wall_seconds=time.perf_counter() - run_start)
+        if error is not None:
+            raise error
+        return report
+
+    def _record(self, name, seconds):
+        """Store the fingerprint and outputs of a stage that just succeeded"""
+        spec = self.specs[name]
+        self.state['stages'][name] = {
+            'fingerprint': self.fingerprint(name),
+            'outs': {out: self.path_digest(out) for out in spec.outs},
+            'seconds': round(seconds, 3),
+            'completed_at': datetime.now().isoformat()
+        }
+        self._save_state()
+
+    @staticmethod
+    def log_report(report, wall_seconds=None):
+        """Log a per-stage timing table"""
+        logger.info(f"{'stage':<22}{'status':<10}{'start':>8}{'seconds':>9}  reason")
+        for row in report:
+            logger.info(f"{row['stage']:<22}{row['status']:<10}{row['start']:>8.2f}"
+                        f"{row['seconds']:>9.2f}  {row['reason']}")
+        if wall_seconds is not None:
+            logger.info(f"{'wall time':<40}{wall_seconds:>9.2f}  "
+                        f"(stages total {sum(row['seconds'] for row in report):.2f})")
+
+
+def _run_pipeline(pipeline):
+    """Run one stage's pipeline and return its wall time (pool worker entry point)"""
+    start = time.perf_counter()
+    pipeline().main()
+    return time.perf_counter() - start
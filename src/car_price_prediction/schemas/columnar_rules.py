@@ -0,0 +1,265 @@
+"""
+CarFeatures constraints compiled into vectorized column checks
+"""
+import numpy as np
+import pandas as pd
+from annotated_types import Gt, Ge, Lt, Le, MinLen, MaxLen
+from dataclasses import dataclass
+from pydantic import TypeAdapter, ValidationError
+from car_price_prediction.components.field_parsers import factorize_column
+from car_price_prediction.schemas.prediction_schema import CarFeatures, VALIDATOR_RULES, VALIDATOR_PARSERS
+
+
+# Messages follow pydantic's wording so both paths report the same text
+_BOUND_RULES = {
+    Gt: ('gt', lambda v, b: ~(v > b), "Input should be greater than {}"),
+    Ge: ('ge', lambda v, b: ~(v >= b), "Input should be greater than or equal to {}"),
+    Lt: ('lt', lambda v, b: ~(v < b), "Input should be less than {}"),
+    Le: ('le', lambda v, b: ~(v <= b), "Input should be less than or equal to {}")
+}
+_TYPE_MESSAGES = {
+    int: "Input should be a valid integer",
+    float: "Input should be a valid number",
+    str: "Input should be a valid string"
+}
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    """One check on one column; ``check(values)`` is True where it fails"""
+    column: str
+    name: str
+    message: str
+    check: object = None
+
+    @property
+    def rule_id(self):
+        return f"{self.column}:{self.name}"
+
+    def error(self) -> dict:
+        """Structured error reported for a value failing this rule"""
+        return {'field': self.column, 'rule': self.name, 'message': self.message}
+
+
+class CompiledField:
+    """Type coercion plus ordered constraint checks of a single model field
+
+    Like pydantic, a value that is missing or has the wrong type is not
+    checked further, and only the first failing constraint of a field is
+    reported.
+    """
+
+    def __init__(self, name, field_info, extra_rules=(), parser=None):
+        self.name = name
+        self.column = field_info.alias or name
+        self.annotation = field_info.annotation
+        self.adapter = TypeAdapter(self.annotation)
+        self.parser = parser
+        self.missing_rule = ColumnRule(self.column, 'required', "Field required")
+        self.type_rule = ColumnRule(self.column, 'type', _TYPE_MESSAGES[self.annotation])
+
+        rules = []
+        for constraint in field_info.metadata:
+            if type(constraint) in _BOUND_RULES:
+                rule_name, check, message = _BOUND_RULES[type(constraint)]
+                bound = getattr(constraint, rule_name)
+                rules.append(ColumnRule(self.column, rule_name, message.format(bound),
+                                        lambda v, check=check, bound=bound: check(v, bound)))
+            elif isinstance(constraint, MinLen):
+                n = constraint.min_length
+                rules.append(ColumnRule(self.column, 'min_length',
+                                        f"String should have at least {n} character{'s' if n != 1 else ''}",
+                                        lambda v, n=n: v < n))
+            elif isinstance(constraint, MaxLen):
+                n = constraint.max_length
+                rules.append(ColumnRule(self.column, 'max_length',
+                                        f"String should have at most {n} character{'s' if n != 1 else ''}",
+                                        lambda v, n=n: v > n))
+        rules.extend(ColumnRule(self.column, rule_name, message, check)
+                     for rule_name, message, check in extra_rules)
+        self.rules = rules
+
+    @property
+    def all_rules(self):
+        return [self.missing_rule, self.type_rule] + self.rules
+
+    def preparse(self, values) -> pd.Series:
+        """Strings the field's parser understands, replaced by the parsed value"""
+        values = pd.Series(values, dtype=object).reset_index(drop=True)
+        if self.parser is None:
+            return values
+        strings = np.flatnonzero(values.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool))
+        if len(strings):
+            parsed = self.parser(values.iloc[strings])
+            usable = ~np.isnan(parsed)
+            values.iloc[strings[usable]] = parsed[usable]
+        return values
+
+    def coerce(self, values: pd.Series) -> tuple:
+        """Column as float64 (numbers) or stripped lengths (strings)
+
+        Numeric columns are checked with array operations; other columns
+        are factorized and each distinct value goes through pydantic's own
+        coercion once.
+
+        Returns:
+            Tuple of (values, missing mask, wrong type mask)
+        """
+        is_numeric = (pd.api.types.is_numeric_dtype(values.dtype)
+                      and not isinstance(values.dtype, pd.CategoricalDtype))
+        if is_numeric:
+            array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(array)
+            if self.annotation is str:
+                return array, missing, ~missing
+            if self.annotation is int:
+                with np.errstate(invalid='ignore'):
+                    wrong_type = ~missing & ~(np.isfinite(array) & (array == np.floor(array)))
+                return array, missing, wrong_type
+            return array, missing, np.zeros(len(array), dtype=bool)
+
+        codes, uniques = factorize_column(values)
+        uniques = self.preparse(uniques)
+        parsed = np.full(len(uniques) + 1, np.nan)
+        unique_missing = np.zeros(len(uniques) + 1, dtype=bool)
+        unique_missing[-1] = True
+        unique_wrong_type = np.zeros(len(uniques) + 1, dtype=bool)
+        for i, value in enumerate(uniques):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                unique_missing[i] = True
+                continue
+            try:
+                coerced = self.adapter.validate_python(value)
+            except ValidationError:
+                unique_wrong_type[i] = True
+                continue
+            # Strings are checked by stripped length (str_strip_whitespace)
+            parsed[i] = len(coerced.strip()) if self.annotation is str else coerced
+        return parsed[codes], unique_missing[codes], unique_wrong_type[codes]
+
+    def first_failure(self, value):
+        """Rule failed by a single value, None if it passes
+
+        Same rules as evaluate() without building a column, for one record.
+        """
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return self.missing_rule
+        if self.parser is not None and isinstance(value, str):
+            value = self.preparse([value]).iloc[0]
+        try:
+            coerced = self.adapter.validate_python(value)
+        except ValidationError:
+            return self.type_rule
+        array = np.array([len(coerced.strip()) if self.annotation is str else coerced], dtype=np.float64)
+        for rule in self.rules:
+            with np.errstate(invalid='ignore'):
+                if rule.check(array)[0]:
+                    return rule
+        return None
+
+    def evaluate(self, values) -> dict:
+        """Failure mask per rule id, each row failing at most one rule"""
+        if values is None:
+            return {self.missing_rule.rule_id: None}
+
+        array, missing, wrong_type = self.coerce(pd.Series(values))
+        failures = {self.missing_rule.rule_id: missing, self.type_rule.rule_id: wrong_type}
+        failed = missing | wrong_type
+        for rule in self.rules:
+            with np.errstate(invalid='ignore'):
+                bad = ~failed & rule.check(array)
+            failures[rule.rule_id] = bad
+            failed |= bad
+        return failures
+
+
+class ColumnarValidation:
+    """Result of validating a batch of rows column by column"""
+
+    def __init__(self, n_rows, rules, failures, index=None):
+        self.n_rows = n_rows
+        self.rules = rules
+        self.failures = failures
+        self.index = index if index is not None else pd.RangeIndex(n_rows)
+
+    @property
+    def invalid(self) -> np.ndarray:
+        """True for every row failing at least one rule"""
+        invalid = np.zeros(self.n_rows, dtype=bool)
+        for mask in self.failures.values():
+            invalid |= mask
+        return invalid
+
+    def rule_counts(self) -> dict:
+        """Number of failing rows per rule, only rules that failed"""
+        counts = {rule_id: int(mask.sum()) for rule_id, mask in self.failures.items()}
+        return {rule_id: count for rule_id, count in counts.items() if count}
+
+    def sample_indices(self, limit=5) -> dict:
+        """Index labels of the first failing rows per rule"""
+        return {
+            rule_id: self.index[np.flatnonzero(mask)[:limit]].tolist()
+            for rule_id, mask in self.failures.items() if mask.any()
+        }
+
+    def row_errors(self) -> dict:
+        """Structured errors of every failing row, keyed by row position"""
+        errors = {}
+        for rule_id, mask in self.failures.items():
+            rule = self.rules[rule_id]
+            for row in np.flatnonzero(mask):
+                errors.setdefault(int(row), []).append(rule.error())
+        return errors
+
+
+class CompiledSchema:
+    """A pydantic model's field constraints as whole-column checks
+
+    Columns are matched by alias (the CSV/API names such as 'Prod. year').
+    Checks added by @validator methods are not introspectable and are
+    declared alongside them in VALIDATOR_RULES (checks) and
+    VALIDATOR_PARSERS (pre=True parsing of raw strings).
+    """
+
+    def __init__(self, model=CarFeatures, validator_rules=None, validator_parsers=None):
+        validator_rules = VALIDATOR_RULES if validator_rules is None else validator_rules
+        validator_parsers = VALIDATOR_PARSERS if validator_parsers is None else validator_parsers
+        self.model = model
+        self.fields = [
+            CompiledField(name, field_info, validator_rules.get(name, ()), validator_parsers.get(name))
+            for name, field_info in model.model_fields.items()
+        ]
+        self.rules = {rule.rule_id: rule for field in self.fields for rule in field.all_rules}
+
+    @property
+    def columns(self) -> list:
+        return [field.column for field in self.fields]
+
+    def record_errors(self, record: dict) -> list:
+        """Structured errors of a single record, empty if it is valid"""
+        # Valid records (the common case) only pay for one model validation
+        try:
+            self.model.model_validate(record)
+            return []
+        except ValidationError:
+            pass
+        failures = (field.first_failure(record.get(field.column)) for field in self.fields)
+        return [rule.error() for rule in failures if rule is not None]
+
+    def validate(self, data) -> ColumnarValidation:
+        """Validate a DataFrame, or a dict of column arrays/lists"""
+        if isinstance(data, pd.DataFrame):
+            n_rows, index = len(data), data.index
+        else:
+            n_rows = len(next(iter(data.values()))) if data else 0
+            index = None
+
+        failures = {}
+        for field in self.fields:
+            values = data[field.column] if field.column in data else None
+            for rule_id, mask in field.evaluate(values).items():
+                failures[rule_id] = mask if mask is not None else np.ones(n_rows, dtype=bool)
+        return ColumnarValidation(n_rows, self.rules, failures, index)
+
+
+CAR_FEATURES_SCHEMA = CompiledSchema()
@@ -1,6 +1,24 @@
+import datetime
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field, validator
 from typing import Optional
 from car_price_prediction import logger
+from car_price_prediction.components.field_parsers import parse_engine_column
+
+
+MIN_PRODUCTION_YEAR = 1886  # First car was in 1886
+MAX_MILEAGE_KM = 5_000_000  # Sanity check - 5 million km
+
+
+def max_production_year() -> int:
+    """Latest accepted production year (next year's models are on sale)"""
+    return datetime.datetime.now().year + 1
+
+
+def parse_engine_volumes(values) -> np.ndarray:
+    """Volumes of raw 'Engine volume' values such as '2.0 Turbo', NaN where none is found"""
+    return parse_engine_column(pd.Series(values, dtype=object))[0]
 
 
 class CarFeatures(BaseModel):
@@ -13,7 +31,8 @@ class CarFeatures(BaseModel):
     Category: str = Field(..., min_length=1, description="Car category")
     Leather_interior: int = Field(..., ge=0, le=1, alias="Leather interior", description="Has leather interior")
     Fuel_type: str = Field(..., min_length=1, alias="Fuel type", description="Fuel type")
-    Engine_volume: float = Field(..., gt=0, description="Engine volume in liters")
+    Engine_volume: float = Field(..., gt=0, alias="Engine volume",
+                                 description="Engine volume in liters, or the raw string such as '2.0 Turbo'")
     Mileage: float = Field(..., ge=0, description="Car mileage in km")
     Cylinders: int = Field(..., gt=0, description="Number of cylinders")
     Gear_box_type: str = Field(..., min_length=1, alias="Gear box type", description="Gearbox type")
@@ -35,25 +54,52 @@ class CarFeatures(BaseModel):
             raise ValueError('String fields cannot be empty')
         return v.strip()
     
+    @validator('Engine_volume', pre=True)
+    def parse_engine_volume(cls, v):
+        """Accept raw strings such as '2.0 Turbo'; the turbo flag is read from the raw value"""
+        if isinstance(v, str):
+            volume = parse_engine_volumes([v])[0]
+            if not np.isnan(volume):
+                return volume
+        return v
+    
     @validator('Prod_year')
     def validate_year(cls, v):
         """Validate production year"""
-        import datetime
-        current_year = datetime.datetime.now().year
-        if v > current_year + 1:
-            raise ValueError(f'Production year cannot be in the future')
-        if v < 1886:  # First car was in 1886
+        if v > max_production_year():
+            raise ValueError('Production year cannot be in the future')
+        if v < MIN_PRODUCTION_YEAR:
             raise ValueError('Production year too old')
         return v
     
     @validator('Mileage')
     def validate_mileage(cls, v):
         """Validate mileage"""
-        if v > 5000000:  # Sanity check - 5 million km
+        if v > MAX_MILEAGE_KM:
             raise ValueError('Mileage seems unrealistic')
         return v
 
 
+# The @validator checks above as (rule, message, check) over whole columns,
+# in the order they raise; check returns True for failing values
+VALIDATOR_RULES = {
+    'Prod_year': [
+        ('future_year', 'Production year cannot be in the future', lambda v: v > max_production_year()),
+        ('min_year', 'Production year too old', lambda v: v < MIN_PRODUCTION_YEAR)
+    ],
+    'Mileage': [
+        ('max_mileage', 'Mileage seems unrealistic', lambda v: v > MAX_MILEAGE_KM)
+    ]
+}
+
+
+# The pre=True validators above as column parsers: strings they understand are
+# replaced by the parsed value before type coercion
+VALIDATOR_PARSERS = {
+    'Engine_volume': parse_engine_volumes
+}
+
+
 class PredictionRequest(BaseModel):
     """Request model for prediction endpoint"""
     features: CarFeatures
@@ -73,6 +119,9 @@ class ValidationReport(BaseModel):
     errors: list = []
     warnings: list = []
     record_count: int = 0
+    invalid_count: int = 0
+    rule_counts: dict = {}  # "column:rule" -> failing rows
+    samples: dict = {}  # "column:rule" -> index labels of the first failing rows
     
     def add_error(self, field: str, message: str):
         """Add an error to the report"""
@@ -90,6 +139,9 @@ class ValidationReport(BaseModel):
             'error_count': len(self.errors),
             'warning_count': len(self.warnings),
             'record_count': self.record_count,
+            'invalid_count': self.invalid_count,
+            'rule_counts': self.rule_counts,
+            'samples': self.samples,
             'errors': self.errors[:5],  # First 5 errors
             'warnings': self.warnings[:5]  # First 5 warnings
         }
@@ -115,14 +167,23 @@ class DataValidator:
             return False, errors
     
     @staticmethod
-    def validate_dataframe(df):
-        """Validate entire dataframe"""
-        report = ValidationReport(record_count=len(df))
+    def validate_dataframe(df, sample_size: int = 5):
+        """Validate entire dataframe
+
+        Runs the CarFeatures constraints column by column (see
+        columnar_rules) and counts every failing row per rule.
+
+        Args:
+            df: DataFrame with the CSV/API column names ('Prod. year', ...)
+            sample_size: Index labels kept per failing rule
+        """
+        from car_price_prediction.schemas.columnar_rules import CAR_FEATURES_SCHEMA
+
+        report = ValidationReport(is_valid=False, record_count=len(df))
         
         try:
             # Check required columns
-            required_cols = CarFeatures.__fields__.keys()
-            missing_cols = set(required_cols) - set(df.columns)
+            missing_cols = [col for col in CAR_FEATURES_SCHEMA.columns if col not in df.columns]
             if missing_cols:
                 report.add_error("columns", f"Missing columns: {missing_cols}")
             
@@ -131,17 +192,20 @@ class DataValidator:
             if null_cols:
                 report.add_warning("nulls", f"Null values in: {null_cols}")
             
-            # Validate each row
-            for idx, row in df.iterrows():
-                try:
-                    CarFeatures(**row.to_dict())
-                except Exception as e:
-                    if idx < 5:  # Report first 5 errors
-                        report.add_error(f"row_{idx}", str(e)[:100])
+            result = CAR_FEATURES_SCHEMA.validate(df)
+            report.invalid_count = int(result.invalid.sum())
+            report.rule_counts = result.rule_counts()
+            report.samples = result.sample_indices(sample_size)
+            for rule_id, count in report.rule_counts.items():
+                report.add_error(rule_id, f"{result.rules[rule_id].message} "
+                                          f"({count} rows, e.g. {report.samples[rule_id]})")
             
             if len(report.errors) == 0:
                 report.is_valid = True
                 logger.info(f"Dataframe validation passed for {len(df)} records")
+            else:
+                logger.warning(f"Dataframe validation failed for {report.invalid_count} "
+                               f"of {len(df)} records")
             
         except Exception as e:
             report.add_error("validation", str(e))
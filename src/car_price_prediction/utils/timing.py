@@ -0,0 +1,163 @@
+"""
+Per-phase timing histograms for the API and the training pipeline
+"""
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+
+# Bucket upper bounds grow by 2^(1/8) (~9%) from 1µs to ~20 min, so a
+# quantile read from the buckets is within ~5% of the exact value
+_BUCKET_BOUNDS = [1e-6 * 2 ** (i / 8) for i in range(8 * 31)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class PhaseHistogram:
+    """Log-bucketed histogram of durations in seconds, fixed memory"""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        bucket = bisect_left(_BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Duration below which a fraction q of the records fall
+
+        Interpolated geometrically within the bucket holding the rank and
+        clamped to the smallest and largest durations recorded.
+        """
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                upper = _BUCKET_BOUNDS[bucket] if bucket < len(_BUCKET_BOUNDS) else self.max
+                lower = _BUCKET_BOUNDS[bucket - 1] if bucket else 0.0
+                fraction = (rank - seen) / n
+                value = lower * (upper / lower) ** fraction if lower else upper * fraction
+                return min(max(value, self.min), self.max)
+            seen += n
+        return self.max
+
+    def snapshot(self) -> dict:
+        summary = {'count': self.count, 'sum': self.sum,
+                   'min': self.min if self.count else math.nan, 'max': self.max}
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+class _Timer:
+    """Context manager recording its elapsed time into a histogram"""
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    """Shared no-op timer handed out while timing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class TimingRegistry:
+    """Named phase histograms with Prometheus and JSON export
+
+    Usage::
+
+        timings = TimingRegistry()
+        with timings.timer('predict'):
+            model.predict(X)
+
+    When disabled, timer() returns a shared no-op context manager, so a
+    timed block costs a method call and an empty with statement.
+    """
+
+    def __init__(self, enabled=True, prefix='car_price'):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, phase) -> PhaseHistogram:
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(phase, PhaseHistogram())
+        return histogram
+
+    def timer(self, phase):
+        """Context manager timing one execution of a phase"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(phase))
+
+    def record(self, phase, seconds):
+        """Record a duration measured elsewhere"""
+        if self.enabled:
+            self.histogram(phase).record(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def snapshot(self) -> dict:
+        """Count, sum, min, max and p50/p95/p99 per phase, in seconds"""
+        return {phase: histogram.snapshot() for phase, histogram in sorted(self.histograms.items())}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition, one summary per registry"""
+        name = f"{self.prefix}_phase_seconds"
+        lines = [
+            f"# HELP {name} Time spent per phase",
+            f"# TYPE {name} summary"
+        ]
+        for phase, summary in self.snapshot().items():
+            for q in QUANTILES:
+                value = summary[f"p{round(q * 100)}"]
+                lines.append(f'{name}{{phase="{phase}",quantile="{q}"}} {value:.9g}')
+            lines.append(f'{name}_sum{{phase="{phase}"}} {summary["sum"]:.9g}')
+            lines.append(f'{name}_count{{phase="{phase}"}} {summary["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def save_json(self, path):
+        """Write the snapshot as a JSON report"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'unit': 'seconds', 'phases': self.snapshot()}, f, indent=4)
@@ -0,0 +1,66 @@
+import os
+import sys
+from pathlib import Path
+import joblib
+import pytest
+
+# Run against the source tree without installing the package; the app and
+# ConfigurationManager read config/ relative to the repository root
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "src", ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+os.chdir(ROOT)
+
+
+@pytest.fixture(scope="session")
+def listings():
+    """Small synthetic dataset with the columns and dtypes of the real listings"""
+    from synthetic_listings import synthetic_listings
+    return synthetic_listings(3000, seed=0)
+
+
+@pytest.fixture(scope="session")
+def served_artifacts(listings, tmp_path_factory):
+    """model.pkl, preprocessor.pkl and compiled_model.npz of a small XGBoost model"""
+    xgboost = pytest.importorskip("xgboost")
+    from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+    from car_price_prediction.components.compiled_model import CompiledTreeEnsemble, file_digest
+
+    preprocessor = AdvancedPreprocessor()
+    X, y = preprocessor.preprocess(listings)
+    model = xgboost.XGBRegressor(n_estimators=30, max_depth=4, random_state=0).fit(X.to_numpy(), y)
+
+    root = tmp_path_factory.mktemp("artifacts")
+    paths = {
+        'model': root / "model.pkl",
+        'preprocessor': root / "preprocessor.pkl",
+        'compiled': root / "compiled_model.npz"
+    }
+    joblib.dump(model, paths['model'])
+    preprocessor.pipeline.save(paths['preprocessor'])
+    compiled = CompiledTreeEnsemble.from_model(model)
+    compiled.source_digest = file_digest(paths['model'])
+    compiled.save(paths['compiled'])
+    return paths
+
+
+@pytest.fixture
+def api(served_artifacts):
+    """The Flask app module serving the test artifacts, with an empty cache"""
+    import app as api_app
+
+    store = api_app.model_store
+    store.model_path = served_artifacts['model']
+    store.preprocessor_path = served_artifacts['preprocessor']
+    store.compiled_model_path = served_artifacts['compiled']
+    assert store.load() is not None, store.error
+    api_app.prediction_cache.clear()
+    return api_app
+
+
+@pytest.fixture
+def payload(listings):
+    """One listing as a /predict/price payload"""
+    from synthetic_listings import api_payloads
+    return api_payloads(listings.head(100))[0]
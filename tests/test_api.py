@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+
+def test_turbo_engine_string_sets_turbo_feature(api, payload):
+    preprocessor = api.model_store.bundle.preprocessor
+    turbo = preprocessor.turbo_position
+    plain = preprocessor.transform_one({**payload, 'Engine volume': 2.0})
+    boosted = preprocessor.transform_one({**payload, 'Engine volume': '2.0 Turbo'})
+    assert boosted[0, turbo] > plain[0, turbo]
+    np.testing.assert_array_equal(np.delete(plain, turbo), np.delete(boosted, turbo))
+
+
+def test_predict_price_accepts_turbo_string(api, payload):
+    client = api.app.test_client()
+    plain = client.post("/predict/price", json={**payload, 'Engine volume': 2.0})
+    boosted = client.post("/predict/price", json={**payload, 'Engine volume': '2.0 Turbo'})
+    assert plain.status_code == boosted.status_code == 200
+    # Different features, so not served from the same cache entry
+    assert api.prediction_cache.stats()['entries'] == 2
+
+    rejected = client.post("/predict/price", json={**payload, 'Engine volume': 'Turbo'})
+    assert rejected.status_code == 400
+    assert rejected.json['details'][0]['field'] == 'Engine volume'
+
+
+def test_batch_accepts_turbo_string(api, payload):
+    client = api.app.test_client()
+    response = client.post("/predict/batch", json=[
+        {**payload, 'Engine volume': '2.0 Turbo'}, {**payload, 'Engine volume': 'Turbo'}, payload
+    ])
+    assert response.status_code == 200
+    assert response.json['count'] == 2
+    assert response.json['predictions'][1]['details'][0]['rule'] == 'type'
+
+
+def test_mixed_batch_keeps_payload_positions(api, listings):
+    from synthetic_listings import api_payloads
+    valid = api_payloads(listings.head(50))[:3]
+    missing_field = {key: value for key, value in valid[0].items() if key != 'Manufacturer'}
+    batch = [
+        valid[0], "not a listing", {**valid[1], 'Engine volume': 'Turbo'},
+        valid[1], None, missing_field, 42, valid[2]
+    ]
+
+    client = api.app.test_client()
+    response = client.post("/predict/batch", json=batch)
+    assert response.status_code == 200
+    body = response.json
+    assert [p['index'] for p in body['predictions']] == list(range(len(batch)))
+    assert body['count'] == 3 and body['error_count'] == 5
+
+    predictions = body['predictions']
+    for i in (1, 4, 6):
+        assert predictions[i]['error'] == 'Expected an object of car features'
+    assert predictions[2]['details'][0]['field'] == 'Engine volume'
+    assert predictions[5]['details'][0] == {'field': 'Manufacturer', 'rule': 'required',
+                                            'message': 'Field required'}
+
+    # Each priced row matches the single-row endpoint
+    for i, payload in ((0, valid[0]), (3, valid[1]), (7, valid[2])):
+        single = client.post("/predict/price", json=payload)
+        assert single.status_code == 200
+        assert predictions[i]['price'] == pytest.approx(single.json['price'], rel=1e-9)
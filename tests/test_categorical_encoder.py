@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from car_price_prediction.components.categorical_encoder import CategoricalEncoder, UNKNOWN_CATEGORY_CODE
+
+
+def test_lookups_and_unknown_categories():
+    encoder = CategoricalEncoder({'Color': ['Black', 'Silver', 'White']})
+    assert encoder.encode_value('Color', 'Silver') == 1
+    assert encoder.encode_value('Color', 'Pink') == UNKNOWN_CATEGORY_CODE
+    assert encoder.encode_value('Airbags', 4) == 4
+    np.testing.assert_array_equal(encoder.encode_column('Color', ['White', 'Pink', 'Black']), [2, -1, 0])
+
+
+def test_categorical_columns_encode_like_strings():
+    encoder = CategoricalEncoder({'Color': ['Black', 'Silver', 'nan']})
+    values = pd.Series(['Silver', None, 'Black', 'Red'], dtype='category')
+    np.testing.assert_array_equal(
+        encoder.encode_column('Color', values),
+        encoder.encode_column('Color', values.astype(object).astype(str))
+    )
+
+
+def test_aliases_and_extension_keep_existing_codes():
+    encoder = CategoricalEncoder({'Doors': ['02-Mar', '04-May', '>5']})
+    encoder.add_alias('Doors', 4, '04-May')
+    assert encoder.encode_value('Doors', '4') == 1
+
+    added = encoder.extend_column('Doors', ['>5', '1', '1'])
+    assert added == ['1']
+    assert encoder.encode_value('Doors', '1') == 3
+    assert encoder.encode_value('Doors', '4') == 1
+    assert list(encoder.categories['Doors']) == ['02-Mar', '04-May', '>5', '1']
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from car_price_prediction.components.compiled_model import CompiledTreeEnsemble
+
+xgboost = pytest.importorskip("xgboost")
+
+
+def _regression(n_rows, seed, missing=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 5))
+    y = X @ np.array([3.0, -2.0, 1.0, 0.5, 0.0]) + np.sin(3 * X[:, 0]) + rng.normal(scale=0.1, size=n_rows)
+    if missing:
+        X[rng.random(X.shape) < missing] = np.nan
+    return X, y
+
+
+MODELS = {
+    'random_forest': lambda: RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0),
+    'gradient_boosting': lambda: GradientBoostingRegressor(n_estimators=40, max_depth=3, random_state=0),
+    'xgboost': lambda: xgboost.XGBRegressor(n_estimators=40, max_depth=5, random_state=0)
+}
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+@pytest.mark.parametrize("n_rows", [1, 7, 2000])
+def test_compiled_predictions_match_model(name, n_rows):
+    X, y = _regression(1000, seed=0)
+    model = MODELS[name]().fit(X, y)
+    compiled = CompiledTreeEnsemble.from_model(model)
+
+    # One row and a few rows take the all-splits path, large batches walk by level
+    X_check, _ = _regression(n_rows, seed=1)
+    np.testing.assert_allclose(compiled.predict(X_check), model.predict(X_check), rtol=1e-9, atol=0)
+    assert compiled.agrees_with(model, X_check)
+
+
+def test_compiled_xgboost_follows_missing_branches():
+    X, y = _regression(1000, seed=0, missing=0.1)
+    model = MODELS['xgboost']().fit(X, y)
+    compiled = CompiledTreeEnsemble.from_model(model)
+
+    X_check, _ = _regression(500, seed=1, missing=0.2)
+    np.testing.assert_allclose(compiled.predict(X_check), model.predict(X_check), rtol=1e-9, atol=0)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    X, y = _regression(500, seed=0)
+    model = MODELS['xgboost']().fit(X, y)
+    compiled = CompiledTreeEnsemble.from_model(model)
+    compiled.source_digest = 'abc'
+    compiled.save(tmp_path / "compiled_model.npz")
+
+    loaded = CompiledTreeEnsemble.load(tmp_path / "compiled_model.npz")
+    assert loaded.source_digest == 'abc'
+    assert loaded.n_trees == compiled.n_trees
+    np.testing.assert_array_equal(loaded.predict(X), compiled.predict(X))
+
+
+def test_unsupported_model_gets_placeholder(tmp_path):
+    X, y = _regression(100, seed=0)
+    with pytest.raises(ValueError) as e:
+        CompiledTreeEnsemble.from_model(LinearRegression().fit(X, y))
+
+    path = tmp_path / "compiled_model.npz"
+    CompiledTreeEnsemble.save_placeholder(path, str(e.value))
+    assert path.exists()
+    assert CompiledTreeEnsemble.load(path) is None
+
+
+def test_wrong_feature_count_is_rejected():
+    X, y = _regression(200, seed=0)
+    compiled = CompiledTreeEnsemble.from_model(MODELS['xgboost']().fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict(X[:, :3])
+
+
+def _store(served_artifacts, compiled_path):
+    from car_price_prediction.components.model_store import ModelStore
+    return ModelStore(served_artifacts['model'], served_artifacts['preprocessor'],
+                      warmup=False, compiled_model_path=compiled_path)
+
+
+def test_store_serves_compiled_trees(served_artifacts):
+    store = _store(served_artifacts, served_artifacts['compiled'])
+    assert store.load().compiled is not None
+    assert store.status()['compiled_model'] == 'xgboost'
+
+
+def test_store_ignores_placeholder_and_foreign_compiled_models(served_artifacts, tmp_path):
+    placeholder = tmp_path / "placeholder.npz"
+    CompiledTreeEnsemble.save_placeholder(placeholder, "not a tree ensemble")
+    assert _store(served_artifacts, placeholder).load().compiled is None
+
+    # Node arrays exported from another model.pkl must not be served
+    foreign = CompiledTreeEnsemble.load(served_artifacts['compiled'])
+    foreign.source_digest = 'not-this-model'
+    foreign.save(tmp_path / "foreign.npz")
+    assert _store(served_artifacts, tmp_path / "foreign.npz").load().compiled is None
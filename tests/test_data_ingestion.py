@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from car_price_prediction.components.data_ingestion import (DATASET_DTYPES, read_dataset_csv, load_dataset,
+                                                            iter_dataset_chunks, dataset_cache_path)
+
+CSV = """ID,Price,Levy,Manufacturer,Model,Prod. year,Category,Leather interior,Fuel type,Engine volume,Mileage,Cylinders,Gear box type,Drive wheels,Doors,Wheel,Color,Airbags
+45654403,13328,1399,LEXUS,RX 450,2010,Jeep,Yes,Hybrid,3.5,186005 km,6.0,Automatic,4x4,04-May,Left wheel,Silver,12
+44731507,,1018,CHEVROLET,Equinox,2011,Jeep,No,Petrol,3,192000 km,6.0,Tiptronic,4x4,04-May,Left wheel,Black,
+,8467,-,HONDA,FIT,,Hatchback,No,Petrol,1.3,200000 km,4.0,Variator,Front,04-May,Right-hand drive,Black,2
+45769185,3607,862,FORD,Escape,2011,Jeep,Yes,Hybrid,2.5 Turbo,168966 km,4.0,Automatic,4x4,04-May,Left wheel,White,0
+"""
+
+
+@pytest.fixture
+def listings_csv(tmp_path):
+    path = tmp_path / "listings.csv"
+    path.write_text(CSV)
+    return path
+
+
+def test_blank_numeric_cells_read_as_nan(listings_csv):
+    df = read_dataset_csv(listings_csv)
+    expected = pd.read_csv(listings_csv)
+    assert len(df) == 4
+    for col in ('ID', 'Price', 'Prod. year', 'Airbags'):
+        assert df[col].dtype == DATASET_DTYPES[col]
+        np.testing.assert_array_equal(df[col].to_numpy(), expected[col].to_numpy(dtype=float))
+
+
+def test_chunked_reader_matches_full_read(listings_csv):
+    chunks = list(iter_dataset_chunks(listings_csv, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True).astype(str), read_dataset_csv(listings_csv).astype(str)
+    )
+
+
+def test_cache_round_trip_and_invalidation(listings_csv):
+    pytest.importorskip("pyarrow")
+    from car_price_prediction.components.data_ingestion import DataIngestion
+
+    ingestion = DataIngestion.__new__(DataIngestion)
+    [cache_path] = ingestion.build_dataset_cache([listings_csv])
+    assert cache_path == dataset_cache_path(listings_csv)
+    pd.testing.assert_frame_equal(load_dataset(listings_csv), read_dataset_csv(listings_csv))
+
+    # A rewritten CSV is read directly instead of the stale cache
+    listings_csv.write_text(CSV + CSV.splitlines()[1] + "\n")
+    os.utime(listings_csv, ns=(0, 0))
+    assert len(load_dataset(listings_csv)) == 5
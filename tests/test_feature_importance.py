@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from car_price_prediction.components.feature_importance import (correlated_feature_groups,
+                                                                tree_contributions)
+
+xgboost = pytest.importorskip("xgboost")
+
+
+def _regression(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    # float32 input, as tree_contributions walks the trees in float32
+    X = rng.normal(size=(n_rows, 5)).astype(np.float32)
+    y = X @ np.array([3.0, -2.0, 1.0, 0.5, 0.0]) + np.sin(3 * X[:, 0]) + rng.normal(scale=0.1, size=n_rows)
+    return X, y
+
+
+MODELS = {
+    'random_forest': lambda: RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0),
+    'gradient_boosting': lambda: GradientBoostingRegressor(n_estimators=40, max_depth=3, random_state=0),
+    'xgboost': lambda: xgboost.XGBRegressor(n_estimators=40, max_depth=5, random_state=0)
+}
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_contributions_add_up_to_the_prediction(name):
+    X, y = _regression(1000, seed=0)
+    model = MODELS[name]().fit(X, y)
+    X_check, _ = _regression(300, seed=1)
+
+    contributions, bias = tree_contributions(model, X_check)
+    assert contributions.shape == X_check.shape
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), model.predict(X_check), rtol=1e-5, atol=1e-4)
+    # The unused fifth feature only gets what the noise fitted
+    assert np.abs(contributions[:, 0]).mean() > 10 * np.abs(contributions[:, 4]).mean()
+
+
+def test_early_stopped_xgboost_contributions_use_the_best_iteration():
+    X, y = _regression(1000, seed=0)
+    X_valid, y_valid = _regression(200, seed=2)
+    model = xgboost.XGBRegressor(n_estimators=500, learning_rate=0.5, early_stopping_rounds=3, random_state=0)
+    model.fit(X, y, eval_set=[(X_valid, y_valid)], verbose=False)
+    assert model.best_iteration + 1 < model.get_booster().num_boosted_rounds()
+
+    contributions, bias = tree_contributions(model, X_valid)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), model.predict(X_valid), rtol=1e-5, atol=1e-4)
+
+
+def test_unsupported_models_have_no_contributions():
+    X, y = _regression(100, seed=0)
+    assert tree_contributions(LinearRegression().fit(X, y), X) is None
+
+
+def test_perfectly_correlated_columns_share_a_group():
+    rng = np.random.default_rng(0)
+    a, b, c = rng.normal(size=(3, 500))
+    # A monotone transform and a negated copy are perfectly rank-correlated
+    X = np.column_stack([a, b, np.exp(a), c, -b])
+
+    assert correlated_feature_groups(X, threshold=0.8) == [[0, 2], [1, 4], [3]]
+    assert correlated_feature_groups(X, threshold=None) == [[0], [1], [2], [3], [4]]
+    # Constant columns have no correlation and stay on their own
+    assert correlated_feature_groups(np.column_stack([a, np.ones(500), a]), threshold=0.8) == [[0, 2], [1]]
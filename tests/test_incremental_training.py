@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from car_price_prediction.components.incremental_training import continue_training
+from car_price_prediction.components.model_comparison import _fit_estimator
+
+xgboost = pytest.importorskip("xgboost")
+
+
+def _regression(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 4))
+    y = X @ np.array([1.0, 2.0, -1.5, 0.5]) + rng.normal(scale=0.1, size=n_rows)
+    return X, y
+
+
+def test_continue_early_stopped_xgboost():
+    X, y = _regression(600, seed=0)
+    X_new, y_new = _regression(200, seed=1)
+    model = _fit_estimator(xgboost.XGBRegressor(n_estimators=500, learning_rate=0.3, random_state=0),
+                           X, y, early_stopping_rounds=5)
+    best_rounds = model.best_iteration + 1
+    assert best_rounds < model.get_booster().num_boosted_rounds()
+
+    continue_training(model, X_new, y_new, extra_rounds=10)
+
+    booster = model.get_booster()
+    assert booster.num_boosted_rounds() == best_rounds + 10
+    assert model.n_estimators == best_rounds + 10
+    assert booster.attr("best_iteration") is None
+    # predict() uses every round, including the new ones
+    np.testing.assert_allclose(model.predict(X_new), booster.predict(xgboost.DMatrix(X_new)), rtol=1e-6)
+    assert model.predict(X_new).tolist() != booster[:best_rounds].predict(xgboost.DMatrix(X_new)).tolist()
+
+
+def test_continue_random_forest_adds_trees():
+    X, y = _regression(300, seed=0)
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y)
+    continue_training(model, *_regression(100, seed=1), extra_trees=3)
+    assert len(model.estimators_) == 8
+    assert not model.warm_start
+
+
+def test_continue_linear_model_is_rejected():
+    from sklearn.linear_model import LinearRegression
+    X, y = _regression(50, seed=0)
+    with pytest.raises(ValueError):
+        continue_training(LinearRegression().fit(X, y), X, y)
@@ -0,0 +1,109 @@
+import json
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.model_selection import KFold
+from car_price_prediction.components import model_comparison
+from car_price_prediction.components.model_comparison import ModelComparison, ModelFactory
+
+
+@pytest.fixture(scope="module")
+def regression():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1500, 5))
+    y = X @ np.array([3.0, -2.0, 1.0, 0.5, 0.0]) + np.sin(3 * X[:, 0]) + rng.normal(scale=0.3, size=1500)
+    return X[:1200], y[:1200], X[1200:], y[1200:]
+
+
+def _serial_results(X_train, y_train, X_test, y_test, cv_folds=3):
+    """What compare_models reports, computed one fit at a time"""
+    results = {}
+    for name, model in ModelFactory().get_all_models().items():
+        scores = []
+        for fit_idx, valid_idx in KFold(cv_folds).split(X_train):
+            estimator = clone(model).fit(X_train[fit_idx], y_train[fit_idx])
+            scores.append(r2_score(y_train[valid_idx], estimator.predict(X_train[valid_idx])))
+        y_pred = clone(model).fit(X_train, y_train).predict(X_test)
+        mse = mean_squared_error(y_test, y_pred)
+        results[name] = {
+            'cv_mean': float(np.mean(scores)),
+            'cv_std': float(np.std(scores)),
+            'test_r2': float(r2_score(y_test, y_pred)),
+            'test_rmse': float(np.sqrt(mse)),
+            'test_mae': float(mean_absolute_error(y_test, y_pred)),
+            'test_mse': float(mse)
+        }
+    return results
+
+
+def test_job_pool_matches_a_serial_comparison(regression, tmp_path, monkeypatch):
+    # Four workers even on a single-core machine
+    monkeypatch.setattr(model_comparison, 'cpu_count', lambda: 4)
+    comparison = ModelComparison(output_dir=tmp_path)
+    results = comparison.run_comparison(*regression, cv_folds=3, n_jobs=4)
+    with open(comparison.save_comparison()) as f:
+        saved = json.load(f)
+
+    expected = _serial_results(*regression)
+    assert list(saved) == list(expected)
+    for name, metrics in expected.items():
+        assert saved[name] == pytest.approx(metrics, rel=1e-6), name
+        assert results[name] == saved[name]
+    assert set(comparison.factory.fitted_models) == set(expected)
+
+
+def test_evict_losers_keeps_only_the_winner(regression, tmp_path):
+    comparison = ModelComparison(output_dir=tmp_path)
+    comparison.run_comparison(*regression, cv_folds=3, n_jobs=2, evict_losers=True)
+
+    best = comparison.get_best_model()
+    assert list(comparison.factory.fitted_models) == [best]
+    estimator = comparison.get_best_estimator()
+    assert estimator.predict(regression[2]).shape == (len(regression[2]),)
+    # Hand back with the thread settings of the factory model
+    assert estimator.get_params().get('n_jobs') == comparison.factory.models[best].get_params().get('n_jobs')
+
+
+def test_successive_halving_advances_the_top_fraction(regression, tmp_path, monkeypatch):
+    rungs = {}
+    fit_and_score = model_comparison._fit_and_score
+
+    def recording_fit_and_score(model, X_train, y_train, X_test, y_test, fold, *args, **kwargs):
+        output = fit_and_score(model, X_train, y_train, X_test, y_test, fold, *args, **kwargs)
+        if kwargs.get('params') is not None:
+            rungs.setdefault(len(fold[0]), {})[type(model).__name__] = output['r2']
+        return output
+
+    # n_jobs=1 runs the jobs in this process, where the recorder is installed
+    monkeypatch.setattr(model_comparison, '_fit_and_score', recording_fit_and_score)
+    comparison = ModelComparison(output_dir=tmp_path)
+    results = comparison.run_comparison(*regression, cv_folds=3, n_jobs=1, mode='successive_halving',
+                                        halving_factor=2, halving_min_rows=150, halving_min_estimators=5)
+
+    # 1200 rows leave 960 to subsample: 4 models on 150 rows, 2 on 300, 1 finalist
+    assert sorted(rungs) == [150, 300]
+    names = {type(model).__name__: name for name, model in comparison.factory.models.items()}
+    advanced = sorted(rungs[150], key=rungs[150].get, reverse=True)[:2]
+    assert sorted(rungs[300]) == sorted(advanced)
+    finalist = max(rungs[300], key=rungs[300].get)
+    assert comparison.finalists == [names[finalist]]
+
+    # Dropped models keep the validation R² of their last rung
+    last_scores = {model_name: r2 for rows in sorted(rungs) for model_name, r2 in rungs[rows].items()}
+    for model_name, r2 in last_scores.items():
+        if names[model_name] not in comparison.finalists:
+            assert results[names[model_name]]['cv_mean'] == r2
+            assert results[names[model_name]]['cv_std'] == 0.0
+
+    best = comparison.get_best_model()
+    assert best == names[finalist]
+    assert comparison.get_best_estimator() is comparison.factory.fitted_models[best]
+
+
+def test_budget_params_scale_the_number_of_trees():
+    factory = ModelFactory()
+    assert factory._budget_params('random_forest', 0.5, min_estimators=20) == {'n_estimators': 50}
+    assert factory._budget_params('xgboost', 0.01, min_estimators=20) == {'n_estimators': 20}
+    assert factory._budget_params('gradient_boosting', 3.0, min_estimators=20) == {'n_estimators': 100}
+    assert factory._budget_params('linear_regression', 0.5, min_estimators=20) == {}
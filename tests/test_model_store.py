@@ -0,0 +1,62 @@
+import os
+import shutil
+import pytest
+from car_price_prediction.components.model_store import ModelStore
+
+
+@pytest.fixture
+def artifacts(served_artifacts, tmp_path):
+    """Private copy of the served artifacts that a test may overwrite"""
+    paths = {name: tmp_path / path.name for name, path in served_artifacts.items()}
+    for name, path in served_artifacts.items():
+        shutil.copy2(path, paths[name])
+    return paths
+
+
+def _touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_missing_artifacts_leave_the_store_failed(tmp_path):
+    store = ModelStore(tmp_path / "model.pkl", tmp_path / "preprocessor.pkl")
+    assert store.load() is None
+    assert store.state == ModelStore.FAILED
+    assert not store.ready
+
+
+def test_reload_swaps_in_the_new_version(artifacts):
+    store = ModelStore(artifacts['model'], artifacts['preprocessor'], warmup=True,
+                       compiled_model_path=artifacts['compiled'])
+    published = []
+    store.add_listener(published.append)
+    first = store.load()
+    assert store.ready and first.warmup_seconds > 0
+
+    _touch(artifacts['model'])
+    second = store.reload()
+    assert second is not first and store.bundle is second
+    assert store.version == store.fingerprint() != first.version
+    assert published == [first, second]
+    assert store.last_reload['status'] == 'succeeded'
+
+
+def test_failed_reload_keeps_serving_the_previous_bundle(artifacts):
+    store = ModelStore(artifacts['model'], artifacts['preprocessor'], warmup=False)
+    bundle = store.load()
+
+    artifacts['model'].write_bytes(b'not a pickle')
+    assert store.reload() is None
+    assert store.bundle is bundle and store.ready
+    assert store.last_reload['status'] == 'failed'
+
+
+def test_reload_endpoint_waits_for_the_new_model(api, served_artifacts):
+    client = api.app.test_client()
+    previous = api.model_store.version
+    _touch(served_artifacts['model'])
+
+    response = client.post("/admin/reload?wait=true")
+    assert response.status_code == 200
+    assert response.json['model_version'] != previous
+    assert response.json['last_reload']['previous_version'] == previous
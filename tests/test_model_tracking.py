@@ -0,0 +1,142 @@
+import threading
+import time
+import pytest
+
+mlflow = pytest.importorskip("mlflow")
+from mlflow.tracking import MlflowClient
+from car_price_prediction import model_tracking
+from car_price_prediction.model_tracking import (
+    MLFlowTracker, MAX_BATCH_ENTITIES, MAX_BATCH_METRICS, MAX_BATCH_PARAMS, MAX_BATCH_TAGS
+)
+
+
+@pytest.fixture(scope="module")
+def tracking_uri(tmp_path_factory):
+    """Local sqlite tracking store shared by the tests of this module"""
+    return f"sqlite:///{tmp_path_factory.mktemp('mlruns') / 'mlflow.db'}"
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Sizes of every log_batch request as (metrics, params, tags)"""
+    sizes = []
+    log_batch = MlflowClient.log_batch
+
+    def recording_log_batch(self, run_id, metrics=(), params=(), tags=(), **kwargs):
+        sizes.append((len(metrics), len(params), len(tags)))
+        return log_batch(self, run_id, metrics=metrics, params=params, tags=tags, **kwargs)
+
+    monkeypatch.setattr(MlflowClient, 'log_batch', recording_log_batch)
+    return sizes
+
+
+def _stored_run(tracking_uri, tracker):
+    tracker._run_started.wait(10)
+    return MlflowClient(tracking_uri).get_run(tracker.run_id)
+
+
+def _hold_worker(tracker):
+    """Block the background thread until the returned event is set"""
+    release = threading.Event()
+    process = tracker._process
+    tracker._process = lambda operations: (release.wait(10), process(operations))
+    return release
+
+
+def test_batches_stay_within_log_batch_limits(tracking_uri, batches):
+    tracker = MLFlowTracker(tracking_uri=tracking_uri, experiment_name='limits')
+    tracker.start_run(run_name='limits')
+    release = _hold_worker(tracker)
+    # Queued while the worker is busy, so all of it arrives in one drain
+    tracker.log_params({f"param_{i}": i for i in range(250)})
+    tracker.set_tags({f"tag_{i}": i for i in range(120)})
+    tracker.log_metrics({f"metric_{i}": i for i in range(2500)})
+    release.set()
+    run = _stored_run(tracking_uri, tracker)
+    assert tracker.end_run()
+
+    assert len(batches) > 1
+    for n_metrics, n_params, n_tags in batches:
+        assert n_metrics <= MAX_BATCH_METRICS
+        assert n_params <= MAX_BATCH_PARAMS
+        assert n_tags <= MAX_BATCH_TAGS
+        assert n_metrics + n_params + n_tags <= MAX_BATCH_ENTITIES
+
+    run = MlflowClient(tracking_uri).get_run(run.info.run_id)
+    assert len(run.data.params) == 250
+    assert len(run.data.metrics) == 2500
+    assert run.data.tags['tag_119'] == '119'
+    assert run.info.status == 'FINISHED'
+
+
+def test_metric_history_keeps_order_and_steps(tracking_uri):
+    tracker = MLFlowTracker(tracking_uri=tracking_uri, experiment_name='history')
+    tracker.start_run(run_name='history')
+    for step in range(50):
+        tracker.log_metrics({'loss': 1.0 / (step + 1), 'step_value': step}, step=step)
+    run = _stored_run(tracking_uri, tracker)
+    assert tracker.end_run()
+
+    history = MlflowClient(tracking_uri).get_metric_history(run.info.run_id, 'loss')
+    assert [m.step for m in history] == list(range(50))
+    assert [m.value for m in history] == [1.0 / (step + 1) for step in range(50)]
+
+
+def test_full_queue_drops_logging_but_not_the_end_of_the_run(tracking_uri):
+    tracker = MLFlowTracker(tracking_uri=tracking_uri, experiment_name='full', max_queue_size=5)
+    tracker.start_run(run_name='full')
+    run = _stored_run(tracking_uri, tracker)
+    release = _hold_worker(tracker)
+    tracker.log_metrics({'first': 1.0})
+    time.sleep(0.1)  # the worker now holds 'first' and waits
+
+    for i in range(20):
+        tracker.log_metrics({f"metric_{i}": i})
+    assert tracker.dropped == 15
+
+    # end_run waits for room instead of dropping the end of the run
+    ended = threading.Thread(target=tracker.end_run)
+    ended.start()
+    time.sleep(0.2)
+    release.set()
+    ended.join(10)
+
+    run = MlflowClient(tracking_uri).get_run(run.info.run_id)
+    assert run.info.status == 'FINISHED'
+    assert set(run.data.metrics) == {'first'} | {f"metric_{i}" for i in range(5)}
+
+
+def test_end_run_gives_up_after_flush_timeout(tracking_uri):
+    tracker = MLFlowTracker(tracking_uri=tracking_uri, experiment_name='slow', flush_timeout=0.5)
+    tracker.start_run(run_name='slow')
+    _stored_run(tracking_uri, tracker)
+    release = _hold_worker(tracker)
+    tracker.log_metrics({'slow': 1.0})
+
+    start = time.monotonic()
+    assert not tracker.end_run()
+    assert time.monotonic() - start < 1.5
+    release.set()
+    assert tracker.flush(10)
+
+
+def test_register_model_runs_on_the_background_thread(tracking_uri, monkeypatch):
+    registered = []
+    monkeypatch.setattr(
+        model_tracking.mlflow, 'register_model',
+        lambda uri, name: registered.append((uri, name, threading.current_thread().name))
+    )
+    tracker = MLFlowTracker(tracking_uri=tracking_uri, experiment_name='registry')
+    assert tracker.register_model('runs:/abc/model', 'car_price')
+    assert tracker.flush(10)
+    assert registered == [('runs:/abc/model', 'car_price', 'mlflow-tracker')]
+
+
+def test_disabled_tracker_does_nothing(monkeypatch):
+    monkeypatch.setattr(model_tracking, 'MLFLOW_AVAILABLE', False)
+    tracker = MLFlowTracker()
+    tracker.start_run(run_name='disabled')
+    tracker.log_metrics({'r2': 0.9})
+    assert not tracker.register_model('runs:/abc/model', 'car_price')
+    assert tracker.end_run()
+    assert tracker._worker is None
@@ -0,0 +1,88 @@
+import os
+import pytest
+from car_price_prediction.components import prediction_cache as cache_module
+from car_price_prediction.components.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', clock)
+    return clock
+
+
+def test_keys_are_scoped_to_the_model_version():
+    cache = PredictionCache(max_entries=10, ttl_seconds=0)
+    cache.put(PredictionCache.make_key('v1', [1.0, 'BMW']), 100.0)
+    assert cache.get(PredictionCache.make_key('v1', (1.0, 'BMW'))) == 100.0
+    assert cache.get(PredictionCache.make_key('v2', [1.0, 'BMW'])) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_entries=2, ttl_seconds=0)
+    cache.put('a', 1.0)
+    cache.put('b', 2.0)
+    assert cache.get('a') == 1.0
+    cache.put('c', 3.0)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1.0 and cache.get('c') == 3.0
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(max_entries=10, ttl_seconds=5)
+    cache.put('a', 1.0)
+    clock.now += 4.9
+    assert cache.get('a') == 1.0
+    clock.now += 0.1
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_zero_entries_disables_the_cache():
+    cache = PredictionCache(max_entries=0)
+    cache.put('a', 1.0)
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_equivalent_payloads_share_an_entry(api, payload):
+    client = api.app.test_client()
+    before = api.prediction_cache.stats()
+    first = client.post("/predict/price", json={**payload, 'Engine volume': 2, 'Cylinders': 4})
+    second = client.post("/predict/price", json={**payload, 'Engine volume': '2.0', 'Cylinders': 4.0})
+    assert first.status_code == second.status_code == 200
+    assert first.json['price'] == second.json['price']
+
+    stats = api.prediction_cache.stats()
+    assert stats['entries'] == 1
+    assert stats['hits'] - before['hits'] == 1
+    assert stats['misses'] - before['misses'] == 1
+
+
+def test_reload_invalidates_cached_predictions(api, payload, served_artifacts):
+    client = api.app.test_client()
+    client.post("/predict/price", json=payload)
+    previous = api.model_store.version
+    before = api.prediction_cache.stats()
+
+    # New artifact files give a new version; publishing it clears the cache
+    stat = os.stat(served_artifacts['model'])
+    os.utime(served_artifacts['model'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert api.model_store.reload() is not None
+    assert api.model_store.version != previous
+    assert api.prediction_cache.stats()['entries'] == 0
+    assert api.prediction_cache.stats()['invalidations'] == before['invalidations'] + 1
+
+    client.post("/predict/price", json=payload)
+    assert api.prediction_cache.stats()['misses'] == before['misses'] + 1
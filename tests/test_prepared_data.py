@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from sklearn.model_selection import train_test_split
+from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor
+from car_price_prediction.components.compiled_model import file_digest
+from car_price_prediction.components.data_ingestion import load_dataset
+from car_price_prediction.components.preprocessing_pipeline import (PreprocessingPipeline,
+                                                                    RAW_FEATURE_COLUMNS)
+from car_price_prediction.components.prepared_data import (PreparedData, PreparedDataStore,
+                                                           config_fingerprint, load_prepared_data)
+from car_price_prediction.entity.config_entity import PreparedDataConfig
+
+
+@pytest.fixture
+def config(listings, tmp_path):
+    """Prepared data config over a CSV of the listings and a fitted pipeline"""
+    data_path = tmp_path / "listings.csv"
+    listings.to_csv(data_path, index=False)
+    config = PreparedDataConfig(
+        root_dir=tmp_path / "prepared_data",
+        data_path=data_path,
+        preprocessor_path=tmp_path / "preprocessor.pkl",
+        feature_columns=list(RAW_FEATURE_COLUMNS),
+        target_column='Price',
+        test_size=0.2,
+        random_state=42
+    )
+    preprocessor = AdvancedPreprocessor()
+    X, _ = preprocessor.clean(listings)
+    preprocessor.pipeline.fit(X)
+    preprocessor.pipeline.save(config.preprocessor_path)
+    return config
+
+
+def _save(config, split, fingerprint):
+    """Persist the split the way training does, under the given fingerprint"""
+    preprocessor = AdvancedPreprocessor()
+    preprocessor.pipeline = PreprocessingPipeline.load(config.preprocessor_path)
+    prepared = PreparedData.recompute(load_dataset(config.data_path), preprocessor,
+                                      fingerprint=fingerprint, split=split)
+    PreparedDataStore(config.root_dir).save(prepared, config.preprocessor_path, config.data_path)
+    return prepared
+
+
+def test_stale_data_keeps_the_split_the_model_was_trained_on(config, listings):
+    # An incremental run keeps the previous split and splits appended rows on
+    # their own, so its split is not the one a fresh train_test_split makes
+    X, y = AdvancedPreprocessor().clean(listings)
+    old, new = X.index[:2000], X.index[2000:]
+    old_train, old_test = train_test_split(old, test_size=0.2, random_state=42)
+    new_train, new_test = train_test_split(new, test_size=0.2, random_state=42)
+    split = (np.concatenate([old_train, new_train]), np.concatenate([old_test, new_test]))
+    _, fresh_test = train_test_split(X.index, test_size=0.2, random_state=42)
+    assert len(np.intersect1d(fresh_test, split[0])) > 0
+
+    saved = _save(config, split, fingerprint='made-by-older-code')
+    prepared = load_prepared_data(config)
+
+    np.testing.assert_array_equal(prepared.train_index, split[0])
+    np.testing.assert_array_equal(prepared.test_index, split[1])
+    np.testing.assert_array_equal(prepared.X_test, saved.X_test)
+    assert prepared.fingerprint != 'made-by-older-code'
+
+
+def test_matching_fingerprint_loads_memory_mapped(config):
+    load_prepared_data(config)
+    prepared = PreparedDataStore(config.root_dir).load(config_fingerprint(config), config.preprocessor_path)
+    assert isinstance(prepared.X_train, np.memmap)
+    assert not prepared.X_train.flags.writeable
+
+
+def test_stale_fingerprint_triggers_recompute(config, listings):
+    X, _ = AdvancedPreprocessor().clean(listings)
+    train_index, _ = train_test_split(X.index, test_size=0.2, random_state=42)
+    first = load_prepared_data(config)
+    np.testing.assert_array_equal(first.train_index, train_index)
+
+    store = PreparedDataStore(config.root_dir)
+    assert store.load('another-fingerprint') is None
+    # Any other file stands in for a refitted preprocessor.pkl
+    assert store.load(config_fingerprint(config), preprocessor_path=config.data_path) is None
+
+    # A rewritten dataset changes the fingerprint and gets a new split
+    listings.iloc[::-1].to_csv(config.data_path, index=False)
+    assert store.load(config_fingerprint(config)) is None
+    second = load_prepared_data(config)
+    assert second.fingerprint == config_fingerprint(config) != first.fingerprint
+    assert store.load(second.fingerprint, config.preprocessor_path) is not None
+
+
+def test_half_written_directory_is_rejected(config):
+    load_prepared_data(config)
+    store = PreparedDataStore(config.root_dir)
+    # An interrupted save removes metadata.json first and writes it last
+    store.metadata_path.unlink()
+
+    assert store.load(config_fingerprint(config), config.preprocessor_path) is None
+    assert store.load_split(file_digest(config.data_path)) is None
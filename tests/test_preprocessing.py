@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor, split_positions
+
+
+def test_turbo_flag_survives_cleaning(listings):
+    preprocessor = AdvancedPreprocessor()
+    X, _ = preprocessor.preprocess(listings.copy())
+    raw, _ = preprocessor.clean(listings.copy())
+
+    turbo = X['Engine_Turbo'].to_numpy() > 0
+    expected = raw['Engine volume'].astype(str).str.contains('Turbo').to_numpy()
+    assert expected.any()
+    np.testing.assert_array_equal(turbo, expected)
+
+
+def test_inplace_matches_copying_path(listings):
+    df = listings.copy()
+    df.loc[[5, 9], 'Price'] = np.nan
+
+    copying = AdvancedPreprocessor()
+    X_expected, y_expected = copying.preprocess(df.copy())
+    inplace = AdvancedPreprocessor()
+    X, y = inplace.preprocess(df.copy(), inplace=True)
+
+    assert X.dtype == np.float32
+    pd.testing.assert_series_equal(y, y_expected)
+    np.testing.assert_allclose(X, X_expected.to_numpy(), rtol=1e-4, atol=1e-4)
+    assert inplace.pipeline.medians == copying.pipeline.medians
+    assert inplace.pipeline.encoder.tables == copying.pipeline.encoder.tables
+
+
+def test_inplace_consumes_the_frame(listings):
+    df = listings.copy()
+    preprocessor = AdvancedPreprocessor()
+    preprocessor.preprocess(df, inplace=True)
+    assert not set(preprocessor.pipeline.raw_columns) & set(df.columns)
+
+
+def test_inplace_fits_on_training_positions_only(listings):
+    copying = AdvancedPreprocessor()
+    X_raw, y_raw = copying.clean(listings.copy())
+    train_rows, test_rows = split_positions(len(y_raw))
+    X_train_expected = copying.pipeline.fit_transform(X_raw.iloc[train_rows])
+    X_test_expected = copying.pipeline.transform(X_raw.iloc[test_rows])
+
+    inplace = AdvancedPreprocessor()
+    X, y = inplace.preprocess_inplace(listings.copy(), fit_rows=lambda n: split_positions(n)[0])
+
+    assert len(y) == len(y_raw)
+    assert inplace.pipeline.medians == copying.pipeline.medians
+    assert inplace.pipeline.encoder.tables == copying.pipeline.encoder.tables
+    np.testing.assert_allclose(inplace.pipeline.scaler.mean_, copying.pipeline.scaler.mean_, rtol=1e-5)
+    np.testing.assert_allclose(X[train_rows], X_train_expected, rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose(X[test_rows], X_test_expected, rtol=1e-4, atol=1e-4)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+from car_price_prediction.schemas.prediction_schema import CarFeatures, DataValidator
+from car_price_prediction.schemas.columnar_rules import CAR_FEATURES_SCHEMA
+
+
+def test_engine_volume_accepts_raw_strings(payload):
+    assert CarFeatures(**{**payload, 'Engine volume': '2.0 Turbo'}).Engine_volume == 2.0
+    assert CarFeatures(**{**payload, 'Engine volume': '1.6'}).Engine_volume == 1.6
+    with pytest.raises(ValidationError):
+        CarFeatures(**{**payload, 'Engine volume': 'Turbo'})
+    with pytest.raises(ValidationError):
+        CarFeatures(**{**payload, 'Engine volume': '0 Turbo'})
+
+
+def test_record_errors_match_pydantic(payload):
+    assert CAR_FEATURES_SCHEMA.record_errors({**payload, 'Engine volume': '3.5 Turbo'}) == []
+    [error] = CAR_FEATURES_SCHEMA.record_errors({**payload, 'Engine volume': 'Turbo'})
+    assert (error['field'], error['rule']) == ('Engine volume', 'type')
+    [error] = CAR_FEATURES_SCHEMA.record_errors({**payload, 'Doors': 9})
+    assert (error['field'], error['rule']) == ('Doors', 'le')
+
+
+def test_columnar_validation_agrees_with_pydantic(listings):
+    from synthetic_listings import api_payloads
+    records = api_payloads(listings.head(200))
+    records[0]['Engine volume'] = '2.0 Turbo'
+    records[1]['Engine volume'] = 'Turbo'
+    records[2]['Mileage'] = 10_000_000
+    records[3]['Prod. year'] = 1700
+    records[4]['Manufacturer'] = '   '
+    del records[5]['Color']
+    records[6]['Levy'] = 'n/a'
+
+    result = CAR_FEATURES_SCHEMA.validate(pd.DataFrame.from_records(records))
+    expected = []
+    for record in records:
+        try:
+            CarFeatures(**record)
+            expected.append(False)
+        except ValidationError:
+            expected.append(True)
+    np.testing.assert_array_equal(result.invalid, expected)
+    assert result.rule_counts()['Engine volume:type'] == 1
+    assert result.rule_counts()['Mileage:max_mileage'] == 1
+
+
+def test_validate_dataframe_report(listings):
+    from synthetic_listings import api_payloads
+    df = pd.DataFrame.from_records(api_payloads(listings.head(50)))
+    df.loc[[3, 7], 'Airbags'] = 40
+    report = DataValidator.validate_dataframe(df)
+    assert not report.is_valid
+    assert report.invalid_count == 2
+    assert report.samples == {'Airbags:le': [3, 7]}
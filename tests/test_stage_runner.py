@@ -0,0 +1,171 @@
+import os
+from pathlib import Path
+import pytest
+import yaml
+from car_price_prediction.entity.config_entity import StageRunnerConfig
+from car_price_prediction.pipeline.stage_runner import StageRunner, load_stage_specs
+
+
+class ToyStage:
+    """No-op stage: appends its name to runs.log and writes its inputs into its outputs
+
+    Spawned stage workers find the toy directory through the environment.
+    """
+    name = None
+    deps = ()
+    outs = ()
+
+    def main(self):
+        root = Path(os.environ['TOY_PIPELINE_DIR'])
+        with open(root / "runs.log", 'a') as f:
+            f.write(f"{self.name}\n")
+        text = "".join(_read(root / dep) for dep in self.deps)
+        for out in self.outs:
+            path = root / out
+            if not path.suffix:
+                path.mkdir(exist_ok=True)
+                path = path / "result.txt"
+            path.write_text(f"{self.name}({text})")
+
+
+class StageA(ToyStage):
+    name, deps, outs = 'a', ('source.txt',), ('a.txt',)
+
+
+class StageB(ToyStage):
+    name, deps, outs = 'b', ('a.txt',), ('b.txt',)
+
+
+class StageC(ToyStage):
+    name, deps, outs = 'c', ('a.txt',), ('c.txt',)
+
+
+class StageD(ToyStage):
+    name, deps, outs = 'd', ('b.txt', 'c.txt'), ('d',)
+
+
+PIPELINES = {'a': StageA, 'b': StageB, 'c': StageC, 'd': StageD}
+
+
+def _read(path):
+    path = Path(path)
+    return (path / "result.txt").read_text() if path.is_dir() else path.read_text()
+
+
+@pytest.fixture
+def toy(tmp_path, monkeypatch):
+    """A diamond a -> (b, c) -> d declared in a dvc.yaml under tmp_path"""
+    monkeypatch.setenv('TOY_PIPELINE_DIR', str(tmp_path))
+    (tmp_path / "source.txt").write_text("v1")
+    (tmp_path / "toy_params.yaml").write_text(yaml.safe_dump({'a': {'alpha': 1}, 'unrelated': 1}))
+    stages = {
+        stage.name: {
+            'cmd': f"echo {stage.name}",
+            'deps': [str(tmp_path / dep) for dep in stage.deps],
+            'outs': [str(tmp_path / out) for out in stage.outs]
+        }
+        for stage in PIPELINES.values()
+    }
+    stages['a']['params'] = [{str(tmp_path / "toy_params.yaml"): ['a']}]
+    (tmp_path / "dvc.yaml").write_text(yaml.safe_dump({'stages': stages}))
+    return tmp_path
+
+
+def _runner(root, workers=1):
+    config = StageRunnerConfig(dvc_file=root / "dvc.yaml", state_file=root / "state.json",
+                               targets=['d'], workers=workers)
+    return StageRunner(config, PIPELINES)
+
+
+def _statuses(report):
+    return {row['stage']: row['status'] for row in report}
+
+
+def _runs(root):
+    path = root / "runs.log"
+    return path.read_text().split() if path.exists() else []
+
+
+def test_unchanged_stages_are_skipped(toy):
+    assert _statuses(_runner(toy).run()) == dict.fromkeys('abcd', 'ran')
+    assert _statuses(_runner(toy).run()) == dict.fromkeys('abcd', 'skipped')
+
+    # Keys a stage does not declare do not matter; its own keys do, but an
+    # unchanged output leaves the downstream stages alone
+    (toy / "toy_params.yaml").write_text(yaml.safe_dump({'a': {'alpha': 1}, 'unrelated': 2}))
+    assert set(_statuses(_runner(toy).run()).values()) == {'skipped'}
+    (toy / "toy_params.yaml").write_text(yaml.safe_dump({'a': {'alpha': 2}, 'unrelated': 2}))
+    assert _statuses(_runner(toy).run()) == {'a': 'ran', 'b': 'skipped', 'c': 'skipped', 'd': 'skipped'}
+
+    (toy / "source.txt").write_text("v2")
+    assert _statuses(_runner(toy).run()) == dict.fromkeys('abcd', 'ran')
+    assert _read(toy / "d") == "d(b(a(v2))c(a(v2)))"
+
+    # A deleted or modified output reruns its stage
+    (toy / "c.txt").unlink()
+    report = _runner(toy).run()
+    assert _statuses(report) == {'a': 'skipped', 'b': 'skipped', 'c': 'ran', 'd': 'skipped'}
+    assert report[2]['reason'] == f"{toy / 'c.txt'} missing"
+    assert _runs(toy) == list('abcd') + ['a'] + list('abcd') + ['c']
+
+
+def test_force_reruns_only_the_targets(toy):
+    _runner(toy).run()
+    report = _runner(toy).run(['b'], force=True)
+    assert [(row['stage'], row['status'], row['reason']) for row in report] == [
+        ('a', 'skipped', 'up to date'), ('b', 'ran', 'forced')
+    ]
+    assert _runs(toy) == list('abcd') + ['b']
+
+
+def test_dry_run_reports_without_running(toy):
+    report = _runner(toy).run(dry_run=True)
+    assert _statuses(report) == dict.fromkeys('abcd', 'outdated')
+    assert {row['reason'] for row in report} == {'never run'}
+    assert _runs(toy) == []
+    assert not (toy / "state.json").exists()
+
+    _runner(toy).run()
+    (toy / "source.txt").write_text("v2")
+    report = _runner(toy).run(dry_run=True)
+    assert [row['reason'] for row in report] == [
+        'inputs changed', 'upstream a outdated', 'upstream a outdated', 'upstream b, c outdated'
+    ]
+    assert _statuses(_runner(toy).run(['d'], force=True, dry_run=True))['d'] == 'outdated'
+    assert _runs(toy) == list('abcd')
+
+
+def test_stages_run_after_their_upstream_stages(toy):
+    runner = _runner(toy, workers=2)
+    assert runner.plan() == ['a', 'b', 'c', 'd']
+    assert runner.plan(['c']) == ['a', 'c']
+
+    report = {row['stage']: row for row in runner.run()}
+    runs = _runs(toy)
+    assert sorted(runs) == list('abcd')
+    assert runs[0] == 'a' and runs[-1] == 'd'
+    for name, upstream in {'b': 'a', 'c': 'a', 'd': 'b'}.items():
+        assert report[name]['start'] >= report[upstream]['start'] + report[upstream]['seconds'] - 0.01
+    assert _read(toy / "d") == "d(b(a(v1))c(a(v1)))"
+
+
+def test_dependency_cycles_are_rejected(toy):
+    stages = yaml.safe_load((toy / "dvc.yaml").read_text())
+    stages['stages']['a']['deps'].append(str(toy / "d"))
+    (toy / "dvc.yaml").write_text(yaml.safe_dump(stages))
+    with pytest.raises(ValueError, match="cycle"):
+        _runner(toy).plan()
+
+
+def test_repository_pipeline_is_a_dag():
+    specs = load_stage_specs("dvc.yaml")
+    config = StageRunnerConfig(dvc_file=Path("dvc.yaml"), state_file=Path("unused.json"),
+                               targets=list(specs), workers=1)
+    order = StageRunner(config, dict.fromkeys(specs, ToyStage)).plan()
+    assert order.index('data_ingestion') < order.index('prepare_base_model') < order.index('training')
+    assert order.index('training') < min(order.index(name) for name in
+                                         ('evaluation', 'feature_importance', 'experiment_tracking',
+                                          'model_versioning'))
+    # Modules training imports besides its own are dependencies too
+    assert {'src/car_price_prediction/components/data_ingestion.py',
+            'src/car_price_prediction/utils/timing.py'} <= set(specs['training'].deps)
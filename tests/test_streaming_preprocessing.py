@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from car_price_prediction.components.advanced_preprocessing import AdvancedPreprocessor, split_positions
+from car_price_prediction.components.data_ingestion import read_dataset_csv
+
+
+@pytest.fixture
+def listings_csv(listings, tmp_path):
+    df = listings.copy()
+    # A manufacturer seen only in outlier rows, one on each side of the bounds
+    df['Manufacturer'] = df['Manufacturer'].cat.add_categories(['OUTLIER ONLY'])
+    df.loc[[10, 20], 'Manufacturer'] = 'OUTLIER ONLY'
+    df.loc[10, 'Price'] = -1e9
+    df.loc[20, 'Price'] = 1e9
+    # Missing targets are dropped by both paths
+    df.loc[[30, 40], 'Price'] = np.nan
+    path = tmp_path / "listings.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_stream_matches_in_memory(listings_csv, tmp_path):
+    in_memory = AdvancedPreprocessor()
+    X_expected, y_expected = in_memory.preprocess(read_dataset_csv(listings_csv))
+
+    streamed = AdvancedPreprocessor()
+    X, y = streamed.preprocess_stream(listings_csv, tmp_path / "stream", chunksize=700, sample_size=10_000)
+
+    assert 'OUTLIER ONLY' not in streamed.pipeline.encoder.tables['Manufacturer']
+    for col, table in in_memory.pipeline.encoder.tables.items():
+        assert streamed.pipeline.encoder.tables[col] == table
+    assert streamed.pipeline.medians == in_memory.pipeline.medians
+    assert streamed.source_rows == 3000
+
+    np.testing.assert_array_equal(np.load(tmp_path / "stream" / "index.npy"), y_expected.index)
+    np.testing.assert_array_equal(y, y_expected.to_numpy(dtype=float))
+    np.testing.assert_allclose(X, X_expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_stream_sample_bounds_statistics(listings_csv, tmp_path):
+    streamed = AdvancedPreprocessor()
+    X, _ = streamed.preprocess_stream(listings_csv, tmp_path / "stream", chunksize=500, sample_size=800)
+
+    # Vocabularies stay exact; only medians and scaling come from the sample
+    assert streamed.pipeline.scaler.n_samples_seen_ == 800
+    assert np.isfinite(X).all()
+    assert np.abs(np.asarray(X).mean(axis=0)).max() < 0.2
+
+
+def test_stream_fits_on_training_positions_only(listings_csv, tmp_path):
+    in_memory = AdvancedPreprocessor()
+    X_raw, y_raw = in_memory.clean(read_dataset_csv(listings_csv))
+    train_rows, test_rows = split_positions(len(y_raw))
+    X_train_expected = in_memory.pipeline.fit_transform(X_raw.iloc[train_rows])
+
+    streamed = AdvancedPreprocessor()
+    X, y = streamed.preprocess_stream(listings_csv, tmp_path / "stream", chunksize=700,
+                                      sample_size=10_000, fit_rows=lambda n: split_positions(n)[0])
+
+    for col, table in in_memory.pipeline.encoder.tables.items():
+        assert streamed.pipeline.encoder.tables[col] == table
+    assert streamed.pipeline.medians == in_memory.pipeline.medians
+    assert streamed.pipeline.scaler.n_samples_seen_ == len(train_rows)
+    np.testing.assert_allclose(X[train_rows], X_train_expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(X[test_rows], in_memory.pipeline.transform(X_raw.iloc[test_rows]),
+                               rtol=1e-9, atol=1e-9)
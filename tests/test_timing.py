@@ -0,0 +1,57 @@
+import json
+import numpy as np
+import pytest
+from car_price_prediction.utils.timing import PhaseHistogram, TimingRegistry
+
+
+def test_quantiles_are_within_bucket_resolution():
+    durations = np.random.default_rng(0).lognormal(mean=-5, sigma=1, size=5000)
+    histogram = PhaseHistogram()
+    for seconds in durations:
+        histogram.record(float(seconds))
+
+    for q in (0.5, 0.95, 0.99):
+        assert histogram.quantile(q) == pytest.approx(np.quantile(durations, q), rel=0.05)
+    assert histogram.count == len(durations)
+    assert histogram.sum == pytest.approx(durations.sum())
+
+
+def test_disabled_registry_records_nothing():
+    timings = TimingRegistry(enabled=False)
+    with timings.timer('predict'):
+        pass
+    timings.record('total', 1.0)
+    assert timings.snapshot() == {}
+
+
+def test_reset_and_json_report(tmp_path):
+    timings = TimingRegistry()
+    timings.record('load', 0.5)
+    timings.reset()
+    timings.record('analyze', 0.25)
+    timings.record('total', 1.0)
+
+    path = tmp_path / "report" / "timings.json"
+    timings.save_json(path)
+    with open(path) as f:
+        report = json.load(f)
+    assert report['unit'] == 'seconds'
+    assert sorted(report['phases']) == ['analyze', 'total']
+    assert report['phases']['total']['p50'] == pytest.approx(1.0)
+
+
+def test_prometheus_exposition(api, payload):
+    client = api.app.test_client()
+    client.post("/predict/price", json=payload)
+    body = client.get("/metrics").get_data(as_text=True)
+    assert '# TYPE car_price_phase_seconds summary' in body
+    assert 'car_price_phase_seconds_count{phase="price.validate"}' in body
+
+
+def test_single_and_batch_requests_time_the_same_phases(api, payload):
+    client = api.app.test_client()
+    client.post("/predict/price", json=payload)
+    client.post("/predict/batch", json=[payload])
+    phases = api.timings.snapshot()
+    for phase in ('validate', 'parse', 'transform', 'predict', 'marshal'):
+        assert f"price.{phase}" in phases and f"batch.{phase}" in phases